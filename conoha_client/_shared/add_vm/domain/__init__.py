@@ -1,3 +1,4 @@
 """ADD VM feature domain."""
 from .domain import *  # noqa: F403
 from .errors import *  # noqa: F403
+from .fleet import *  # noqa: F403
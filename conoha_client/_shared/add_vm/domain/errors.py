@@ -3,3 +3,7 @@
 
 class ImageIdentifyError(Exception):
     """VM Imageを一意に特定できなかった."""
+
+
+class PreflightError(Exception):
+    """VM追加前の確認で問題がみつかった."""
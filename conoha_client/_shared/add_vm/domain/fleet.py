@@ -0,0 +1,54 @@
+"""複数VMの構成."""
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, Field, field_validator
+
+from conoha_client.features.image.domain import (
+    Application,
+    Distribution,
+    DistVersion,
+)
+from conoha_client.features.plan.domain import Memory
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class FleetEntry(BaseModel, frozen=True):
+    """同一構成のVM群.
+
+    e.g. {"memory": "1", "distro": "ubuntu", "version": "22.04", "count": 3}
+    """
+
+    memory: Memory
+    distro: Distribution = Distribution.UBUNTU
+    version: DistVersion = DistVersion(value="latest")
+    app: Application = Field(default_factory=Application.null)
+    count: int = Field(1, ge=0)
+    keypair: str | None = None
+
+    @field_validator("memory", mode="before")
+    def validate_memory(cls, v: Any) -> Any:  # noqa: N805, ANN401
+        """数値でも指定できる e.g. 0.5."""
+        return v if isinstance(v, Memory) else str(v)
+
+    @field_validator("version", mode="before")
+    def validate_version(cls, v: Any) -> Any:  # noqa: N805, ANN401
+        """文字列でも指定できる."""
+        return DistVersion.parse(str(v)) if isinstance(v, str | float) else v
+
+    @field_validator("app", mode="before")
+    def validate_app(cls, v: Any) -> Any:  # noqa: N805, ANN401
+        """文字列でも指定できる."""
+        return Application.parse(v) if isinstance(v, str) else v
+
+
+def load_fleet_spec(path: Path) -> list[FleetEntry]:
+    """JSONのリストで書かれた構成を読み込む."""
+    return [FleetEntry.model_validate(e) for e in json.loads(path.read_text())]
+
+
+__all__ = ["FleetEntry", "load_fleet_spec"]
@@ -1,10 +1,16 @@
 """add VM domain test."""
 from __future__ import annotations
 
+from conoha_client.features.image.domain import (
+    Application,
+    Distribution,
+    DistVersion,
+)
 from conoha_client.features.image.domain.image import MinDisk
 from conoha_client.features.plan.domain import Memory
 
 from .domain import allows_capacity
+from .fleet import FleetEntry
 
 
 def test_allow_capacity() -> None:
@@ -14,3 +20,19 @@ def test_allow_capacity() -> None:
             assert allows_capacity(MinDisk.SMALLEST, mem)
         else:
             assert allows_capacity(MinDisk.OTHERS, mem)
+
+
+def test_fleet_entry() -> None:
+    """JSONの値から構成を作る."""
+    e = FleetEntry.model_validate(
+        {"memory": 0.5, "distro": "debian", "version": 12.0, "app": "docker"},
+    )
+    assert e.memory == Memory.MB512
+    assert e.distro == Distribution.DEBIAN
+    assert e.version == DistVersion(value="12.0")
+    assert e.app == Application(value="docker")
+    assert e.count == 1
+
+    e = FleetEntry.model_validate({"memory": "1", "count": 3})
+    assert e.version.is_latest()
+    assert e.app == Application.null()
@@ -55,7 +55,7 @@ def identify_prior_image_options(func: Wrapped) -> Wrapped:
     )
     @functools.wraps(func)
     def wrapper(
-        dist: Distribution,
+        distro: Distribution,
         version: DistVersion,
         app: Application,
         *args: P.args,
@@ -63,7 +63,7 @@ def identify_prior_image_options(func: Wrapped) -> Wrapped:
     ) -> T:
         return func(
             *args,
-            dist=dist,
+            dist=distro,
             version=version,
             app=app,
             **kwargs,
@@ -0,0 +1,105 @@
+"""VM追加前の確認.
+
+イメージ,プラン,キーペア,契約中VM,作成上限を並行して取得し,
+POSTする前に組み合わせとキーペアと上限をまとめて確認する
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable
+
+from pydantic import BaseModel
+
+from conoha_client.features._shared.concurrent import map_concurrently
+from conoha_client.features.image.domain.image import LinuxImageList  # noqa: TCH001
+from conoha_client.features.plan.domain import VMPlan  # noqa: TCH001
+from conoha_client.features.plan.repo import list_vmplans
+from conoha_client.features.sshkey.domain import KeyPair  # noqa: TCH001
+from conoha_client.features.sshkey.repo import find_all
+from conoha_client.features.vm.domain import VM, Limits, VMStatus
+from conoha_client.features.vm.repo.query import get_limits, inventory_dep, list_vms
+
+from .domain import PreflightError, allows_capacity
+from .repo import list_linux_images
+
+if TYPE_CHECKING:
+    from .repo import AddRequest
+
+
+def list_current_vms() -> list[VM]:
+    """差分更新の契約中VM一覧."""
+    return list_vms(inventory_dep)
+
+
+class Catalog(BaseModel, frozen=True):
+    """VM追加の確認に使う一覧."""
+
+    images: LinuxImageList
+    plans: list[VMPlan]
+    keypairs: list[KeyPair]
+    vms: list[VM]
+    limits: Limits
+
+
+def fetch_catalog(
+    images_dep: Callable[[], LinuxImageList] = list_linux_images,
+    plans_dep: Callable[[], list[VMPlan]] = list_vmplans,
+    keypairs_dep: Callable[[], list[KeyPair]] = find_all,
+    vms_dep: Callable[[], list[VM]] = list_current_vms,
+    limits_dep: Callable[[], Limits] = get_limits,
+) -> Catalog:
+    """一覧を並行して取得する. 失敗した取得はまとめて送出する."""
+    deps: dict[str, Callable[[], object]] = {
+        "images": images_dep,
+        "plans": plans_dep,
+        "keypairs": keypairs_dep,
+        "vms": vms_dep,
+        "limits": limits_dep,
+    }
+    outcomes = map_concurrently(lambda k: deps[k](), list(deps))
+    errors = [f"{o.arg}: {o.error}" for o in outcomes if not o.is_ok()]
+    if len(errors) > 0:
+        raise PreflightError("\n".join(errors))
+    return Catalog(**{o.arg: o.value for o in outcomes})
+
+
+def find_problems(catalog: Catalog, reqs: list[AddRequest]) -> list[str]:
+    """VM追加リクエストの問題点. 問題なければ空."""
+    plans = {p.flavor_id: p for p in catalog.plans}
+    images = {img.image_id: img for img in catalog.images}
+    keypairs = {k.name for k in catalog.keypairs}
+
+    problems = []
+    for cmd, keypair_name in dict.fromkeys(reqs):
+        plan = plans.get(cmd.flavor_id)
+        img = images.get(cmd.image_id)
+        if plan is None:
+            problems.append(f"プラン(flavor_id={cmd.flavor_id})がありません")
+        if img is None:
+            problems.append(f"イメージ(image_id={cmd.image_id})がありません")
+        if (
+            plan is not None
+            and img is not None
+            and not allows_capacity(img.min_disk, plan.memory)
+        ):
+            problems.append(f"{img.name}は{plan.memory.value}GBのVMには使えません")
+        if keypair_name is not None and keypair_name not in keypairs:
+            problems.append(f"キーペア{keypair_name}がありません")
+
+    vms = [vm for vm in catalog.vms if vm.status != VMStatus.DELETED]
+    used = [plans[vm.flavor_id] for vm in vms if vm.flavor_id in plans]
+    added = [plans[cmd.flavor_id] for cmd, _ in reqs if cmd.flavor_id in plans]
+    problems.extend(
+        catalog.limits.exceeded(
+            n_instances=len(vms) + len(reqs),
+            n_cores=sum(p.n_core for p in used + added),
+            ram_mb=sum(p.mem_mb for p in used + added),
+        ),
+    )
+    return list(dict.fromkeys(problems))
+
+
+def preflight(catalog: Catalog, reqs: list[AddRequest]) -> None:
+    """問題があればVMを追加せずに全ての問題をまとめて送出する."""
+    problems = find_problems(catalog, reqs)
+    if len(problems) > 0:
+        raise PreflightError("\n".join(problems))
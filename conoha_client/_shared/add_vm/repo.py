@@ -7,9 +7,15 @@ from typing import TYPE_CHECKING, Callable
 
 from pydantic import BaseModel
 
+from conoha_client.features._shared.concurrent import (
+    MAX_WORKERS,
+    Outcome,
+    map_concurrently,
+)
+from conoha_client.features._shared.throttle import TokenBucket
 from conoha_client.features.image.domain.image import LinuxImageList
 from conoha_client.features.image.repo import list_images
-from conoha_client.features.plan.repo import find_vmplan
+from conoha_client.features.plan.repo import find_vmplan, list_vmplans
 from conoha_client.features.vm.repo.command import AddVMCommand
 
 from .domain import filter_memory, select_uniq
@@ -20,6 +26,10 @@ if TYPE_CHECKING:
         DistVersion,
         Image,
     )
+    from conoha_client.features.plan.domain import VMPlan
+    from conoha_client.features.vm.domain import AddedVM
+
+    from .domain import FleetEntry
 
 from conoha_client.features.image.domain import (
     Distribution,  # noqa: TCH001
@@ -96,18 +106,89 @@ class DistQuery(BaseModel, frozen=True):
         )
 
 
-def add_vm_command(
+def add_vm_command(  # noqa: PLR0913
     memory: Memory,
     dist: Distribution,
     ver: DistVersion,
     app: Application,
     admin_pass: str,
+    dep: Callback = list_linux_images,
+    plans_dep: Callable[[], list[VMPlan]] = list_vmplans,
+    fleet: str | None = None,
 ) -> AddVMCommand:
-    """Add VM Command with identified Image."""
-    q = DistQuery(memory=memory, dist=dist)
+    """Add VM Command with identified Image.
+
+    :param fleet: 構成の名前. 追加するVMのmetadataに付けて構成の管理対象にする
+    """
+    q = DistQuery(memory=memory, dist=dist, dep=dep)
     img = q.identify(ver, app)
     return AddVMCommand(
-        flavor_id=find_vmplan(memory).flavor_id,
+        flavor_id=find_vmplan(memory, plans_dep).flavor_id,
         image_id=img.image_id,
         admin_pass=admin_pass,
+        fleet=fleet,
     )
+
+
+AddRequest = tuple[AddVMCommand, str | None]
+
+
+def fleet_requests(  # noqa: PLR0913
+    entries: list[FleetEntry],
+    admin_pass: str,
+    keypair_name: str | None = None,
+    dep: Callback = list_linux_images,
+    plans_dep: Callable[[], list[VMPlan]] = list_vmplans,
+    fleet: str | None = None,
+) -> list[AddRequest]:
+    """構成からVM追加リクエストを作る.
+
+    イメージ一覧の取得は1回だけで、同一構成のイメージとプランの特定も1回だけ
+    """
+    imgs = dep()
+
+    def _imgs() -> LinuxImageList:
+        return imgs
+
+    @cache
+    def _cmd(
+        memory: Memory,
+        dist: Distribution,
+        ver: DistVersion,
+        app: Application,
+    ) -> AddVMCommand:
+        return add_vm_command(
+            memory,
+            dist,
+            ver,
+            app,
+            admin_pass,
+            dep=_imgs,
+            plans_dep=plans_dep,
+            fleet=fleet,
+        )
+
+    reqs = []
+    for e in entries:
+        cmd = _cmd(e.memory, e.distro, e.version, e.app)
+        reqs.extend([(cmd, e.keypair or keypair_name)] * e.count)
+    return reqs
+
+
+def add_vms(
+    reqs: list[AddRequest],
+    max_workers: int = MAX_WORKERS,
+    per_sec: float = 1,
+) -> list[Outcome[AddRequest, AddedVM]]:
+    """VMを並行して追加する.
+
+    :param per_sec: 1秒あたりのVM追加リクエスト数の上限
+    """
+    bucket = TokenBucket(rate=per_sec)
+
+    def _add(req: AddRequest) -> AddedVM:
+        bucket.acquire()
+        cmd, keypair_name = req
+        return cmd(keypair_name)
+
+    return map_concurrently(_add, reqs, max_workers)
@@ -0,0 +1,93 @@
+"""VM add preflight test."""
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+
+from conoha_client.features.image.domain import (
+    Application,
+    Distribution,
+    DistVersion,
+)
+from conoha_client.features.plan.domain import Memory, VMPlan
+from conoha_client.features.sshkey.domain import KeyPair
+from conoha_client.features.vm.domain import Limits
+
+from .domain import PreflightError
+from .preflight import fetch_catalog, find_problems, preflight
+from .repo import add_vm_command
+from .test_repo import mock_dep
+
+
+def _plan(mem: Memory, mem_mb: int) -> VMPlan:
+    return VMPlan.model_validate(
+        {
+            "id": uuid4(),
+            "name": f"g-c2{mem.expression}100",
+            "ram": mem_mb,
+            "vcpus": 2,
+            "disk": 100,
+        },
+    )
+
+
+PLANS = [_plan(Memory.MB512, 512), _plan(Memory.GB1, 1024)]
+
+
+def _limits(max_instances: int) -> Limits:
+    return Limits.model_validate(
+        {
+            "absolute": {
+                "maxTotalInstances": max_instances,
+                "maxTotalCores": -1,
+                "maxTotalRAMSize": -1,
+            },
+        },
+    )
+
+
+def test_preflight() -> None:
+    """組み合わせ,キーペア,上限の問題をまとめて返す."""
+    catalog = fetch_catalog(
+        images_dep=mock_dep,
+        plans_dep=lambda: PLANS,
+        keypairs_dep=lambda: [KeyPair(name="key", public_key="ssh-rsa")],
+        vms_dep=list,
+        limits_dep=lambda: _limits(2),
+    )
+    cmd = add_vm_command(
+        Memory.GB1,
+        Distribution.UBUNTU,
+        DistVersion(value="22.04"),
+        Application.null(),
+        "pass",
+        dep=mock_dep,
+        plans_dep=lambda: PLANS,
+    )
+    assert find_problems(catalog, [(cmd, "key"), (cmd, None)]) == []
+
+    mismatched = cmd.model_copy(update={"flavor_id": PLANS[0].flavor_id})
+    problems = find_problems(catalog, [(mismatched, "nokey")] * 3)
+    assert len(problems) == 3  # noqa: PLR2004
+    assert "キーペアnokeyがありません" in problems
+    assert "VM数が上限を超えます: 3/2" in problems
+    with pytest.raises(PreflightError):
+        preflight(catalog, [(mismatched, None)])
+
+
+def test_fetch_errors() -> None:
+    """取得の失敗はまとめて送出する."""
+
+    def _fail() -> list:
+        msg = "unavailable"
+        raise RuntimeError(msg)
+
+    with pytest.raises(PreflightError, match="keypairs: unavailable"):
+        fetch_catalog(
+            images_dep=mock_dep,
+            plans_dep=lambda: PLANS,
+            keypairs_dep=_fail,
+            vms_dep=list,
+            limits_dep=lambda: _limits(-1),
+        )
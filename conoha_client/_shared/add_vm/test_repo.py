@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import itertools
 from typing import TYPE_CHECKING
+from uuid import uuid4
 
 from conoha_client.features.image.domain import (
     Application,
@@ -11,9 +12,11 @@ from conoha_client.features.image.domain import (
 )
 from conoha_client.features.image.domain.test_domain import fixture_models
 from conoha_client.features.plan.domain import Memory
+from conoha_client.features.vm.repo.command import AddVMCommand
 
 from .repo import (
     DistQuery,
+    add_vms,
 )
 
 if TYPE_CHECKING:
@@ -82,3 +85,25 @@ def test_find_image_id() -> None:
 
     # freebsdのufsの30gb,100gbを無視した
     assert len(imgs) == n_all - 2
+
+
+def test_add_vms() -> None:
+    """一部が失敗しても残りは追加する."""
+    keys = []
+
+    def mock_post(js: dict) -> object:
+        key = js["server"].get("key_name")
+        keys.append(key)
+        if key == "ng":
+            raise ValueError
+        return {"id": str(uuid4())}
+
+    cmd = AddVMCommand(
+        flavor_id=uuid4(),
+        image_id=uuid4(),
+        admin_pass="xxx",  # noqa: S106
+        dep=mock_post,
+    )
+    outcomes = add_vms([(cmd, "a"), (cmd, "ng"), (cmd, None)], per_sec=1000)
+    assert [o.is_ok() for o in outcomes] == [True, False, True]
+    assert sorted(keys, key=str) == sorted(["a", "ng", None], key=str)
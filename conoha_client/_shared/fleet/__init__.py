@@ -0,0 +1 @@
+from .repo import FleetPlan, plan_fleet, remove_vms  # noqa: F401
@@ -0,0 +1,169 @@
+"""構成ファイルと契約中VMの差分.
+
+一覧を1度だけ取得して,構成に合わせるための追加,プラン変更,削除を求める
+構成から追加したVMにはmetadataで構成の名前を付け,そのVMだけを管理する
+"""
+from __future__ import annotations
+
+from functools import cache
+from typing import TYPE_CHECKING, Callable
+
+from pydantic import BaseModel
+
+from conoha_client._shared.add_vm.repo import AddRequest, add_vm_command
+from conoha_client._shared.resize import ResizeTarget
+from conoha_client.features._shared.concurrent import (
+    MAX_WORKERS,
+    Outcome,
+    map_concurrently,
+)
+from conoha_client.features.vm.domain import VM, VMStatus
+from conoha_client.features.vm_actions.repo import remove_vm
+
+if TYPE_CHECKING:
+    from conoha_client._shared.add_vm.domain import FleetEntry
+    from conoha_client._shared.add_vm.preflight import Catalog
+    from conoha_client.features.image.domain import Application, DistVersion
+    from conoha_client.features.image.domain.distribution import Distribution
+    from conoha_client.features.plan.domain import Memory
+    from conoha_client.features.vm.repo.command import AddVMCommand
+
+
+class FleetPlan(BaseModel, frozen=True):
+    """構成に合わせるための操作. 追加,プラン変更,削除の順に行う."""
+
+    keep: list[VM]
+    remove: list[VM]
+    resize: list[ResizeTarget]
+    add: list[AddRequest]
+
+    def is_empty(self) -> bool:
+        """変更が不要か."""
+        return len(self.remove) + len(self.resize) + len(self.add) == 0
+
+    def remains(self) -> list[VM]:
+        """削除後に残るVM. プラン変更するVMは変更後のプランにする."""
+        return self.keep + [
+            t.vm.model_copy(update={"flavor_id": t.flavor_id}) for t in self.resize
+        ]
+
+    def peak(self) -> list[VM]:
+        """追加とプラン変更を終えて削除する直前の契約中VM. 作成上限の確認に使う."""
+        return self.remains() + self.remove
+
+    def describe(self, catalog: Catalog) -> list[str]:
+        """計画を1操作1行で表す."""
+        images = {img.image_id: img.name for img in catalog.images}
+        plans = {p.flavor_id: p.name for p in catalog.plans}
+        return (
+            [
+                f"+ add {images[cmd.image_id]} {plans[cmd.flavor_id]} key={key}"
+                for cmd, key in self.add
+            ]
+            + [
+                f"~ resize {t.vm.vm_id} {plans.get(t.vm.flavor_id)}"
+                f" -> {plans[t.flavor_id]}"
+                for t in self.resize
+            ]
+            + [f"- remove {vm.vm_id} {plans.get(vm.flavor_id)}" for vm in self.remove]
+            + [f"= keep {vm.vm_id} {plans.get(vm.flavor_id)}" for vm in self.keep]
+        )
+
+
+def plan_fleet(  # noqa: PLR0913
+    entries: list[FleetEntry],
+    catalog: Catalog,
+    admin_pass: str,
+    fleet: str,
+    keypair_name: str | None = None,
+    *,
+    prune: bool = False,
+) -> FleetPlan:
+    """構成と契約中VMの差分を求める.
+
+    構成fleetから追加したVMのうち,イメージとプランが同じVMは残し,
+    イメージだけ同じVMはプラン変更し,足りない分は追加し,
+    どの構成にも使わないVMは削除する
+    512MBプランとそれ以外の間はプラン変更できないので削除と追加になる
+
+    :param prune: 構成fleetから追加していないVMも全て削除する
+    """
+    plans = {p.flavor_id: p for p in catalog.plans}
+
+    @cache
+    def _cmd(
+        memory: Memory,
+        dist: Distribution,
+        ver: DistVersion,
+        app: Application,
+    ) -> AddVMCommand:
+        return add_vm_command(
+            memory,
+            dist,
+            ver,
+            app,
+            admin_pass,
+            dep=lambda: catalog.images,
+            plans_dep=lambda: catalog.plans,
+            fleet=fleet,
+        )
+
+    wants: list[AddRequest] = []
+    for e in entries:
+        cmd = _cmd(e.memory, e.distro, e.version, e.app)
+        wants.extend([(cmd, e.keypair or keypair_name)] * e.count)
+
+    live = [vm for vm in catalog.vms if vm.status != VMStatus.DELETED]
+    pool = [vm for vm in live if vm.fleet == fleet]
+    others = [vm for vm in live if vm.fleet != fleet] if prune else []
+    keep = []
+    rest = []
+    for cmd, keypair in wants:
+        vm = _take(pool, cmd, _same)
+        if vm is None:
+            rest.append((cmd, keypair))
+        else:
+            keep.append(vm)
+
+    def _resizable(vm: VM, cmd: AddVMCommand) -> bool:
+        old, new = plans.get(vm.flavor_id), plans[cmd.flavor_id]
+        return (
+            vm.image_id == cmd.image_id
+            and old is not None
+            and old.memory.is_smallest() == new.memory.is_smallest()
+        )
+
+    resize = []
+    add = []
+    for cmd, keypair in rest:
+        vm = _take(pool, cmd, _resizable)
+        if vm is None:
+            add.append((cmd, keypair))
+        else:
+            resize.append(ResizeTarget(vm=vm, flavor_id=cmd.flavor_id))
+    return FleetPlan(keep=keep, remove=pool + others, resize=resize, add=add)
+
+
+def _same(vm: VM, cmd: AddVMCommand) -> bool:
+    return (vm.image_id, vm.flavor_id) == (cmd.image_id, cmd.flavor_id)
+
+
+def _take(
+    pool: list[VM],
+    cmd: AddVMCommand,
+    pred: Callable[[VM, AddVMCommand], bool],
+) -> VM | None:
+    """条件に合う最初のVMをpoolから取り出す."""
+    for vm in pool:
+        if pred(vm, cmd):
+            pool.remove(vm)
+            return vm
+    return None
+
+
+def remove_vms(
+    vms: list[VM],
+    max_workers: int = MAX_WORKERS,
+) -> list[Outcome[VM, None]]:
+    """複数VMを並行して削除する."""
+    return map_concurrently(lambda vm: remove_vm(vm.vm_id), vms, max_workers)
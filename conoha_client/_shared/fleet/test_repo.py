@@ -0,0 +1,84 @@
+"""fleet plan test."""
+from __future__ import annotations
+
+from uuid import uuid4
+
+from conoha_client._shared.add_vm.domain import FleetEntry
+from conoha_client._shared.add_vm.preflight import Catalog
+from conoha_client._shared.add_vm.test_preflight import PLANS, _limits, _plan
+from conoha_client._shared.add_vm.test_repo import mock_dep
+from conoha_client.features.plan.domain import Memory
+from conoha_client.features.vm.domain import FLEET_METADATA_KEY, VM, VMStatus
+from conoha_client.features.vm.repo.test_wait import server
+
+from .repo import plan_fleet
+
+GB1, MB512 = PLANS[1], PLANS[0]
+GB2 = _plan(Memory.GB2, 2048)
+
+
+def _vm(image_id: object, flavor_id: object, fleet: str | None = "web") -> VM:
+    js = server(uuid4(), VMStatus.ACTIVE)
+    js |= {"image": {"id": str(image_id)}, "flavor": {"id": str(flavor_id)}}
+    if fleet is not None:
+        js["metadata"] = {FLEET_METADATA_KEY: fleet}
+    return VM.model_validate(js)
+
+
+def test_plan_fleet() -> None:
+    """同じ構成は残し,イメージが同じならプラン変更,足りなければ追加,余りは削除."""
+    ubuntu = FleetEntry.model_validate({"memory": "1", "version": "22.04"})
+    imgs = mock_dep()
+    catalog = Catalog(
+        images=imgs,
+        plans=[*PLANS, GB2],
+        keypairs=[],
+        vms=[],
+        limits=_limits(-1),
+    )
+    cmd = plan_fleet([ubuntu], catalog, "pass", "web").add[0][0]
+    assert cmd.fleet == "web"
+    image_id = cmd.image_id
+
+    other = next(img for img in imgs if img.image_id != image_id)
+    kept = _vm(image_id, GB1.flavor_id)
+    resized = _vm(image_id, GB2.flavor_id)
+    removed = _vm(other.image_id, GB1.flavor_id)
+    catalog = catalog.model_copy(update={"vms": [kept, removed, resized]})
+    entries = [ubuntu.model_copy(update={"count": 3})]
+    plan = plan_fleet(entries, catalog, "pass", "web", "key")
+    assert plan.keep == [kept]
+    assert [t.vm for t in plan.resize] == [resized]
+    assert [vm.flavor_id for vm in plan.remains()] == [GB1.flavor_id] * 2
+    assert plan.remove == [removed]
+    assert len(plan.peak()) == 3  # noqa: PLR2004
+    assert [key for _, key in plan.add] == ["key"]
+    assert len(plan.describe(catalog)) == 4  # noqa: PLR2004
+
+    small = FleetEntry.model_validate({"memory": Memory.MB512, "version": "22.04"})
+    catalog = catalog.model_copy(update={"vms": [kept]})
+    plan = plan_fleet([small], catalog, "pass", "web")
+    assert plan.remove == [kept]
+    assert plan.add[0][0].flavor_id == MB512.flavor_id
+
+
+def test_plan_fleet_owned_only() -> None:
+    """構成から追加していないVMは--pruneを付けたときだけ削除する."""
+    ubuntu = FleetEntry.model_validate({"memory": "1", "version": "22.04"})
+    imgs = mock_dep()
+    image_id = imgs[0].image_id
+    unmanaged = _vm(image_id, GB1.flavor_id, None)
+    other = _vm(image_id, GB1.flavor_id, "db")
+    catalog = Catalog(
+        images=imgs,
+        plans=PLANS,
+        keypairs=[],
+        vms=[unmanaged, other],
+        limits=_limits(-1),
+    )
+    plan = plan_fleet([ubuntu], catalog, "pass", "web")
+    assert plan.keep == []
+    assert plan.remove == []
+    assert len(plan.add) == 1
+    plan = plan_fleet([ubuntu], catalog, "pass", "web", prune=True)
+    assert plan.remove == [unmanaged, other]
@@ -1,3 +1,8 @@
-from .cli import list_vm_cli, reinforced_vm_cli, shortcut_vm_cli  # noqa: F401
+from .cli import (  # noqa: F401
+    list_vm_cli,
+    reinforced_vm_cli,
+    render_vm_cli,
+    shortcut_vm_cli,
+)
 from .domain import ReinforcedVM  # noqa: F401
 from .query import find_reinforced_vm_by_id  # noqa: F401
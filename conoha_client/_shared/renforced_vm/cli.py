@@ -1,36 +1,120 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import functools
+from typing import TYPE_CHECKING, Callable, ParamSpec, TypeVar
 
 import click
 
-from conoha_client._shared.renforced_vm.query import list_reinforced_vms
+from conoha_client._shared.renforced_vm.domain import ReinforcedVM
+from conoha_client._shared.renforced_vm.query import (
+    list_reinforced_vms,
+    session_catalog,
+)
+from conoha_client.features._shared.command_option import (
+    profiles_option,
+    regions_option,
+)
 from conoha_client.features._shared.view.domain import view_options
-from conoha_client.features.vm.repo.query import list_vms
+from conoha_client.features._shared.view.watch import watch_options
+from conoha_client.features.template.domain import template_batch_io
+from conoha_client.features.vm.domain import ServerQuery, VMStatus
+from conoha_client.features.vm.repo.query import list_vms, servers_dep
 
 if TYPE_CHECKING:
-    from conoha_client._shared.renforced_vm.domain import ReinforcedVM
+    from datetime import datetime
+    from uuid import UUID
 
 _help = "list VM as human friendly"
 
+# 経過時間は毎回変わるので監視中は既定で表示しない
+_WATCH_KEYS = tuple(k for k in ReinforcedVM.model_fields if k != "elapsed")
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+def server_query_options(func: Callable[P, R]) -> Callable[P, R]:
+    """servers/detailをサーバー側で絞り込むオプション.
+
+    view_optionsより上に付けると--whereも可能ならサーバー側の絞り込みへ変換する
+    funcはServerQueryをqueryで受け取る
+    """
+
+    @click.option(
+        "--status",
+        type=click.Choice([s.value for s in VMStatus]),
+        help="状態で絞り込む",
+    )
+    @click.option("--name", help="名前で絞り込む")
+    @click.option("--flavor-id", type=click.UUID, help="プランのIDで絞り込む")
+    @click.option("--image-id", type=click.UUID, help="イメージのIDで絞り込む")
+    @click.option(
+        "--changes-since",
+        type=click.DateTime(),
+        help="指定日時以降に変更されたVMに絞り込む",
+    )
+    @functools.wraps(func)
+    def wrapper(
+        status: str | None,
+        name: str | None,
+        flavor_id: UUID | None,
+        image_id: UUID | None,
+        changes_since: datetime | None,
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> R:
+        query = ServerQuery(
+            status=None if status is None else VMStatus(status),
+            name=name,
+            flavor_id=flavor_id,
+            image_id=image_id,
+            changes_since=None if changes_since is None else changes_since.astimezone(),
+        )
+        where = kwargs.get("where")
+        if where is not None:
+            query = query.push_down(*where)
+        return func(*args, query=query, **kwargs)
+
+    return wrapper
+
 
 @click.command(name="lsvm", help=_help)
+@watch_options(_WATCH_KEYS)
+@server_query_options
 @view_options
-def reinforced_vm_cli() -> list[ReinforcedVM]:
-    return list_reinforced_vms()
+@profiles_option
+@regions_option
+def reinforced_vm_cli(query: ServerQuery) -> list[ReinforcedVM]:
+    return list_reinforced_vms(servers_dep(query), session_catalog())
 
 
 @click.command(name="ls")
 @click.option("--reinforce", "-r", is_flag=True, help=_help)
+@watch_options()
+@server_query_options
 @view_options
-def list_vm_cli(reinforce: bool) -> list:
+@profiles_option
+@regions_option
+def list_vm_cli(reinforce: bool, query: ServerQuery) -> list:
     """契約中サーバー一覧取得コマンド."""
+    dep = servers_dep(query)
     if reinforce:
-        return list_reinforced_vms()
-    return list_vms()
+        return list_reinforced_vms(dep, session_catalog())
+    return list_vms(dep)
 
 
 @click.command(name="ls", help=_help)
+@watch_options(_WATCH_KEYS)
+@server_query_options
 @view_options
-def shortcut_vm_cli() -> list[ReinforcedVM]:
+@profiles_option
+@regions_option
+def shortcut_vm_cli(query: ServerQuery) -> list[ReinforcedVM]:
+    return list_reinforced_vms(servers_dep(query), session_catalog())
+
+
+@click.command(name="render")
+@template_batch_io
+def render_vm_cli() -> list[ReinforcedVM]:
+    """全VMへテンプレートを適用する e.g. ssh configやinventoryの生成."""
     return list_reinforced_vms()
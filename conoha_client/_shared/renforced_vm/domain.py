@@ -17,9 +17,10 @@ class ReinforcedVM(BaseModel, frozen=True):
     status: VMStatus
     elapsed: timedelta
     image_name: str
-    memoryMB: int = Field(alias="mem_mb")  # noqa: N815
-    n_cpu: int = Field(alias="n_core")
-    storageGB: int = Field(alias="disk_gb")  # noqa: N815
+    # プランが見つからなければNone
+    memoryMB: int | None = Field(None, alias="mem_mb")  # noqa: N815
+    n_cpu: int | None = Field(None, alias="n_core")
+    storageGB: int | None = Field(None, alias="disk_gb")  # noqa: N815
     sshkey: str | None
     vm_id: UUID
 
@@ -1,26 +1,112 @@
 """query VM with detail info."""
 from __future__ import annotations
 
+import threading
+from typing import TYPE_CHECKING, Callable
 from uuid import UUID
 
+from conoha_client.features._shared.endpoints.environments import (
+    env_region,
+    env_tenant_id,
+)
 from conoha_client.features._shared.model_list.domain import ModelList, by
 from conoha_client.features.image.repo import list_images
-from conoha_client.features.plan.domain import VMPlan
-from conoha_client.features.plan.repo import list_vmplans
-from conoha_client.features.vm.repo.query import list_vms
+from conoha_client.features.plan.repo import list_vmplans, refresh_vmplans
+from conoha_client.features.vm.repo.query import get_dep, list_vms
 
 from .domain import ReinforcedVM
 
+if TYPE_CHECKING:
+    from conoha_client.features.image.domain import ImageList
+    from conoha_client.features.plan.domain import VMPlan
+    from conoha_client.features.vm.domain import VM
 
-def list_reinforced_vms() -> list[ReinforcedVM]:
-    """List vm."""
+# 所与のimageは削除されないと思う
+# つまり検索に失敗したimageはsnapshot
+DELETED_IMAGE_NAME = "deleted or saved snapshot"
+
+
+class NameCatalog:
+    """VMのイメージIDとプランIDから名前を引く対応表.
+
+    知らないIDが現れたときだけ一覧を取得し直す
+    取得し直しても見つからないIDは再取得の理由にしない
+    """
+
+    def __init__(
+        self,
+        images_dep: Callable[[], ImageList] = list_images,
+        plans_dep: Callable[[], list[VMPlan]] = list_vmplans,
+        plans_refresh_dep: Callable[[], list[VMPlan]] = refresh_vmplans,
+    ) -> None:
+        """Init.
+
+        :param plans_refresh_dep: 知らないプランが現れたときのキャッシュしない取得
+        """
+        self._images_dep = images_dep
+        self._plans_dep = plans_dep
+        self._plans_refresh_dep = plans_refresh_dep
+        self._lock = threading.Lock()
+        self._image_names: dict[UUID, str] | None = None
+        self._deleted: set[UUID] = set()
+        self._plans: dict[UUID, VMPlan] | None = None
+        self._unknown_flavors: set[UUID] = set()
+
+    def resolve(self, vms: list[VM]) -> tuple[dict[UUID, str], dict[UUID, VMPlan]]:
+        """VMのイメージ名とプランを引ける対応表."""
+        image_ids = {vm.image_id for vm in vms}
+        flavor_ids = {vm.flavor_id for vm in vms}
+        with self._lock:
+            if self._image_names is None or not image_ids <= (
+                self._image_names.keys() | self._deleted
+            ):
+                self._image_names = {
+                    image.image_id: image.name for image in self._images_dep()
+                }
+                self._deleted = image_ids - self._image_names.keys()
+            if self._plans is None:
+                self._plans = {plan.flavor_id: plan for plan in self._plans_dep()}
+            if not flavor_ids <= self._plans.keys() | self._unknown_flavors:
+                plans = self._plans_refresh_dep()
+                self._plans = {plan.flavor_id: plan for plan in plans}
+                self._unknown_flavors = flavor_ids - self._plans.keys()
+            return self._image_names, self._plans
+
+
+_catalogs: dict[tuple[str, str], NameCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def session_catalog() -> NameCatalog:
+    """リージョンとテナントごとにプロセス内で使い回す対応表.
+
+    e.g. --watchの更新ごとにイメージとプランの一覧を取得しない
+    """
+    key = (env_region(), env_tenant_id())
+    with _catalogs_lock:
+        return _catalogs.setdefault(key, NameCatalog())
+
+
+def list_reinforced_vms(
+    dep: Callable[[], list[object]] = get_dep,
+    catalog: NameCatalog | None = None,
+) -> list[ReinforcedVM]:
+    """List vm.
+
+    イメージとプランはVMの数に関わらずそれぞれ1回だけ一覧取得する
+    :param catalog: 使い回す対応表. Noneなら毎回取得する
+    """
     ls = []
-    vms = list_vms()
+    vms = list_vms(dep)
+    if catalog is None:
+        catalog = NameCatalog()
+    image_names, plans = catalog.resolve(vms)
     for vm in reversed(vms):
+        plan = plans.get(vm.flavor_id)
         d = (
             vm.model_dump()
-            | find_vmplan(vm.flavor_id).model_dump()
-            | {"image_name": find_image_name(vm.image_id)}
+            | ({} if plan is None else plan.model_dump())
+            | {"image_name": image_names.get(vm.image_id, DELETED_IMAGE_NAME)}
         )
 
         d["ipv4"] = vm.ipv4
@@ -34,19 +120,3 @@ def find_reinforced_vm_by_id(vm_id: UUID) -> ReinforcedVM:
         by("vm_id", vm_id),
     )
 
-
-def find_image_name(image_id: UUID) -> str:
-    """Find image by id."""
-    image = list_images().find_one_or_none_by(by("image_id", image_id))
-    if image is None:
-        # 所与のimageは削除されないと思う
-        # つまり検索に失敗したimageはsnapshot
-        return "deleted or saved snapshot"
-    return image.name
-
-
-def find_vmplan(flavor_id: UUID) -> VMPlan:
-    """Find VMplan by id."""
-    return ModelList[VMPlan](root=list_vmplans()).find_one_by(
-        by("flavor_id", flavor_id),
-    )
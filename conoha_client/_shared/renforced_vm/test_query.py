@@ -0,0 +1,60 @@
+"""reinforced VM query test."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+from conoha_client._shared.snapshot.test_repo import snapshot
+from conoha_client.features.image.domain import ImageList
+from conoha_client.features.vm.domain import VM, VMStatus
+from conoha_client.features.vm.repo.test_wait import server
+
+from .query import NameCatalog
+
+
+def vm(image_id: UUID, flavor_id: UUID) -> VM:
+    """Fixture."""
+    js = server(uuid4(), VMStatus.ACTIVE)
+    js["image"]["id"] = str(image_id)
+    js["flavor"]["id"] = str(flavor_id)
+    return VM.model_validate(js)
+
+
+def test_name_catalog() -> None:
+    """知らないIDが現れたときだけ取得し直す."""
+    a, b = snapshot("a", 100), snapshot("b", 100)
+    deleted, flavor = uuid4(), uuid4()
+    listings = iter([[a], [a, b]])
+    calls = []
+
+    def images_dep() -> ImageList:
+        calls.append("images")
+        return ImageList(next(listings))
+
+    def plans_dep() -> list:
+        calls.append("plans")
+        return [SimpleNamespace(flavor_id=flavor)]
+
+    def plans_refresh_dep() -> list:
+        calls.append("refresh")
+        return [SimpleNamespace(flavor_id=flavor), SimpleNamespace(flavor_id=added)]
+
+    added, unknown = uuid4(), uuid4()
+    catalog = NameCatalog(images_dep, plans_dep, plans_refresh_dep)
+    vms = [vm(a.image_id, flavor), vm(deleted, flavor)]
+    names, plans = catalog.resolve(vms)
+    assert names == {a.image_id: "a"}
+    assert set(plans) == {flavor}
+    # 削除済みのイメージでは取得し直さない
+    catalog.resolve(vms)
+    assert calls == ["images", "plans"]
+
+    names, _ = catalog.resolve([*vms, vm(b.image_id, flavor)])
+    assert names[b.image_id] == "b"
+    assert calls == ["images", "plans", "images"]
+
+    # 知らないプランはキャッシュを使わずに取得し直し,それでもなければ諦める
+    _, plans = catalog.resolve([vm(a.image_id, added), vm(a.image_id, unknown)])
+    assert set(plans) == {flavor, added}
+    catalog.resolve([vm(a.image_id, unknown)])
+    assert calls == ["images", "plans", "images", "refresh"]
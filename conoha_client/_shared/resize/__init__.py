@@ -0,0 +1 @@
+from .repo import ResizeTarget, resize_and_confirm, resize_vms  # noqa: F401
@@ -0,0 +1,114 @@
+"""プラン変更を確定まで行う.
+
+必要ならシャットダウンし,プラン変更,確定待ち,確定(失敗したら取り消し),起動まで行う
+"""
+from __future__ import annotations
+
+from contextlib import suppress
+from typing import Any, Callable
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from conoha_client.features._shared.concurrent import (
+    MAX_WORKERS,
+    Outcome,
+    map_concurrently,
+)
+from conoha_client.features.vm.domain import VM, VMStatus
+from conoha_client.features.vm.repo.wait import DEFAULT_WAIT_TIMEOUT, wait_vm
+from conoha_client.features.vm_actions.repo import VMActionCommands
+
+Wait = Callable[[UUID, tuple[VMStatus, ...]], object]
+View = Callable[[UUID, str], Any]
+
+# 確定・取り消し後は変更前の電源状態に戻る
+SETTLED = (VMStatus.SHUTOFF, VMStatus.ACTIVE)
+
+
+class ResizeTarget(BaseModel, frozen=True):
+    """プラン変更対象と変更後のプラン."""
+
+    vm: VM
+    flavor_id: UUID
+
+
+def _wait(vm_id: UUID, expected: tuple[VMStatus, ...]) -> object:
+    return wait_vm(vm_id, expected)
+
+
+def resize_and_confirm(
+    target: ResizeTarget,
+    cmd_factory: Callable[[UUID], VMActionCommands] = lambda i: VMActionCommands(
+        vm_id=i,
+    ),
+    wait: Wait = _wait,
+    view: View | None = None,
+) -> bool:
+    """1台のプラン変更を確定まで行う.
+
+    失敗したら取り消しを試みてから例外を送出する
+    元々起動していたVMは失敗しても起動し直す
+    :return: 変更したか. 既に同じプランなら何もしない
+    """
+    vm = target.vm
+    if vm.flavor_id == target.flavor_id:
+        return False
+
+    def _step(msg: str) -> None:
+        if view is not None:
+            view(vm.vm_id, msg)
+
+    cmd = cmd_factory(vm.vm_id)
+    was_active = vm.status == VMStatus.ACTIVE
+    if not vm.status.is_shutoff():
+        _step("shutting down")
+        cmd.shutdown()
+        wait(vm.vm_id, (VMStatus.SHUTOFF,))
+
+    def _boot() -> None:
+        if was_active:
+            _step("booting")
+            cmd.boot()
+            wait(vm.vm_id, (VMStatus.ACTIVE,))
+
+    try:
+        _step("resizing")
+        cmd.resize(target.flavor_id)
+        wait(vm.vm_id, (VMStatus.VERIFY_RESIZE,))
+        _step("confirming")
+        cmd.confirm_resize()
+        wait(vm.vm_id, SETTLED)
+    except Exception:
+        _step("reverting")
+        with suppress(Exception):
+            cmd.revert_resize()
+            wait(vm.vm_id, SETTLED)
+        with suppress(Exception):
+            _boot()
+        raise
+    _boot()
+    _step("resized")
+    return True
+
+
+def resize_vms(
+    targets: list[ResizeTarget],
+    max_workers: int = MAX_WORKERS,
+    view: View | None = None,
+    timeout_sec: float = DEFAULT_WAIT_TIMEOUT,
+) -> list[Outcome[ResizeTarget, bool]]:
+    """複数VMのプラン変更を並行して確定まで行う.
+
+    :param max_workers: 同時にプラン変更するVM数の上限
+    :param timeout_sec: 停止,変更,確定,起動それぞれの完了を待つ最大秒数
+    """
+
+    def _wait(vm_id: UUID, expected: tuple[VMStatus, ...]) -> object:
+        return wait_vm(vm_id, expected, timeout_sec=timeout_sec)
+
+    return map_concurrently(
+        lambda t: resize_and_confirm(t, wait=_wait, view=view),
+        targets,
+        max_workers,
+    )
@@ -0,0 +1,91 @@
+"""resize pipeline test."""
+from __future__ import annotations
+
+from uuid import UUID, uuid4
+
+import pytest
+
+from conoha_client.features.vm.domain import VM, VMStatus
+from conoha_client.features.vm.repo.test_wait import server
+from conoha_client.features.vm_actions.domain.errors import VMResizeError
+
+from .repo import ResizeTarget, resize_and_confirm
+
+
+class FakeCommands:
+    """VMActionCommandsの代わりに呼ばれた操作を記録する."""
+
+    def __init__(self, fail_on: str | None = None) -> None:
+        """Init."""
+        self.calls: list[str] = []
+        self.fail_on = fail_on
+
+    def __getattr__(self, name: str) -> object:
+        """操作名を記録する."""
+
+        def _action(*_: object) -> None:
+            self.calls.append(name)
+            if name == self.fail_on:
+                raise VMResizeError(name)
+
+        return _action
+
+
+def _target(status: VMStatus) -> ResizeTarget:
+    return ResizeTarget(
+        vm=VM.model_validate(server(uuid4(), status)),
+        flavor_id=uuid4(),
+    )
+
+
+def _waited(calls: list[VMStatus]) -> object:
+    return lambda _, expected: calls.append(expected[0])
+
+
+def test_resize_and_confirm() -> None:
+    """起動中ならシャットダウンしてから変更し,確定後に起動する."""
+    cmd = FakeCommands()
+    waited: list[VMStatus] = []
+    assert resize_and_confirm(
+        _target(VMStatus.ACTIVE),
+        cmd_factory=lambda _: cmd,
+        wait=_waited(waited),
+    )
+    assert cmd.calls == ["shutdown", "resize", "confirm_resize", "boot"]
+    assert waited == [
+        VMStatus.SHUTOFF,
+        VMStatus.VERIFY_RESIZE,
+        VMStatus.SHUTOFF,
+        VMStatus.ACTIVE,
+    ]
+
+    cmd = FakeCommands()
+    resize_and_confirm(
+        _target(VMStatus.SHUTOFF),
+        cmd_factory=lambda _: cmd,
+        wait=_waited([]),
+    )
+    assert cmd.calls == ["resize", "confirm_resize"]
+
+
+def test_revert() -> None:
+    """確定に失敗したら取り消して元の電源状態に戻す."""
+    cmd = FakeCommands(fail_on="confirm_resize")
+    with pytest.raises(VMResizeError):
+        resize_and_confirm(
+            _target(VMStatus.ACTIVE),
+            cmd_factory=lambda _: cmd,
+            wait=_waited([]),
+        )
+    assert cmd.calls[-2:] == ["revert_resize", "boot"]
+
+
+def test_same_flavor() -> None:
+    """同じプランなら何もしない."""
+    t = _target(VMStatus.ACTIVE)
+    t = t.model_copy(update={"flavor_id": t.vm.flavor_id})
+
+    def _fail(_: UUID) -> FakeCommands:
+        raise AssertionError
+
+    assert not resize_and_confirm(t, cmd_factory=_fail)
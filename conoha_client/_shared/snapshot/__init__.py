@@ -2,5 +2,7 @@ from .repo import (  # noqa: F401
     Dependency,
     complete_snapshot_by_name,
     list_snapshots,
+    remove_snapshots,
     save_snapshot,
+    save_snapshots,
 )
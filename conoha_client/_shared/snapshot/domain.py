@@ -0,0 +1,47 @@
+"""snapshot shared domain."""
+from __future__ import annotations
+
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class SaveTarget(BaseModel, frozen=True):
+    """スナップショット保存対象."""
+
+    vm_id: UUID
+    name: str
+
+
+class SnapshotNameDuplicatedError(Exception):
+    """同時に保存するスナップショット名が重複している."""
+
+
+class SnapshotSaveFailedError(Exception):
+    """スナップショットの保存に失敗した."""
+
+
+class SnapshotWaitTimeoutError(Exception):
+    """スナップショットの保存が期限内に完了しなかった."""
+
+
+class SaveTargetParseError(Exception):
+    """vm_id:nameの形式ではない."""
+
+
+def parse_save_targets(params: list[str]) -> list[tuple[str, str]]:
+    """(vm_id前方一致, スナップショット名)の組へ変換.
+
+    後方互換のため区切り文字を含まない2つの引数は1組として扱う
+    """
+    if len(params) == 2 and all(":" not in p for p in params):  # noqa: PLR2004
+        return [(params[0], params[1])]
+
+    pairs = []
+    for p in params:
+        vm_id, sep, name = p.partition(":")
+        if sep == "" or vm_id == "" or name == "":
+            msg = f"{p}はvm_id:nameの形式で指定してください"
+            raise SaveTargetParseError(msg)
+        pairs.append((vm_id, name))
+    return pairs
@@ -2,14 +2,28 @@
 
 from __future__ import annotations
 
-from typing import Callable
+from typing import Any, Callable
 from uuid import UUID
 
+from conoha_client.features._shared.concurrent import (
+    MAX_WORKERS,
+    Outcome,
+    attempt,
+    map_concurrently,
+)
 from conoha_client.features._shared.model_list.domain import by, startswith
 from conoha_client.features.image.domain.image import Image, ImageList
 from conoha_client.features.image.repo import list_images, remove_image
 from conoha_client.features.vm_actions.repo import VMActionCommands
 
+from .domain import (
+    SaveTarget,
+    SnapshotNameDuplicatedError,
+    SnapshotSaveFailedError,
+    SnapshotWaitTimeoutError,
+)
+from .tracker import Key, SnapshotProgress, SnapshotTracker
+
 
 def list_snapshots() -> ImageList:
     """List snapshots."""
@@ -40,3 +54,101 @@ def save_snapshot(
         remove_image(old)
         return old.image_id
     return None
+
+
+DEFAULT_SAVE_TIMEOUT_SEC = 3600.0
+
+
+def save_snapshots(
+    targets: list[SaveTarget],
+    dep: Dependency = list_snapshots,
+    interval_sec: float = 10,
+    view: Callable[[dict[str, int]], Any] | None = None,
+    timeout_sec: float | None = DEFAULT_SAVE_TIMEOUT_SEC,
+) -> list[Outcome[SaveTarget, UUID | None]]:
+    """複数VMを並行してスナップショット保存する.
+
+    同一名の既存スナップショットは新しい方の保存完了後に削除する
+    保存に失敗したかtimeout_sec秒で完了しなかった対象は既存を残して失敗とする
+    :return: 対象ごとの削除した既存スナップショットのID
+    """
+    names = [t.name for t in targets]
+    if len(names) != len(set(names)):
+        msg = f"スナップショット名が重複しています:{names}"
+        raise SnapshotNameDuplicatedError(msg)
+
+    snapshots = dep()
+    olds = {t.name: snapshots.find_one_or_none_by(by("name", t.name)) for t in targets}
+    requested = map_concurrently(
+        lambda t: VMActionCommands(vm_id=t.vm_id).snapshot(t.name),
+        targets,
+    )
+
+    old_ids = {img.image_id for img in olds.values() if img is not None}
+    tracker = SnapshotTracker(dep, exclude_ids=old_ids)
+    for o in requested:
+        if o.is_ok():
+            tracker.register(o.arg.name)
+    progresses = tracker.wait(
+        interval_sec,
+        view=None if view is None else lambda ps: view(_percentages(ps)),
+        timeout_sec=timeout_sec,
+    )
+    settled = [_settle(o, progresses, timeout_sec) for o in requested]
+
+    def _remove_old(t: SaveTarget) -> UUID | None:
+        old = olds[t.name]
+        if old is None:
+            return None
+        remove_image(old)
+        return old.image_id
+
+    saved = [o.arg for o in settled if o.is_ok()]
+    removed = {o.arg: o for o in map_concurrently(_remove_old, saved)}
+    return [removed.get(o.arg, o) for o in settled]
+
+
+def _settle(
+    requested: Outcome[SaveTarget, Any],
+    progresses: dict[Key, SnapshotProgress],
+    timeout_sec: float | None,
+) -> Outcome[SaveTarget, Any]:
+    """保存を要求できた対象のうち完了しなかったものを失敗にする."""
+    if not requested.is_ok():
+        return requested
+    t = requested.arg
+    p = progresses[t.name]
+    if p.failed:
+        msg = f"{t.name}の保存に失敗しました"
+        return Outcome(arg=t, error=SnapshotSaveFailedError(msg))
+    if not p.is_done():
+        msg = f"{t.name}は{timeout_sec}秒待っても{p.progress}%のままです"
+        return Outcome(arg=t, error=SnapshotWaitTimeoutError(msg))
+    return requested
+
+
+def _percentages(progresses: dict[Key, SnapshotProgress]) -> dict[str, int]:
+    return {str(k): p.progress for k, p in progresses.items()}
+
+
+def remove_snapshots(
+    pre_names: list[str],
+    dep: Dependency = list_snapshots,
+    max_workers: int = MAX_WORKERS,
+) -> list[Outcome[str, Image]]:
+    """前方一致する複数のスナップショットを1回の一覧取得で特定して並行削除する.
+
+    :return: 指定名ごとの削除したスナップショット
+    """
+    index = dep().prefix_index("name")
+    resolved = [attempt(index.find_one, n) for n in pre_names]
+    images = {o.value.image_id: o.value for o in resolved if o.is_ok()}
+    removed = map_concurrently(remove_image, list(images.values()), max_workers)
+    errors = {o.arg.image_id: o.error for o in removed}
+
+    def _merge(o: Outcome[str, Image]) -> Outcome[str, Image]:
+        if not o.is_ok():
+            return o
+        return Outcome(arg=o.arg, value=o.value, error=errors[o.value.image_id])
+
+    return [_merge(o) for o in resolved]
@@ -0,0 +1,150 @@
+"""snapshot shared repository test."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from uuid import UUID, uuid4
+
+import pytest
+
+from conoha_client.features._shared.conftest import prepare
+from conoha_client.features._shared.endpoints.endpoints import Endpoints
+from conoha_client.features._shared.model_list.domain import (
+    MultipleMatchError,
+    NotMatchError,
+)
+from conoha_client.features.image.domain.errors import DeletePriorImageForbiddenError
+from conoha_client.features.image.domain.image import Image, ImageList
+
+from .domain import (
+    SaveTarget,
+    SaveTargetParseError,
+    SnapshotNameDuplicatedError,
+    SnapshotSaveFailedError,
+    SnapshotWaitTimeoutError,
+    parse_save_targets,
+)
+from .repo import remove_snapshots, save_snapshots
+
+if TYPE_CHECKING:
+    from requests_mock import Mocker
+
+
+def snapshot(name: str, progress: int, image_id: UUID | None = None) -> Image:
+    """Fixture."""
+    return Image.model_validate(
+        {
+            "id": str(image_id or uuid4()),
+            "name": name,
+            "metadata": {"os_type": "lin", "image_type": "snapshot"},
+            "minDisk": 30,
+            "progress": progress,
+            "created": "2023-11-08T17:56:00+09:00",
+            "updated": "2023-11-08T17:56:00+09:00",
+            "OS-EXT-IMG-SIZE:size": 0,
+        },
+    )
+
+
+def test_parse_save_targets() -> None:
+    """後方互換の2引数とvm_id:name形式."""
+    assert parse_save_targets(["5f", "test"]) == [("5f", "test")]
+    assert parse_save_targets(["5f:a", "ea:b"]) == [("5f", "a"), ("ea", "b")]
+    with pytest.raises(SaveTargetParseError):
+        parse_save_targets(["5f:a", "ea"])
+
+
+def test_save_snapshots(
+    requests_mock: Mocker,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """全ての保存完了後に同一名の既存スナップショットを削除する."""
+    prepare(requests_mock, monkeypatch)
+    a, b = SaveTarget(vm_id=uuid4(), name="a"), SaveTarget(vm_id=uuid4(), name="b")
+    for t in [a, b]:
+        requests_mock.post(
+            Endpoints.COMPUTE.tenant_id_url(f"servers/{t.vm_id}/action"),
+            status_code=202,
+        )
+    old = snapshot("a", 100)
+    delete = requests_mock.delete(
+        Endpoints.IMAGE.url(f"images/{old.image_id}"),
+        status_code=204,
+    )
+    new_a, new_b = uuid4(), uuid4()
+    listings = iter(
+        [
+            [old],
+            [old, snapshot("a", 50, new_a)],
+            [old, snapshot("a", 100, new_a), snapshot("b", 25, new_b)],
+            [old, snapshot("a", 100, new_a), snapshot("b", 100, new_b)],
+        ],
+    )
+    views = []
+
+    def dep() -> ImageList:
+        assert not delete.called
+        return ImageList(next(listings))
+
+    outcomes = save_snapshots([a, b], dep=dep, interval_sec=0, view=views.append)
+    assert [o.value for o in outcomes] == [old.image_id, None]
+    assert views[-1] == {"a": 100, "b": 100}
+    assert delete.call_count == 1
+
+    with pytest.raises(SnapshotNameDuplicatedError):
+        save_snapshots([a, a], dep=dep)
+
+
+def test_remove_snapshots(
+    requests_mock: Mocker,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """1回の一覧取得で全ての名前を解決して指定名ごとに結果を返す."""
+    prepare(requests_mock, monkeypatch)
+    imgs = [snapshot(n, 100) for n in ["dev", "dev2", "prod", "prior"]]
+    for img, status in zip(imgs, [204, 204, 204, 403]):
+        requests_mock.delete(
+            Endpoints.IMAGE.url(f"images/{img.image_id}"),
+            status_code=status,
+        )
+    calls = []
+
+    def dep() -> ImageList:
+        calls.append(1)
+        return ImageList(imgs)
+
+    outcomes = remove_snapshots(["dev2", "pro", "pr", "de", "x", "pri"], dep=dep)
+    assert len(calls) == 1
+    assert [o.value for o in outcomes[:2]] == [imgs[1], imgs[2]]
+    assert [type(o.error) for o in outcomes[2:]] == [
+        MultipleMatchError,
+        MultipleMatchError,
+        NotMatchError,
+        DeletePriorImageForbiddenError,
+    ]
+
+
+def test_save_snapshots_not_completed(
+    requests_mock: Mocker,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """失敗したものと期限内に完了しないものは既存を残して失敗とする."""
+    prepare(requests_mock, monkeypatch)
+    a, b = SaveTarget(vm_id=uuid4(), name="a"), SaveTarget(vm_id=uuid4(), name="b")
+    for t in [a, b]:
+        requests_mock.post(
+            Endpoints.COMPUTE.tenant_id_url(f"servers/{t.vm_id}/action"),
+            status_code=202,
+        )
+    old = snapshot("a", 100)
+    failed = snapshot("a", 30).model_copy(update={"status": "ERROR"})
+    listings = iter([[old]])
+
+    def dep() -> ImageList:
+        return ImageList(next(listings, [old, failed, snapshot("b", 10)]))
+
+    outcomes = save_snapshots([a, b], dep=dep, interval_sec=0.01, timeout_sec=0.05)
+    assert [type(o.error) for o in outcomes] == [
+        SnapshotSaveFailedError,
+        SnapshotWaitTimeoutError,
+    ]
+    assert all(r.method != "DELETE" for r in requests_mock.request_history)
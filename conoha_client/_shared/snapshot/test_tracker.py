@@ -0,0 +1,66 @@
+"""snapshot progress tracker test."""
+from __future__ import annotations
+
+from datetime import timedelta
+from uuid import uuid4
+
+from conoha_client.features.image.domain.image import ImageList
+
+from .test_repo import snapshot
+from .tracker import SnapshotTracker
+
+
+def test_tracker() -> None:
+    """1回の一覧取得で名前とIDで登録した全ての進捗を更新する."""
+    old, a_id, b_id = uuid4(), uuid4(), uuid4()
+    listings = iter(
+        [
+            [snapshot("a", 100, old)],
+            [snapshot("a", 100, old), snapshot("a", 20, a_id), snapshot("b", 0, b_id)],
+            [snapshot("a", 60, a_id), snapshot("b", 100, b_id)],
+            [snapshot("a", 100, a_id)],
+        ],
+    )
+    calls = []
+
+    def dep() -> ImageList:
+        calls.append(1)
+        return ImageList(next(listings))
+
+    now = iter(range(0, 100, 5))
+    tracker = SnapshotTracker(dep, exclude_ids={old}, clock=lambda: next(now))
+    done = []
+    tracker.register("a", on_done=lambda p: done.append(p.key))
+    tracker.register(b_id, on_done=lambda p: done.append(p.key))
+
+    assert tracker.poll()["a"].progress == 0
+    assert tracker.poll()["a"].image_id == a_id
+    p = tracker.poll()["a"]
+    assert p.progress == 60  # noqa: PLR2004
+    assert p.eta == timedelta(seconds=10)
+    assert done == [b_id]
+    assert tracker.poll(max_age_sec=60)["a"].progress == 60  # noqa: PLR2004
+    assert len(calls) == 3  # noqa: PLR2004
+
+    progresses = tracker.wait(interval_sec=0)
+    assert all(p.is_done() for p in progresses.values())
+    assert done == [b_id, "a"]
+    tracker.poll()
+    assert len(calls) == 4  # noqa: PLR2004
+
+
+def test_wait_timeout() -> None:
+    """期限を過ぎたら未完了のまま返し,失敗したものは待たない."""
+    a_id = uuid4()
+    failed = snapshot("b", 40).model_copy(update={"status": "ERROR"})
+    sleeps = [0.0]
+    tracker = SnapshotTracker(
+        lambda: ImageList([snapshot("a", 10, a_id), failed]),
+        clock=lambda: sum(sleeps),
+    )
+    tracker.register("a")
+    tracker.register("b")
+    progresses = tracker.wait(interval_sec=10, sleep=sleeps.append, timeout_sec=12)
+    assert progresses["b"].failed
+    assert not progresses["a"].is_settled()
+    assert sleeps == [0, 10, 2]
@@ -0,0 +1,193 @@
+"""複数スナップショットの保存進捗の追跡.
+
+登録した全てのスナップショットを1回の一覧取得でまとめて更新する
+e.g. 50件を並行して保存しても問い合わせは1間隔に1回
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Callable
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from conoha_client.features._shared import metrics
+
+if TYPE_CHECKING:
+    from conoha_client.features.image.domain.image import ImageList
+
+COMPLETED = 100
+# 保存に失敗したスナップショットの状態
+FAILED_STATUSES = frozenset({"ERROR", "DELETED", "KILLED"})
+
+Key = UUID | str
+Callback = Callable[["SnapshotProgress"], Any]
+
+
+class SnapshotProgress(BaseModel, frozen=True):
+    """1スナップショットの保存進捗."""
+
+    key: Key = Field(description="登録したイメージIDか名前")
+    image_id: UUID | None = Field(None, description="一覧に現れるまではNone")
+    progress: int = 0
+    eta: timedelta | None = Field(None, description="進捗の速さから見積もった残り時間")
+    failed: bool = Field(default=False, description="保存に失敗した")
+
+    def is_done(self) -> bool:
+        """保存が完了した."""
+        return self.progress >= COMPLETED
+
+    def is_settled(self) -> bool:
+        """完了したか失敗して,これ以上待つ必要がない."""
+        return self.is_done() or self.failed
+
+
+class _Entry:
+    """登録した1スナップショットの観測値."""
+
+    def __init__(self, key: Key, on_done: Callback | None) -> None:
+        self.progress = SnapshotProgress(key=key)
+        self.on_done = on_done
+        self.first: tuple[float, int] | None = None
+
+    def update(
+        self,
+        image_id: UUID,
+        progress: int,
+        now: float,
+        failed: bool,
+    ) -> bool:
+        """観測値を反映する. 完了したらTrue."""
+        if self.first is None:
+            self.first = (now, progress)
+        started, initial = self.first
+        eta = None
+        if progress >= COMPLETED:
+            eta = timedelta(0)
+        elif progress > initial and now > started:
+            rate = (progress - initial) / (now - started)
+            eta = timedelta(seconds=(COMPLETED - progress) / rate)
+        was_done = self.progress.is_done()
+        self.progress = self.progress.model_copy(
+            update={
+                "image_id": image_id,
+                "progress": progress,
+                "eta": eta,
+                "failed": failed,
+            },
+        )
+        return not was_done and self.progress.is_done()
+
+
+class SnapshotTracker:
+    """イメージIDか名前で登録したスナップショットの保存進捗."""
+
+    def __init__(
+        self,
+        dep: Callable[[], ImageList],
+        exclude_ids: set[UUID] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Init.
+
+        :param dep: スナップショット一覧の取得
+        :param exclude_ids: 名前で探すときに除く保存前からある同一名のスナップショット
+        """
+        self.dep = dep
+        self.exclude_ids = set(exclude_ids or ())
+        self.clock = clock
+        self._entries: dict[Key, _Entry] = {}
+        self._lock = threading.Lock()
+        self._polled: float | None = None
+
+    def register(self, key: Key, on_done: Callback | None = None) -> None:
+        """追跡を始める. 登録済みなら進捗を捨てて追跡し直す.
+
+        :param on_done: 完了を観測したときに1度だけ呼ぶ
+        """
+        with self._lock:
+            self._entries[key] = _Entry(key, on_done)
+
+    def unregister(self, key: Key) -> None:
+        """追跡をやめる."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def progress(self, key: Key) -> SnapshotProgress:
+        """最後に観測した進捗."""
+        with self._lock:
+            return self._entries[key].progress
+
+    def progresses(self) -> dict[Key, SnapshotProgress]:
+        """最後に観測した全ての進捗."""
+        with self._lock:
+            return {k: e.progress for k, e in self._entries.items()}
+
+    def all_done(self) -> bool:
+        """登録した全てのスナップショットの保存が完了した."""
+        return all(p.is_done() for p in self.progresses().values())
+
+    def poll(self, max_age_sec: float = 0) -> dict[Key, SnapshotProgress]:
+        """未完了のスナップショットを1回の一覧取得でまとめて更新する.
+
+        失敗したスナップショットはそれ以上更新しない
+        :param max_age_sec: 前回の取得からこの秒数以内なら取得しない
+            複数のスレッドから呼んでも1間隔に1回の取得にまとまる
+        """
+        with self._lock:
+            now = self.clock()
+            pending = {
+                k: e
+                for k, e in self._entries.items()
+                if not e.progress.is_settled()
+            }
+            fresh = self._polled is not None and now - self._polled < max_age_sec
+            if len(pending) == 0 or fresh:
+                return {k: e.progress for k, e in self._entries.items()}
+            metrics.count_poll("snapshot")
+            images = self.dep()
+            self._polled = now = self.clock()
+            by_id = {img.image_id: img for img in images}
+            by_name = {
+                img.name: img for img in images if img.image_id not in self.exclude_ids
+            }
+            completed = []
+            for k, e in pending.items():
+                img = by_id.get(k) if isinstance(k, UUID) else by_name.get(k)
+                if img is None:
+                    continue
+                failed = img.status in FAILED_STATUSES
+                if e.update(img.image_id, img.progress, now, failed):
+                    completed.append(e)
+            result = {k: e.progress for k, e in self._entries.items()}
+        for e in completed:
+            if e.on_done is not None:
+                e.on_done(e.progress)
+        return result
+
+    def wait(
+        self,
+        interval_sec: float = 10,
+        view: Callable[[dict[Key, SnapshotProgress]], Any] | None = None,
+        sleep: Callable[[float], object] = time.sleep,
+        timeout_sec: float | None = None,
+    ) -> dict[Key, SnapshotProgress]:
+        """登録した全てのスナップショットが完了するか失敗するまで待つ.
+
+        :param timeout_sec: この秒数を過ぎたら未完了のまま返す. Noneなら期限なし
+        """
+        deadline = None if timeout_sec is None else self.clock() + timeout_sec
+        while True:
+            progresses = self.poll()
+            if view is not None:
+                view(progresses)
+            if all(p.is_settled() for p in progresses.values()):
+                return progresses
+            if deadline is not None:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    return progresses
+                interval_sec = min(interval_sec, remaining)
+            sleep(interval_sec)
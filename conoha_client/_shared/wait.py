@@ -0,0 +1,63 @@
+"""操作が受け付けられた後にVMの状態変化を待つオプション."""
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING, Any, Callable, ParamSpec
+
+import click
+
+from conoha_client.features.vm.domain import VMStatus
+from conoha_client.features.vm.repo.wait import DEFAULT_WAIT_TIMEOUT, wait_vm
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+    from conoha_client.features.vm.domain import VM
+
+P = ParamSpec("P")
+
+
+def wait_options(f: Callable[P, Any]) -> Callable:
+    """--waitと--wait-timeoutを追加する. 引数wait_timeoutは待たないならNone."""
+
+    @click.option(
+        "--wait",
+        is_flag=True,
+        default=False,
+        help="VMが目的の状態になるまで待つ. ERRORになれば失敗する",
+    )
+    @click.option(
+        "--wait-timeout",
+        type=click.FloatRange(min=0, min_open=True),
+        default=DEFAULT_WAIT_TIMEOUT,
+        show_default=True,
+        help="--waitで待つ最大秒数",
+    )
+    @functools.wraps(f)
+    def wrapper(
+        *args: P.args,
+        wait: bool,
+        wait_timeout: float,
+        **kwargs: P.kwargs,
+    ) -> Any:  # noqa: ANN401
+        return f(*args, wait_timeout=wait_timeout if wait else None, **kwargs)
+
+    return wrapper
+
+
+def _progress(vm: VM | None, elapsed: float) -> None:
+    status = "-" if vm is None else vm.status.value
+    task = "" if vm is None or vm.task_state is None else f"({vm.task_state})"
+    click.echo(f"[{elapsed:5.0f}s] {status}{task}", err=True)
+
+
+def wait_if_needed(
+    vm_id: UUID,
+    wait_timeout: float | None,
+    expected: tuple[VMStatus, ...] = (VMStatus.ACTIVE,),
+) -> None:
+    """wait_optionsで指定されていれば進捗を表示しながら待つ."""
+    if wait_timeout is None:
+        return
+    vm = wait_vm(vm_id, expected, timeout_sec=wait_timeout, view=_progress)
+    click.echo(f"{vm.vm_id} is {vm.status.value}")
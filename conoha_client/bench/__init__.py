@@ -0,0 +1,2 @@
+"""client side benchmark."""
+from .cli import bench_cli  # noqa: F401
@@ -0,0 +1,121 @@
+"""bench cli."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import click
+
+from conoha_client.features._shared.view.domain import view_options
+
+from .codec import compare_json_backends
+from .repo import (
+    MissingAdminPassError,
+    Workload,
+    create_workloads,
+    run_workload,
+)
+
+if TYPE_CHECKING:
+    from .codec import CodecResult
+    from .domain import BenchResult
+
+
+@click.group("bench")
+def bench_cli() -> None:
+    """クライアント側のレイテンシ計測."""
+
+
+@bench_cli.command("ls")
+@view_options
+def list_workloads() -> list[Workload]:
+    """計測可能なworkload一覧."""
+    return list(create_workloads().values())
+
+
+@bench_cli.command("run")
+@click.argument(
+    "names",
+    nargs=-1,
+    required=True,
+    type=click.Choice(list(create_workloads())),
+)
+@click.option(
+    "--iterations",
+    "-n",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="workloadごとの実行回数",
+)
+@click.option(
+    "--concurrency",
+    "-c",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="並行実行数",
+)
+@click.option(
+    "--admin-password",
+    envvar="OS_ADMIN_PASSWORD",
+    show_envvar=True,
+    help="addで作成するVMのrootユーザーのパスワード",
+)
+@click.option(
+    "--keypair-name",
+    envvar="OS_SSHKEY_NAME",
+    show_envvar=True,
+    help="addで作成するVMのsshkeyのペア名",
+)
+@click.option(
+    "--yes",
+    "-y",
+    is_flag=True,
+    default=False,
+    help="VMの追加・停止を伴うworkloadの確認を省略",
+)
+@view_options
+def run_cli(  # noqa: PLR0913
+    names: tuple[str, ...],
+    iterations: int,
+    concurrency: int,
+    admin_password: str | None,
+    keypair_name: str | None,
+    yes: bool,
+) -> list[BenchResult]:
+    """Workloadを計測する.
+
+    OS_CONOHA_BASE_URLで偽サーバーへ向けての実行を想定している
+    """
+    if "add" in names and admin_password is None:
+        raise click.UsageError(str(MissingAdminPassError()))
+    workloads = create_workloads(admin_password, keypair_name)
+    targets = [workloads[n] for n in names]
+    destructives = [w.name for w in targets if w.destructive]
+    if len(destructives) > 0 and not yes:
+        msg = f"{destructives}はVMを操作して課金が発生し得ます.実行しますか?"
+        click.confirm(msg, abort=True)
+    return [run_workload(w, iterations, concurrency) for w in targets]
+
+
+@bench_cli.command("json")
+@click.option(
+    "--scale",
+    "-s",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="fixtureを水増しする倍率",
+)
+@click.option(
+    "--iterations",
+    "-n",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="計測回数",
+)
+@view_options
+def json_cli(scale: int, iterations: int) -> list[CodecResult]:
+    """JSON変換をbackendごとに比較する. APIは呼ばない."""
+    return compare_json_backends(scale, iterations)
@@ -0,0 +1,142 @@
+"""JSON変換の計測.
+
+APIを呼ばずに手元のfixtureを水増ししたレスポンスボディで比較する
+"""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+from pydantic import BaseModel, Field
+
+from conoha_client.features._shared.fastjson import (
+    STDLIB,
+    available_backends,
+    validate_list,
+)
+from conoha_client.features.billing.domain import Invoice
+from conoha_client.features.image.domain import Image
+
+from .domain import percentile
+
+if TYPE_CHECKING:
+    from conoha_client.features._shared.fastjson import JsonBackend
+
+_IMAGE_FIXTURE = (
+    Path(__file__).resolve().parents[1]
+    / "features/image/domain/fixture20231014.json"
+)
+_INVOICE_FIXTURE = (
+    Path(__file__).resolve().parents[1]
+    / "features/billing/domain/fixture_invoice.json"
+)
+
+
+class Payload(BaseModel, frozen=True):
+    """計測用のレスポンスボディ."""
+
+    name: str
+    model: type[BaseModel]
+    key: str
+    content: bytes
+
+
+class CodecResult(BaseModel, frozen=True):
+    """JSON変換の計測結果. 各値はp50."""
+
+    payload: str
+    backend: str
+    size_kb: float
+    decode_ms: float = Field(description="bytesからdict")
+    validate_ms: float = Field(description="dictからモデル. pydanticはbytesから")
+    encode_ms: float = Field(description="表示用のdictからJSON文字列")
+
+
+def _image_body(j: dict) -> dict:
+    """fixtureの1行をimages/detailの要素の形に戻す."""
+    return {
+        "id": j["image_id"],
+        "name": j["name"],
+        "metadata": {
+            "dst": j["dist"],
+            "app": j["app"],
+            "os_type": j["os"],
+            "image_type": j.get("image_type"),
+        },
+        "created": j["created"],
+        "updated": j["created"],
+        "minDisk": j["minDisk"],
+        "progress": 100,
+        "OS-EXT-IMG-SIZE:size": 999,
+    }
+
+
+def create_payloads(scale: int) -> list[Payload]:
+    """Fixtureをscale倍に水増ししたレスポンスボディ."""
+    images = [_image_body(j) for j in STDLIB.loads(_IMAGE_FIXTURE.read_text())]
+    invoices = STDLIB.loads(_INVOICE_FIXTURE.read_text())
+    return [
+        Payload(
+            name=f"images/detail x{scale}",
+            model=Image,
+            key="images",
+            content=STDLIB.dumps({"images": images * scale}).encode(),
+        ),
+        Payload(
+            name=f"billing-invoices x{scale}",
+            model=Invoice,
+            key="billing_invoices",
+            content=STDLIB.dumps({"billing_invoices": invoices * scale}).encode(),
+        ),
+    ]
+
+
+def _p50_ms(func: Callable[[], object], iterations: int) -> float:
+    ls = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        ls.append(time.perf_counter() - started)
+    return round(percentile(ls, 50) * 1000, 3)
+
+
+def _measure(p: Payload, b: JsonBackend, iterations: int) -> CodecResult:
+    body = b.loads(p.content)
+    models = [p.model.model_validate(e) for e in body[p.key]]
+    js = [m.model_dump(mode="json") for m in models]
+    return CodecResult(
+        payload=p.name,
+        backend=b.name,
+        size_kb=round(len(p.content) / 1024, 1),
+        decode_ms=_p50_ms(lambda: b.loads(p.content), iterations),
+        validate_ms=_p50_ms(
+            lambda: [p.model.model_validate(e) for e in body[p.key]],
+            iterations,
+        ),
+        encode_ms=_p50_ms(lambda: b.dumps(js), iterations),
+    )
+
+
+def _measure_pydantic(p: Payload, iterations: int) -> CodecResult:
+    """Dictを経由せずbytesから直接検証する."""
+    return CodecResult(
+        payload=p.name,
+        backend="pydantic",
+        size_kb=round(len(p.content) / 1024, 1),
+        decode_ms=0.0,
+        validate_ms=_p50_ms(
+            lambda: validate_list(p.model, p.content, p.key),
+            iterations,
+        ),
+        encode_ms=0.0,
+    )
+
+
+def compare_json_backends(scale: int, iterations: int) -> list[CodecResult]:
+    """利用可能なJSON変換関数の組ごとに計測する."""
+    ls = []
+    for p in create_payloads(scale):
+        ls.extend([_measure(p, b, iterations) for b in available_backends()])
+        ls.append(_measure_pydantic(p, iterations))
+    return ls
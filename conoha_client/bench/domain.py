@@ -0,0 +1,89 @@
+"""bench domain."""
+from __future__ import annotations
+
+import math
+import threading
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, Field
+
+if TYPE_CHECKING:
+    import requests
+
+
+def percentile(values: list[float], q: float) -> float:
+    """線形補間した百分位数.
+
+    :param values: 計測値
+    :param q: 0から100までの百分位
+    """
+    if len(values) == 0:
+        return 0.0
+    s = sorted(values)
+    k = (len(s) - 1) * q / 100
+    lo = math.floor(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+class CallCounter:
+    """API呼び出し回数をスレッドをまたいで数える.
+
+    transport.add_hookに登録して使う
+    """
+
+    def __init__(self) -> None:
+        """Init."""
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def __call__(self, _res: requests.Response, _elapsed: float) -> None:
+        """レスポンス受信毎に呼ばれる."""
+        with self._lock:
+            self.count += 1
+
+
+class BenchResult(BaseModel, frozen=True):
+    """Workloadの計測結果."""
+
+    workload: str
+    iterations: int
+    concurrency: int
+    errors: int
+    throughput: float = Field(description="1秒あたりの完了操作数")
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    calls_per_op: float = Field(description="1操作あたりのAPI呼び出し回数")
+    throttled_sec: float = Field(0.0, description="流量制限で待たされた秒数")
+
+    @classmethod
+    def summarize(  # noqa: PLR0913
+        cls,
+        workload: str,
+        latencies: list[float],
+        wall_sec: float,
+        n_calls: int,
+        errors: int,
+        concurrency: int,
+        throttled_sec: float = 0.0,
+    ) -> BenchResult:
+        """計測値を集計する.
+
+        :param latencies: 1操作ごとの所要秒数
+        :param wall_sec: 全操作の開始から終了までの秒数
+        :param n_calls: 計測中のAPI呼び出し総数
+        """
+        n = len(latencies)
+        return cls(
+            workload=workload,
+            iterations=n,
+            concurrency=concurrency,
+            errors=errors,
+            throughput=round(n / wall_sec, 3) if wall_sec > 0 else 0.0,
+            p50_ms=round(percentile(latencies, 50) * 1000, 3),
+            p95_ms=round(percentile(latencies, 95) * 1000, 3),
+            p99_ms=round(percentile(latencies, 99) * 1000, 3),
+            calls_per_op=round(n_calls / n, 3) if n > 0 else 0.0,
+            throttled_sec=round(throttled_sec, 3),
+        )
@@ -0,0 +1,224 @@
+"""bench workloads."""
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable
+
+from pydantic import BaseModel, Field
+
+from conoha_client._shared.add_vm.repo import add_vm_command
+from conoha_client._shared.renforced_vm.query import list_reinforced_vms
+from conoha_client.features._shared.endpoints import transport
+from conoha_client.features.billing.repo import list_invoices
+from conoha_client.features.image.domain import (
+    Application,
+    Distribution,
+    DistVersion,
+)
+from conoha_client.features.plan.domain import Memory
+from conoha_client.features.vm.domain import VMStatus
+from conoha_client.features.vm.repo.query import list_vms
+from conoha_client.features.vm.repo.wait import DEFAULT_WAIT_TIMEOUT, wait_vm, wait_vms
+from conoha_client.features.vm_actions.repo import VMActionCommands, remove_vm
+
+from .domain import BenchResult, CallCounter
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+
+class Workload(BaseModel, frozen=True):
+    """計測対象の操作."""
+
+    name: str
+    description: str
+    func: Callable[[], object] = Field(exclude=True)
+    destructive: bool = False
+    # 毎回の計測前に呼んで状態を整える. 計測には含めず,計測は直列になる
+    setup: Callable[[], object] | None = Field(default=None, exclude=True)
+    # 毎回の計測後に成否に関わらず呼んで状態を戻す. setupと同じく計測に含めない
+    teardown: Callable[[], object] | None = Field(default=None, exclude=True)
+
+
+def _stop_all() -> tuple[Callable[[], None], Callable[[], None]]:
+    """起動中のVMを全て停止する操作と,停止したVMを起動し直す後始末."""
+    stopped: list[UUID] = []
+
+    def _boot() -> None:
+        if len(stopped) == 0:
+            return
+        wait_vms(stopped, expected=VMStatus.SHUTOFF, interval_sec=1)
+        for vm_id in stopped:
+            VMActionCommands(vm_id=vm_id).boot()
+        wait_vms(stopped, interval_sec=1)
+        stopped.clear()
+
+    def _stop() -> None:
+        for vm in list_vms():
+            if vm.status == VMStatus.ACTIVE:
+                VMActionCommands(vm_id=vm.vm_id).shutdown()
+                stopped.append(vm.vm_id)
+
+    return _stop, _boot
+
+
+class MissingAdminPassError(ValueError):
+    """addの計測にパスワードがない."""
+
+    def __init__(self) -> None:
+        """Init."""
+        super().__init__("addの計測にはVMのrootユーザーのパスワードを指定してください")
+
+
+def _add_and_wait(
+    admin_pass: str,
+    keypair_name: str | None,
+    timeout_sec: float,
+) -> tuple[Callable[[], None], Callable[[], None]]:
+    """最小構成のVMを追加してACTIVEになるまで待つ操作と,追加したVMを削除する後始末.
+
+    ERRORになるかtimeout_sec秒待ってもACTIVEにならなければ失敗とする
+    """
+    added: list[UUID] = []
+
+    def _add() -> None:
+        cmd = add_vm_command(
+            memory=Memory.MB512,
+            dist=Distribution.UBUNTU,
+            ver=DistVersion(value="latest"),
+            app=Application.null(),
+            admin_pass=admin_pass,
+        )
+        vm_id = cmd(keypair_name).vm_id
+        added.append(vm_id)
+        wait_vm(vm_id, timeout_sec=timeout_sec)
+
+    def _remove() -> None:
+        while len(added) > 0:
+            remove_vm(added[-1])
+            added.pop()
+
+    return _add, _remove
+
+
+def create_workloads(
+    admin_pass: str | None = None,
+    keypair_name: str | None = None,
+    timeout_sec: float = DEFAULT_WAIT_TIMEOUT,
+) -> dict[str, Workload]:
+    """名前付きworkload一覧.
+
+    :param timeout_sec: addで追加したVMがACTIVEになるまで待つ最大秒数
+    :raises MissingAdminPassError: admin_passなしでaddを実行した
+    """
+
+    def _no_password() -> None:
+        raise MissingAdminPassError
+
+    add, remove = _no_password, None
+    if admin_pass is not None:
+        add, remove = _add_and_wait(admin_pass, keypair_name, timeout_sec)
+    stop, boot = _stop_all()
+    ls = [
+        Workload(
+            name="lsvm",
+            description="強化されたVM一覧",
+            func=list_reinforced_vms,
+        ),
+        Workload(
+            name="invoice",
+            description="課金一覧",
+            func=list_invoices,
+        ),
+        Workload(
+            name="add",
+            description="VM追加とACTIVEになるまでの待機. 追加したVMは毎回削除する",
+            func=add,
+            destructive=True,
+            teardown=remove,
+        ),
+        Workload(
+            name="stop",
+            description="起動中の全VMを停止",
+            func=stop,
+            destructive=True,
+            teardown=boot,
+        ),
+    ]
+    return {w.name: w for w in ls}
+
+
+def _timed(func: Callable[[], object]) -> tuple[float, bool]:
+    """所要秒数と成否を返す."""
+    started = time.perf_counter()
+    try:
+        func()
+    except Exception:  # noqa: BLE001
+        return time.perf_counter() - started, False
+    return time.perf_counter() - started, True
+
+
+def _run_serially(
+    workload: Workload,
+    iterations: int,
+    counter: CallCounter,
+) -> tuple[list[tuple[float, bool]], int]:
+    """setupとteardownを挟んで直列に計測する. その間のAPI呼び出し回数も返す."""
+
+    def _untimed(func: Callable[[], object] | None) -> bool:
+        nonlocal untimed_calls
+        if func is None:
+            return True
+        before = counter.count
+        ok = _timed(func)[1]
+        untimed_calls += counter.count - before
+        return ok
+
+    timings = []
+    untimed_calls = 0
+    for _ in range(iterations):
+        ok = _untimed(workload.setup)
+        timings.append(_timed(workload.func) if ok else (0.0, False))
+        _untimed(workload.teardown)
+    return timings, untimed_calls
+
+
+def run_workload(
+    workload: Workload,
+    iterations: int,
+    concurrency: int,
+) -> BenchResult:
+    """Workloadを指定回数,指定並行数で実行して計測する.
+
+    setupがあれば毎回の前に,teardownがあれば毎回の後に呼び,
+    その時間とAPI呼び出しは数えない
+    """
+    counter = CallCounter()
+    throttled = transport.throttle_stats().throttled_sec
+    transport.add_hook(counter)
+    try:
+        if workload.setup is None and workload.teardown is None:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as ex:
+                timings = list(
+                    ex.map(lambda _: _timed(workload.func), range(iterations)),
+                )
+            wall = time.perf_counter() - started
+            untimed_calls = 0
+        else:
+            concurrency = 1
+            timings, untimed_calls = _run_serially(workload, iterations, counter)
+            wall = sum(t for t, _ in timings)
+    finally:
+        transport.remove_hook(counter)
+
+    return BenchResult.summarize(
+        workload=workload.name,
+        latencies=[t for t, _ in timings],
+        wall_sec=wall,
+        n_calls=counter.count - untimed_calls,
+        errors=len([ok for _, ok in timings if not ok]),
+        concurrency=concurrency,
+        throttled_sec=transport.throttle_stats().throttled_sec - throttled,
+    )
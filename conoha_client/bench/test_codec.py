@@ -0,0 +1,14 @@
+"""codec bench test."""
+from __future__ import annotations
+
+from conoha_client.features._shared.fastjson import available_backends
+
+from .codec import compare_json_backends
+
+
+def test_compare_json_backends() -> None:
+    """Payloadごとに各backendとpydanticの結果が並ぶ."""
+    rs = compare_json_backends(scale=2, iterations=1)
+    names = [b.name for b in available_backends()]
+    assert [r.backend for r in rs] == [*names, "pydantic"] * 2
+    assert all(r.size_kb > 0 for r in rs)
@@ -0,0 +1,120 @@
+"""bench test."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from click.testing import CliRunner
+
+from conoha_client.features._shared.conftest import prepare
+from conoha_client.features._shared.endpoints.endpoints import Endpoints
+
+from .cli import bench_cli
+from .domain import BenchResult, percentile
+from .repo import Workload, run_workload
+
+if TYPE_CHECKING:
+    import pytest
+    from requests_mock import Mocker
+
+
+def test_percentile() -> None:
+    """線形補間."""
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 0) == 1.0  # noqa: PLR2004
+    assert percentile(values, 50) == 50.5  # noqa: PLR2004
+    assert percentile(values, 100) == 100.0  # noqa: PLR2004
+    assert percentile([3.0], 99) == 3.0  # noqa: PLR2004
+    assert percentile([], 50) == 0.0  # noqa: PLR2004
+
+
+def test_summarize() -> None:
+    """集計."""
+    r = BenchResult.summarize(
+        workload="x",
+        latencies=[0.1, 0.2, 0.3, 0.4],
+        wall_sec=0.5,
+        n_calls=8,
+        errors=0,
+        concurrency=2,
+    )
+    assert r.throughput == 8.0  # noqa: PLR2004
+    assert r.calls_per_op == 2.0  # noqa: PLR2004
+    assert r.p50_ms == 250.0  # noqa: PLR2004
+
+
+def test_run_workload(
+    requests_mock: Mocker,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """トークン発行とGETの2回がAPI呼び出しとして数えられる."""
+    prepare(requests_mock, monkeypatch)
+    requests_mock.get(
+        Endpoints.COMPUTE.tenant_id_url("flavors/detail"),
+        json={"flavors": []},
+    )
+
+    def fail() -> None:
+        raise ValueError
+
+    ok = Workload(
+        name="ok",
+        description="",
+        func=lambda: Endpoints.COMPUTE.get("flavors/detail"),
+    )
+    # 並行だと同一GETが相乗りして回数が揺れるため直列で数える
+    r = run_workload(ok, iterations=6, concurrency=1)
+    assert r.iterations == 6  # noqa: PLR2004
+    assert r.errors == 0
+    assert r.calls_per_op == 2.0  # noqa: PLR2004
+
+    ng = Workload(name="ng", description="", func=fail)
+    assert run_workload(ng, iterations=2, concurrency=1).errors == 2  # noqa: PLR2004
+
+
+def test_run_workload_setup(
+    requests_mock: Mocker,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """setupは毎回の前に呼ばれ,そのAPI呼び出しは数えない."""
+    prepare(requests_mock, monkeypatch)
+    requests_mock.get(
+        Endpoints.COMPUTE.tenant_id_url("flavors/detail"),
+        json={"flavors": []},
+    )
+    states = []
+
+    def stop() -> None:
+        assert states[-1] == "active"
+        states.append("stopped")
+
+    def boot() -> None:
+        Endpoints.COMPUTE.get("flavors/detail")
+        states.append("active")
+
+    w = Workload(name="stop", description="", func=stop, setup=boot)
+    r = run_workload(w, iterations=3, concurrency=4)
+    assert states == ["active", "stopped"] * 3
+    assert r.errors == 0
+    assert r.concurrency == 1
+    assert r.calls_per_op == 0
+
+    # teardownは失敗しても毎回の後に呼ばれ,最後の計測の後にも状態を戻す
+    def fail_stop() -> None:
+        stop()
+        raise RuntimeError
+
+    states.clear()
+    states.append("active")
+    w = Workload(name="stop", description="", func=fail_stop, teardown=boot)
+    r = run_workload(w, iterations=2, concurrency=4)
+    assert states == ["active", "stopped"] * 2 + ["active"]
+    assert r.errors == 2  # noqa: PLR2004
+    assert r.concurrency == 1
+    assert r.calls_per_op == 0
+
+
+def test_add_requires_password() -> None:
+    """パスワードなしのaddは計測前に失敗する."""
+    result = CliRunner().invoke(bench_cli, ["run", "add", "-y"])
+    assert result.exit_code == 2  # noqa: PLR2004
+    assert "パスワード" in result.output
@@ -1,4 +1,7 @@
 """CLI definition."""
+from __future__ import annotations
+
+from pathlib import Path
 
 import click
 from click_shell import shell
@@ -6,17 +9,38 @@ from click_shell import shell
 from conoha_client._shared.renforced_vm import (
     list_vm_cli,
     reinforced_vm_cli,
+    render_vm_cli,
     shortcut_vm_cli,
 )
+from conoha_client.bench import bench_cli
+from conoha_client.daemon.cli import daemon_cli
 from conoha_client.features import (
     sshkey_cli,
     vm_actions_cli,
     vm_image_cli,
     vm_plan_cli,
 )
-from conoha_client.features.billing.cli import invoice_cli, order_cli, paid_cli
-from conoha_client.graceful_remove import graceful_rm_cli
-from conoha_client.vm import vm_add_cli, vm_resize_cli
+from conoha_client.features._shared.endpoints import transport
+from conoha_client.features._shared.endpoints.cassette import Player, Recorder
+from conoha_client.features._shared.endpoints.config import REGION_NOS, configure
+from conoha_client.features._shared.metrics import start_exporters
+from conoha_client.features.billing.cli import (
+    invoice_cli,
+    invoice_group_cli,
+    order_cli,
+    paid_cli,
+)
+from conoha_client.graceful_remove import (
+    graceful_rm_cli,
+    save_rm_cli,
+    stop_save_rm_cli,
+)
+from conoha_client.vm import (
+    vm_add_cli,
+    vm_add_fleet_cli,
+    vm_apply_cli,
+    vm_resize_cli,
+)
 from conoha_client.vm.rebuild import vm_rebuild_cli
 
 from .snapshot import snapshot_cli
@@ -26,8 +50,68 @@ __version__ = "0.0.0"
 
 # @click.group()
 @shell(prompt="(conoha-client) ")
-def cli() -> None:
+@click.option(
+    "--region-no",
+    type=click.Choice(REGION_NOS),
+    help="OS_CONOHA_REGION_NOより優先",
+)
+@click.option("--timeout", type=float, help="APIのタイムアウト秒数")
+@click.option("--rate-limit", type=float, help="ホストごとの毎秒リクエスト数上限")
+@click.option("--pool-size", type=click.IntRange(min=1), help="ホストごとの接続数")
+@click.option(
+    "--metrics-textfile",
+    type=click.Path(dir_okay=False),
+    help="終了時にPrometheus形式の計測値を書き出すファイル",
+)
+@click.option(
+    "--metrics-port",
+    type=click.IntRange(min=0),
+    help="Prometheus形式の計測値をlocalhostで公開するポート",
+)
+@click.option(
+    "--record",
+    type=click.Path(dir_okay=False),
+    help="APIのリクエストとレスポンスを記録するカセット",
+)
+@click.option(
+    "--replay",
+    type=click.Path(exists=True, dir_okay=False),
+    help="APIへ送信せずにカセットのレスポンスを返す",
+)
+@click.option(
+    "--zero-latency",
+    is_flag=True,
+    default=False,
+    help="--replayで記録した所要時間を待たない",
+)
+def cli(  # noqa: PLR0913
+    region_no: str | None,
+    timeout: float | None,
+    rate_limit: float | None,
+    pool_size: int | None,
+    metrics_textfile: str | None,
+    metrics_port: int | None,
+    record: str | None,
+    replay: str | None,
+    zero_latency: bool,
+) -> None:
     """root."""
+    configure(
+        region_no=region_no,
+        timeout=timeout,
+        rate_limit=rate_limit,
+        pool_size=pool_size,
+        metrics_textfile=metrics_textfile,
+        metrics_port=metrics_port,
+    )
+    start_exporters()
+    if record is not None and replay is not None:
+        msg = "--recordと--replayは同時に指定できません"
+        raise click.UsageError(msg)
+    if record is not None:
+        transport.set_sender(Recorder(Path(record)))
+    if replay is not None:
+        transport.set_sender(Player(Path(replay), zero_latency=zero_latency))
 
 
 @cli.command()
@@ -41,12 +125,17 @@ def vm_cli() -> None:
     """VM関連."""
 
 
-def main() -> None:
-    """CLI設定用."""
+def build_cli() -> click.Group:
+    """全てのコマンドを登録したルート."""
     vm_cli.add_command(list_vm_cli)
     vm_cli.add_command(vm_add_cli)
+    vm_cli.add_command(vm_add_fleet_cli)
+    vm_cli.add_command(vm_apply_cli)
     vm_cli.add_command(graceful_rm_cli)
+    vm_cli.add_command(stop_save_rm_cli)
+    vm_cli.add_command(save_rm_cli)
     vm_cli.add_command(vm_rebuild_cli)
+    vm_cli.add_command(render_vm_cli)
     vm_merged = click.CommandCollection(
         name="vm",
         sources=[
@@ -64,8 +153,16 @@ def main() -> None:
     cli.add_command(order_cli)
     cli.add_command(paid_cli)
     cli.add_command(invoice_cli)
+    cli.add_command(invoice_group_cli)
 
     cli.add_command(snapshot_cli)
     cli.add_command(reinforced_vm_cli)
     cli.add_command(shortcut_vm_cli)
-    cli()
+    cli.add_command(bench_cli)
+    cli.add_command(daemon_cli)
+    return cli
+
+
+def main() -> None:
+    """CLI設定用."""
+    build_cli()()
@@ -0,0 +1,14 @@
+"""テスト全体の準備."""
+from typing import Iterator
+
+import pytest
+
+from conoha_client.features._shared.endpoints.config import reset_settings
+
+
+@pytest.fixture(autouse=True)
+def _fresh_settings() -> Iterator[None]:
+    """テストごとに環境変数から設定を解決し直す."""
+    reset_settings()
+    yield
+    reset_settings()
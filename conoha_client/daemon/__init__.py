@@ -0,0 +1,4 @@
+"""常駐デーモン.
+
+ccliの入口(client.main)から読み込まれるので,起動を速くするためここでは何も読み込まない
+"""
@@ -0,0 +1,83 @@
+"""daemon cli."""
+from __future__ import annotations
+
+import time
+
+import click
+
+from .client import request, spawn
+from .protocol import socket_path
+from .server import DEFAULT_IDLE_TIMEOUT_SEC, serve
+
+START_TIMEOUT_SEC = 10
+NOT_RUNNING = "動いていません"
+BUSY = "コマンドを実行中なので終了しません. 終わってから再度実行してください"
+
+idle_timeout_option = click.option(
+    "--idle-timeout",
+    type=click.FloatRange(min=1),
+    default=DEFAULT_IDLE_TIMEOUT_SEC,
+    show_default=True,
+    help="コマンドが転送されなくなってから終了するまでの秒数",
+)
+
+
+@click.group("daemon")
+def daemon_cli() -> None:
+    """接続,トークン,キャッシュを使い回す常駐プロセス.
+
+    動いている間はccliのコマンドを転送して実行する
+    """
+
+
+def _echo_status(status: dict) -> None:
+    click.echo(
+        f"pid={status['pid']} uptime={status['uptime_sec']}s"
+        f" served={status['served']} busy={status['busy']} socket={socket_path()}",
+    )
+
+
+@daemon_cli.command("start")
+@idle_timeout_option
+def start_cli(idle_timeout: float) -> None:
+    """バックグラウンドで起動する."""
+    status = request({"control": "status"})
+    if status is None:
+        spawn(idle_timeout)
+        deadline = time.monotonic() + START_TIMEOUT_SEC
+        while status is None and time.monotonic() < deadline:
+            time.sleep(0.1)
+            status = request({"control": "status"})
+    if status is None:
+        log = socket_path().with_suffix(".log")
+        msg = f"起動できませんでした. {log}を確認してください"
+        raise click.ClickException(msg)
+    _echo_status(status)
+
+
+@daemon_cli.command("run")
+@idle_timeout_option
+def run_cli(idle_timeout: float) -> None:
+    """フォアグラウンドで起動する."""
+    root = click.get_current_context().find_root().command
+    serve(root, idle_timeout_sec=idle_timeout)
+
+
+@daemon_cli.command("status")
+def status_cli() -> None:
+    """状態."""
+    status = request({"control": "status"})
+    if status is None:
+        raise click.ClickException(NOT_RUNNING)
+    _echo_status(status)
+
+
+@daemon_cli.command("stop")
+def stop_cli() -> None:
+    """終了する. コマンドを実行中なら終了しない."""
+    status = request({"control": "stop"})
+    if status is None:
+        raise click.ClickException(NOT_RUNNING)
+    if not status.get("stopped"):
+        raise click.ClickException(BUSY)
+    click.echo("stopped")
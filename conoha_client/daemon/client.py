@@ -0,0 +1,176 @@
+"""デーモンへのコマンドの転送.
+
+ccliの入口. デーモンが動いていればコマンドを転送し,
+転送できなければCLIを読み込んでこのプロセスで実行する
+"""
+from __future__ import annotations
+
+import getpass
+import os
+import socket
+import subprocess
+import sys
+from contextlib import suppress
+from pathlib import Path
+from typing import IO
+
+from .protocol import env_digest, receive, send, socket_path
+
+CONNECT_TIMEOUT_SEC = 0.5
+DISCONNECTED_EXIT_CODE = 1
+# SIGINTで終了したときの慣習
+CANCELLED_EXIT_CODE = 130
+DISCONNECTED = "デーモンとの接続が切れました.コマンドは途中まで実行されたかもしれません"
+
+
+def forwardable(args: list[str]) -> bool:
+    """転送できるコマンドか.
+
+    シェル,ルートの設定の引数,デーモン自身の操作はこのプロセスで実行する
+    """
+    return len(args) > 0 and not args[0].startswith("-") and args[0] != "daemon"
+
+
+def forward(
+    args: list[str],
+    path: str | os.PathLike | None = None,
+    stdin: IO[str] = sys.stdin,
+    stdout: IO[str] = sys.stdout,
+    stderr: IO[str] = sys.stderr,
+) -> int | None:
+    """デーモンでコマンドを実行する.
+
+    :return: 終了コード. 転送できなければNone
+    """
+    if not forwardable(args):
+        return None
+    try:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.settimeout(CONNECT_TIMEOUT_SEC)
+        conn.connect(str(socket_path() if path is None else path))
+        conn.settimeout(None)
+    except OSError:
+        return None
+    with conn, conn.makefile("rwb") as f:
+        send(
+            f,
+            {
+                "args": args,
+                "cwd": str(Path.cwd()),
+                "env": env_digest(),
+                "tty": stdout.isatty(),
+            },
+        )
+        return _relay(f, stdin, stdout, stderr)
+
+
+def _relay(
+    f: IO[bytes],
+    stdin: IO[str],
+    stdout: IO[str],
+    stderr: IO[str],
+) -> int | None:
+    """デーモンの出力を表示し,入力を求められたら送る.
+
+    受け付けられる前に切れたら転送元で実行させ,受け付けられた後に切れたら失敗とする
+    Ctrl-Cではデーモンでの実行を取り消させる
+    """
+    try:
+        return _relay_until_exit(f, stdin, stdout, stderr)
+    except KeyboardInterrupt:
+        with suppress(OSError):
+            send(f, {"cancel": True})
+        return CANCELLED_EXIT_CODE
+
+
+def _relay_until_exit(
+    f: IO[bytes],
+    stdin: IO[str],
+    stdout: IO[str],
+    stderr: IO[str],
+) -> int | None:
+    accepted = False
+    while True:
+        msg = receive(f)
+        if msg is None and not accepted:
+            return None
+        if msg is None:
+            stderr.write(f"{DISCONNECTED}\n")
+            stderr.flush()
+            return DISCONNECTED_EXIT_CODE
+        if "fallback" in msg:
+            return None
+        if "accepted" in msg:
+            accepted = True
+        elif "out" in msg:
+            stdout.write(msg["out"])
+            stdout.flush()
+        elif "err" in msg:
+            stderr.write(msg["err"])
+            stderr.flush()
+        elif "read" in msg:
+            send(f, {"line": _read(msg, stdin)})
+        elif "exit" in msg:
+            return msg["exit"]
+
+
+def _read(msg: dict, stdin: IO[str]) -> str | None:
+    if msg.get("hidden"):
+        try:
+            return getpass.getpass(msg.get("prompt", "")) + "\n"
+        except EOFError:
+            return None
+    line = stdin.readline()
+    return None if line == "" else line
+
+
+def request(msg: dict, path: str | os.PathLike | None = None) -> dict | None:
+    """デーモンへの操作. 動いていなければNone."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(CONNECT_TIMEOUT_SEC)
+            conn.connect(str(socket_path() if path is None else path))
+            with conn.makefile("rwb") as f:
+                send(f, msg)
+                return receive(f)
+    except OSError:
+        return None
+
+
+def spawn(idle_timeout_sec: float | None = None) -> None:
+    """デーモンをバックグラウンドで起動する. 出力はソケットと同じ場所の.logへ.
+
+    :param idle_timeout_sec: 使われなくなってから終了するまでの秒数
+    """
+    path = socket_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    args = [] if idle_timeout_sec is None else [str(idle_timeout_sec)]
+    with path.with_suffix(".log").open("ab") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "conoha_client.daemon.server", *args],  # noqa: S603
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+
+
+def main() -> None:
+    """Ccliの入口.
+
+    OS_CONOHA_DAEMON=autoならデーモンが動いていなければ起動し,次回から転送する
+    """
+    args = sys.argv[1:]
+    code = forward(args)
+    if code is not None:
+        sys.exit(code)
+    if (
+        forwardable(args)
+        and os.environ.get("OS_CONOHA_DAEMON") == "auto"
+        and request({"control": "status"}) is None
+    ):
+        spawn()
+    # 転送できたときに読み込まないよう,ここで読み込む
+    from conoha_client.cli import main as cli_main
+
+    cli_main()
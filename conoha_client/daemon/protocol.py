@@ -0,0 +1,56 @@
+"""デーモンとの通信.
+
+1行1つのJSONを送り合う. 転送する側は起動を速くするため標準ライブラリだけを使う
+    クライアント -> デーモン: {"args", "cwd", "env", "tty"} | {"control"}
+    デーモン -> クライアント: {"fallback"} | {"accepted"}
+        {"accepted"}の後: {"out"} | {"err"} | {"read", "hidden", "prompt"} | {"exit"}
+    クライアント -> デーモン: {"line"} ({"read"}への応答. 入力の終わりはnull)
+        | {"cancel"} (実行の取り消し. 接続が切れたときも取り消す)
+{"accepted"}の後に接続が切れたらコマンドが途中まで実行されているので転送元でやり直さない
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import IO, Any
+
+DEFAULT_SOCKET_NAME = "daemon.sock"
+
+
+def socket_path() -> Path:
+    """デーモンのUnixソケット.
+
+    OS_CONOHA_DAEMON_SOCKETで変更できる. 既定はOS_CONOHA_CACHE_DIRの下
+    設定ファイルは読まない(転送の判断に読み込むと起動が遅くなる)
+    """
+    p = os.environ.get("OS_CONOHA_DAEMON_SOCKET")
+    if p is not None:
+        return Path(p).expanduser()
+    cache_dir = os.environ.get("OS_CONOHA_CACHE_DIR", "~/.cache/conoha-client")
+    return Path(cache_dir).expanduser() / DEFAULT_SOCKET_NAME
+
+
+def env_digest(environ: dict[str, str] | None = None) -> str:
+    """OS_で始まる環境変数のハッシュ.
+
+    デーモンと同じ環境変数のときだけ転送する. 値(パスワード)は送らない
+    """
+    env = os.environ if environ is None else environ
+    items = sorted((k, v) for k, v in env.items() if k.startswith("OS_"))
+    return hashlib.sha256(json.dumps(items).encode()).hexdigest()
+
+
+def send(f: IO[bytes], msg: dict[str, Any]) -> None:
+    """1メッセージ送る."""
+    f.write(json.dumps(msg, ensure_ascii=False).encode() + b"\n")
+    f.flush()
+
+
+def receive(f: IO[bytes]) -> dict[str, Any] | None:
+    """1メッセージ受け取る. 接続が切れたらNone."""
+    line = f.readline()
+    if line == b"":
+        return None
+    return json.loads(line)
@@ -0,0 +1,405 @@
+"""常駐して接続,トークン,キャッシュを使い回すデーモン.
+
+転送されたコマンドをこのプロセスで1つずつ実行する
+実行中に届いたコマンドは転送元で実行させるので待たせない
+"""
+from __future__ import annotations
+
+import ctypes
+import getpass
+import io
+import os
+import queue
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout, suppress
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Callable
+
+from conoha_client.features._shared.endpoints.config import reset_settings
+from conoha_client.features._shared.endpoints.token import issue_token_id
+from conoha_client.features._shared.metrics import start_exporters
+from conoha_client.features.plan.repo import list_vmplans
+from conoha_client.features.vm.repo.query import inventory_dep
+
+from .client import request
+from .protocol import env_digest, receive, send, socket_path
+
+if TYPE_CHECKING:
+    import click
+
+DEFAULT_IDLE_TIMEOUT_SEC = 1800
+# 期限切れ間際のトークンはissue_token_idが発行し直す
+WARM_INTERVAL_SEC = 300
+# SIGINTで終了したときの慣習
+CANCELLED_EXIT_CODE = 130
+
+_getpass = getpass.getpass
+
+
+class DaemonAlreadyRunningError(Exception):
+    """同じソケットで別のデーモンが動いている."""
+
+
+class _Connection:
+    """転送元との接続. 複数スレッドからの出力を混ぜない."""
+
+    def __init__(self, rfile: IO[bytes], wfile: IO[bytes]) -> None:
+        self.rfile = rfile
+        self.wfile = wfile
+        self._lock = threading.Lock()
+        self._replies: queue.Queue[dict[str, Any] | None] | None = None
+
+    def send(self, msg: dict[str, Any]) -> None:
+        """送る. 転送元がいなくなっていれば捨てる(取り消し後の出力など)."""
+        with self._lock, suppress(OSError, ValueError):
+            send(self.wfile, msg)
+
+    def listen(self, on_cancel: Callable[[], object]) -> None:
+        """転送元からのメッセージを別スレッドで受け取り始める.
+
+        取り消されるか接続が切れたらon_cancelを呼ぶ
+        """
+        self._replies = queue.Queue()
+
+        def _loop() -> None:
+            while True:
+                try:
+                    msg = receive(self.rfile)
+                except (OSError, ValueError):
+                    msg = None
+                if msg is None or "cancel" in msg:
+                    on_cancel()
+                    self._replies.put(None)
+                    return
+                self._replies.put(msg)
+
+        threading.Thread(target=_loop, daemon=True).start()
+
+    def ask(self, msg: dict[str, Any]) -> str | None:
+        """入力を求めて1行受け取る. 入力の終わりか取り消されたらNone."""
+        with self._lock:
+            send(self.wfile, msg)
+            reply = self._replies.get() if self._replies else receive(self.rfile)
+        return None if reply is None else reply.get("line")
+
+
+class _RemoteOutput(io.TextIOBase):
+    """転送元の標準出力か標準エラー出力."""
+
+    def __init__(self, conn: _Connection, key: str, tty: bool) -> None:
+        self._conn = conn
+        self._key = key
+        self._tty = tty
+
+    @property
+    def encoding(self) -> str:
+        return "utf-8"
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        if s != "":
+            self._conn.send({self._key: s})
+        return len(s)
+
+    def isatty(self) -> bool:
+        return self._tty
+
+
+class _RemoteInput(io.TextIOBase):
+    """転送元の標準入力."""
+
+    def __init__(self, conn: _Connection, tty: bool) -> None:
+        self._conn = conn
+        self._tty = tty
+
+    @property
+    def encoding(self) -> str:
+        return "utf-8"
+
+    def readable(self) -> bool:
+        return True
+
+    def readline(self, _size: int = -1) -> str:
+        return self._conn.ask({"read": True}) or ""
+
+    def read(self, _size: int | None = -1) -> str:
+        return "".join(iter(self.readline, ""))
+
+    def isatty(self) -> bool:
+        return self._tty
+
+    def getpass(self, prompt: str) -> str:
+        line = self._conn.ask({"read": True, "hidden": True, "prompt": prompt})
+        if line is None:
+            raise EOFError
+        return line.rstrip("\n")
+
+
+def _remote_getpass(prompt: str = "Password: ", stream: IO[str] | None = None) -> str:
+    """転送元の端末でパスワードを入力させる."""
+    if isinstance(sys.stdin, _RemoteInput):
+        return sys.stdin.getpass(prompt)
+    return _getpass(prompt, stream)
+
+
+def _exit_code(code: object) -> int:
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    sys.stderr.write(f"{code}\n")
+    return 1
+
+
+def warm() -> None:
+    """トークン,プラン一覧,VM一覧を取得しておく."""
+    issue_token_id()
+    list_vmplans()
+    inventory_dep()
+
+
+class Daemon:
+    """転送されたコマンドの実行."""
+
+    def __init__(
+        self,
+        command: click.Command,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Init.
+
+        :param command: 転送されたコマンドを解釈するCLIのルート
+        """
+        self.command = command
+        self.env = env_digest()
+        self._clock = clock
+        self._lock = threading.Lock()
+        # 実行中のコマンドのスレッドと実行ごとの目印
+        # 前の実行の取り消しが次の実行に届かないよう目印で区別する
+        self._running: tuple[int, object] | None = None
+        self._running_lock = threading.Lock()
+        self.closed = False
+        self.started = clock()
+        self.last_used = self.started
+        self.n_served = 0
+
+    def status(self) -> dict[str, Any]:
+        """状態."""
+        return {
+            "pid": os.getpid(),
+            "uptime_sec": round(self._clock() - self.started, 3),
+            "served": self.n_served,
+            "busy": self._lock.locked(),
+        }
+
+    def idle_sec(self) -> float:
+        """最後にコマンドを実行してからの秒数. 実行中なら0."""
+        if self._lock.locked():
+            return 0
+        return self._clock() - self.last_used
+
+    def close(self) -> bool:
+        """以降のコマンドを転送元で実行させる.
+
+        :return: コマンドを実行中なら閉じずにFalse
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        self.closed = True
+        self._lock.release()
+        return True
+
+    def handle(self, msg: dict[str, Any], conn: _Connection) -> None:
+        """コマンドを実行して出力と終了コードを返す.
+
+        環境変数が異なるか,実行中か終了中なら転送元で実行させる
+        """
+        if msg.get("env") != self.env:
+            conn.send({"fallback": "環境変数がデーモンと異なります"})
+            return
+        if not self._lock.acquire(blocking=False):
+            conn.send({"fallback": "他のコマンドを実行中です"})
+            return
+        if self.closed:
+            self._lock.release()
+            conn.send({"fallback": "終了中です"})
+            return
+        try:
+            conn.send({"accepted": True})
+            code = self._execute(msg, conn)
+        finally:
+            self.last_used = self._clock()
+            self.n_served += 1
+            self._lock.release()
+        conn.send({"exit": code})
+
+    def cancel(self, run: object) -> None:
+        """実行中のコマンドにKeyboardInterruptを送出する.
+
+        sleep中などPythonのコードを実行していない間は戻るまで届かない
+        :param run: 取り消す実行の目印. 既に終わっていれば何もしない
+        """
+        with self._running_lock:
+            if self._running is not None and self._running[1] is run:
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(self._running[0]),
+                    ctypes.py_object(KeyboardInterrupt),
+                )
+
+    def _execute(self, msg: dict[str, Any], conn: _Connection) -> int:
+        tty = bool(msg.get("tty"))
+        cwd = Path.cwd()
+        stdin = sys.stdin
+        try:
+            os.chdir(msg["cwd"])
+            sys.stdin = _RemoteInput(conn, tty)
+            with redirect_stdout(_RemoteOutput(conn, "out", tty)), redirect_stderr(
+                _RemoteOutput(conn, "err", tty),
+            ):
+                # 設定ファイルと引数は実行ごとに読み直し,接続とキャッシュは使い回す
+                reset_settings()
+                return self._run(msg["args"], conn)
+        except KeyboardInterrupt:
+            # 実行の終わり際に届いた取り消し
+            return CANCELLED_EXIT_CODE
+        finally:
+            sys.stdin = stdin
+            os.chdir(cwd)
+
+    def _run(self, args: list[str], conn: _Connection) -> int:
+        """取り消せるようにしてコマンドを実行する."""
+        run = object()
+        with self._running_lock:
+            self._running = (threading.get_ident(), run)
+        try:
+            conn.listen(lambda: self.cancel(run))
+            self.command.main(args, prog_name="ccli")
+        except SystemExit as e:
+            return _exit_code(e.code)
+        except KeyboardInterrupt:
+            return CANCELLED_EXIT_CODE
+        except Exception:  # noqa: BLE001
+            traceback.print_exc()
+            return 1
+        finally:
+            with self._running_lock:
+                self._running = None
+        return 0
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: _Server
+
+    def handle(self) -> None:
+        msg = receive(self.rfile)
+        if msg is None:
+            return
+        conn = _Connection(self.rfile, self.wfile)
+        control = msg.get("control")
+        if control is None:
+            self.server.daemon.handle(msg, conn)
+            return
+        if control != "stop":
+            conn.send(self.server.daemon.status())
+            return
+        # 実行中のコマンドを途中で止めないよう,実行中なら終了しない
+        stopped = self.server.daemon.close()
+        conn.send(self.server.daemon.status() | {"stopped": stopped})
+        if stopped:
+            self.server.stop()
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, daemon: Daemon) -> None:
+        super().__init__(str(path), _Handler)
+        self.daemon = daemon
+        self.stopped = threading.Event()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+
+def _maintain(
+    server: _Server,
+    idle_timeout_sec: float,
+    warm_up: Callable[[], object] | None,
+) -> None:
+    """トークンを切らさず,使われなくなったら終了する."""
+    interval = min(WARM_INTERVAL_SEC, idle_timeout_sec)
+    while not server.stopped.wait(interval):
+        if server.daemon.idle_sec() >= idle_timeout_sec and server.daemon.close():
+            server.stop()
+            return
+        _warm(warm_up)
+
+
+def _warm(warm_up: Callable[[], object] | None) -> None:
+    if warm_up is None:
+        return
+    try:
+        warm_up()
+    except Exception as e:  # noqa: BLE001
+        print(f"warm up failed: {e}", file=sys.stderr)  # noqa: T201
+
+
+def serve(
+    command: click.Command,
+    path: Path | None = None,
+    idle_timeout_sec: float = DEFAULT_IDLE_TIMEOUT_SEC,
+    warm_up: Callable[[], object] | None = warm,
+) -> None:
+    """終了を指示されるか使われなくなるまで転送されたコマンドを実行する.
+
+    :param path: Unixソケット. 既定はsocket_path()
+    :param warm_up: 起動時と一定間隔で呼ぶキャッシュの準備
+    :raises DaemonAlreadyRunningError: 同じソケットで別のデーモンが動いている
+    """
+    if path is None:
+        path = socket_path()
+    if request({"control": "status"}, path) is not None:
+        msg = f"{path}で既にデーモンが動いています"
+        raise DaemonAlreadyRunningError(msg)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    # 作成と同時に所有者だけが接続できるようにする. 作成後のchmodでは間に合わない
+    umask = os.umask(0o177)
+    try:
+        server = _Server(path, Daemon(command))
+    finally:
+        os.umask(umask)
+    getpass.getpass = _remote_getpass
+    try:
+        start_exporters()
+        _warm(warm_up)
+        threading.Thread(
+            target=_maintain,
+            args=(server, idle_timeout_sec, warm_up),
+            daemon=True,
+        ).start()
+        server.serve_forever()
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
+        getpass.getpass = _getpass
+
+
+def main() -> None:
+    """spawnから起動される. 引数は使われなくなってから終了するまでの秒数."""
+    # 循環importを避ける
+    from conoha_client.cli import build_cli
+
+    idle = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_IDLE_TIMEOUT_SEC
+    serve(build_cli(), idle_timeout_sec=idle)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""daemon test."""
+from __future__ import annotations
+
+import io
+import json
+import socket
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import click
+
+from .client import (
+    CANCELLED_EXIT_CODE,
+    DISCONNECTED_EXIT_CODE,
+    _relay,
+    forward,
+    request,
+)
+from .protocol import env_digest, receive, send
+from .server import serve
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+@click.group()
+def root() -> None:
+    """Root."""
+
+
+@root.command()
+def hello() -> None:
+    """Hello."""
+    click.echo("hello")
+    click.echo("warn", err=True)
+
+
+@root.command()
+def ask() -> None:
+    """Prompt."""
+    name = click.prompt("name")
+    click.echo(f"hi {name}")
+
+
+_release = threading.Event()
+
+
+@root.command()
+def block() -> None:
+    """テストが許すまで終わらない."""
+    _release.wait(timeout=5)
+    click.echo("released")
+
+
+@root.command()
+def spin() -> None:
+    """取り消されるまで終わらない."""
+    while True:
+        time.sleep(0.01)
+
+
+@root.command()
+def fail() -> None:
+    """Fail."""
+    raise click.ClickException("failed")  # noqa: EM101
+
+
+def _forward(path: Path, args: list[str], stdin: str = "") -> tuple:
+    out, err = io.StringIO(), io.StringIO()
+    code = forward(args, path, io.StringIO(stdin), out, err)
+    return code, out.getvalue(), err.getvalue()
+
+
+def test_forward(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """出力,入力,終了コードを転送元とやりとりする."""
+    path = tmp_path / "d.sock"
+    t = threading.Thread(target=serve, args=(root, path), kwargs={"warm_up": None})
+    t.start()
+    try:
+        while request({"control": "status"}, path) is None:
+            pass
+        assert _forward(path, ["hello"]) == (0, "hello\n", "warn\n")
+        assert _forward(path, ["ask"], "taro\n") == (0, "name: hi taro\n", "")
+        code, _, err = _forward(path, ["fail"])
+        assert code == 1
+        assert "failed" in err
+        assert forward(["--help"], path) is None
+
+        monkeypatch.setenv("OS_CONOHA_DIFFERENT", "1")
+        assert _forward(path, ["hello"]) == (None, "", "")
+        assert request({"control": "status"}, path)["served"] == 3  # noqa: PLR2004
+    finally:
+        request({"control": "stop"}, path)
+        t.join(timeout=5)
+    assert not path.exists()
+    assert forward(["hello"], path) is None
+
+
+def test_relay_disconnected() -> None:
+    """受け付けられる前に切れたら転送元で実行し,後に切れたら失敗にする."""
+    out, err = io.StringIO(), io.StringIO()
+    assert _relay(io.BytesIO(b""), io.StringIO(), out, err) is None
+    accepted = io.BytesIO(b'{"accepted": true}\n{"out": "a"}\n')
+    assert _relay(accepted, io.StringIO(), out, err) == DISCONNECTED_EXIT_CODE
+    assert out.getvalue() == "a"
+    assert "切れました" in err.getvalue()
+
+
+def test_stop_while_busy(tmp_path: Path) -> None:
+    """コマンドを実行中なら終了しない."""
+    path = tmp_path / "d.sock"
+    t = threading.Thread(target=serve, args=(root, path), kwargs={"warm_up": None})
+    t.start()
+    results = []
+    try:
+        while request({"control": "status"}, path) is None:
+            pass
+        client = threading.Thread(
+            target=lambda: results.append(_forward(path, ["block"])),
+        )
+        client.start()
+        while not request({"control": "status"}, path)["busy"]:
+            pass
+        assert not request({"control": "stop"}, path)["stopped"]
+        _release.set()
+        client.join(timeout=5)
+        assert results == [(0, "released\n", "")]
+    finally:
+        _release.set()
+        request({"control": "stop"}, path)
+        t.join(timeout=5)
+    assert not path.exists()
+
+
+class _Interrupted(io.StringIO):
+    def readline(self, _size: int = -1) -> str:
+        raise KeyboardInterrupt
+
+
+def test_relay_cancel() -> None:
+    """Ctrl-Cでデーモンに取り消しを送る."""
+    f = io.BytesIO(b'{"accepted": true}\n{"read": true}\n')
+    code = _relay(f, _Interrupted(), io.StringIO(), io.StringIO())
+    assert code == CANCELLED_EXIT_CODE
+    assert json.loads(f.getvalue().splitlines()[-1]) == {"cancel": True}
+
+
+def test_cancel_on_disconnect(tmp_path: Path) -> None:
+    """転送元との接続が切れたら実行を取り消し,次のコマンドを受け付ける."""
+    path = tmp_path / "d.sock"
+    t = threading.Thread(target=serve, args=(root, path), kwargs={"warm_up": None})
+    t.start()
+    try:
+        while request({"control": "status"}, path) is None:
+            pass
+        assert path.stat().st_mode & 0o777 == 0o600  # noqa: PLR2004
+        with socket.socket(socket.AF_UNIX) as conn, conn.makefile("rwb") as f:
+            conn.connect(str(path))
+            send(f, {"args": ["spin"], "cwd": str(tmp_path), "env": env_digest()})
+            assert receive(f) == {"accepted": True}
+        deadline = time.monotonic() + 5
+        while request({"control": "status"}, path)["busy"]:
+            assert time.monotonic() < deadline
+        assert _forward(path, ["hello"]) == (0, "hello\n", "warn\n")
+    finally:
+        request({"control": "stop"}, path)
+        t.join(timeout=5)
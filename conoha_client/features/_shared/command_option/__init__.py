@@ -1,3 +1,5 @@
 from .build_vm_options import build_vm_options  # noqa: F401
 from .default_callback import ClickCallback, default_callback  # noqa: F401
-from .each_args import each_args  # noqa: F401
+from .each_args import bulk_args, each_args, raise_for_failures  # noqa: F401
+from .profiles import profiles_option  # noqa: F401
+from .regions import regions_option  # noqa: F401
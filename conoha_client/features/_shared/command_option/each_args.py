@@ -17,6 +17,8 @@ import click
 from makefun import create_function
 from pydantic import BaseModel
 
+from conoha_client.features._shared.concurrent import Outcome  # noqa: TCH001
+
 P = ParamSpec("P")
 T = TypeVar("T")
 Wrapped: TypeAlias = Callable[Concatenate[T, P], None]
@@ -50,12 +52,7 @@ class EachArgsWrapper(BaseModel, Generic[T], frozen=True):
             *args: P.args,
             **kwargs: P.kwargs,
         ) -> None:
-            _params = list(params___)
-            if not file.isatty():
-                lines = file.read().splitlines()
-                _params.extend(lines)
-
-            converted = [self.converter(p) for p in _params]
+            converted = [self.converter(p) for p in _read_params(params___, file)]
             for c in converted:
                 func(c, *args, **kwargs)
 
@@ -70,6 +67,59 @@ def each_args(
     return EachArgsWrapper(converter=converter, arg_name=arg_name)
 
 
+def _read_params(params: tuple[str], file: TextIO) -> list[str]:
+    """引数と標準入力(またはファイル)の行をまとめる."""
+    _params = list(params)
+    if not file.isatty():
+        lines = file.read().splitlines()
+        _params.extend([line for line in lines if line.strip() != ""])
+    return _params
+
+
+BulkWrapped: TypeAlias = Callable[Concatenate[list[str], P], T]
+
+
+def bulk_args(arg_name: str = "params") -> Callable[[BulkWrapped], Callable]:
+    """each_argsと同じ入力を1件ずつではなくまとめて渡す.
+
+    一括取得・並行実行したいコマンド向け
+    """
+
+    def deco(func: BulkWrapped) -> Callable:
+        @click.argument(arg_name, nargs=-1, type=click.STRING)
+        @click.option(
+            "--file",
+            "-f",
+            type=click.File("r"),
+            default="-",
+            help="対象をファイル入力(default:標準入力)",
+        )
+        @functools.wraps(func)
+        @rename_argument("params___", arg_name)
+        def wrapper(
+            params___: tuple[str],
+            file: TextIO,
+            *args: P.args,
+            **kwargs: P.kwargs,
+        ) -> T:
+            return func(_read_params(params___, file), *args, **kwargs)
+
+        return wrapper
+
+    return deco
+
+
+def raise_for_failures(outcomes: list[Outcome]) -> None:
+    """bulk_argsで並行実行した結果に失敗があれば終了コードを非0にする.
+
+    失敗の詳細は呼び出し元で標準エラー出力へ表示しておく
+    """
+    n_failed = len([o for o in outcomes if not o.is_ok()])
+    if n_failed > 0:
+        msg = f"{n_failed}/{len(outcomes)}件が失敗しました"
+        raise click.ClickException(msg)
+
+
 def rename_argument(old: str, new: str) -> Callable[[Callable], Callable]:
     def wrapper(f: Callable[Concatenate[..., P], Any]) -> Callable:
         sig = signature(f)
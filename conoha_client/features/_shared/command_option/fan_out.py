@@ -0,0 +1,58 @@
+"""一覧取得を複数の接続先へ並行して行い列を足してまとめる."""
+from __future__ import annotations
+
+from functools import cache
+from typing import TYPE_CHECKING, Callable, TypeVar
+
+import click
+from pydantic import BaseModel, ConfigDict
+
+from conoha_client.features._shared.concurrent import map_concurrently
+
+if TYPE_CHECKING:
+    from contextlib import AbstractContextManager
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@cache
+def labeled_model(t: type[M], column: str) -> type[M]:
+    """Column列を足したモデル.
+
+    元のモデルの値から作れるようフィールド名でも受け付ける
+    """
+    ns = {
+        "__annotations__": {column: str},
+        "model_config": ConfigDict(populate_by_name=True),
+    }
+    return type(f"{t.__name__}With{column.capitalize()}", (t,), ns)
+
+
+def with_label(model: M, column: str, label: str) -> M:
+    """Column列を足す."""
+    t = labeled_model(model.__class__, column)
+    return t.model_validate(dict(model) | {column: label})
+
+
+def fan_out(
+    func: Callable[[], list[M]],
+    column: str,
+    contexts: dict[str, Callable[[], AbstractContextManager]],
+) -> list[M]:
+    """接続先ごとに並行して一覧を取得し,column列を足してつなげる.
+
+    失敗した接続先は標準エラーに出力し,取得できた一覧を返す
+    :param contexts: 列の値と接続先を切り替えるcontext managerの組
+    """
+
+    def _f(label: str) -> list[M]:
+        with contexts[label]():
+            return [with_label(m, column, label) for m in func()]
+
+    ls = []
+    for o in map_concurrently(_f, contexts):
+        if o.is_ok():
+            ls.extend(o.value)
+        else:
+            click.echo(f"{o.arg}: {o.error}", err=True)
+    return ls
@@ -0,0 +1,70 @@
+"""複数アカウントへの並行実行."""
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING, Callable, ParamSpec, TypeVar
+
+import click
+
+from conoha_client.features._shared.endpoints.profiles import (
+    Profile,
+    ProfileNotFoundError,
+    find_profile,
+    use_profile,
+)
+
+from .fan_out import fan_out
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+P = ParamSpec("P")
+M = TypeVar("M", bound="BaseModel")
+
+
+def parse_profiles(
+    ctx: click.Context,  # noqa: ARG001
+    param: click.Parameter,  # noqa: ARG001
+    value: str | None,
+) -> tuple[Profile, ...] | None:
+    """a,b,cを設定ファイルのプロファイルへ変換する."""
+    if value is None:
+        return None
+    names = dict.fromkeys(v.strip() for v in value.split(","))
+    try:
+        return tuple(find_profile(name) for name in names)
+    except ProfileNotFoundError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+def in_profiles(
+    func: Callable[[], list[M]],
+    profiles: tuple[Profile, ...],
+) -> list[M]:
+    """アカウントごとに並行して一覧を取得し,profile列を足してつなげる."""
+    contexts = {p.name: functools.partial(use_profile, p) for p in profiles}
+    return fan_out(func, "profile", contexts)
+
+
+def profiles_option(func: Callable[P, list[M]]) -> Callable[P, list[M]]:
+    """一覧を複数アカウントから並行して取得するオプション.
+
+    view_optionsより下に付ける
+    """
+
+    @click.option(
+        "--profiles",
+        callback=parse_profiles,
+        help="a,b,cのように設定ファイルの複数アカウントの一覧をprofile列付きでまとめる",
+    )
+    @functools.wraps(func)
+    def wrapper(
+        profiles: tuple[Profile, ...] | None,
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> list[M]:
+        if profiles is None:
+            return func(*args, **kwargs)
+        return in_profiles(lambda: func(*args, **kwargs), profiles)
+
+    return wrapper
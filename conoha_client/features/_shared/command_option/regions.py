@@ -0,0 +1,71 @@
+"""複数リージョンへの並行実行."""
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING, Callable, ParamSpec, TypeVar
+
+import click
+
+from conoha_client.features._shared.endpoints.environments import (
+    REGION_NOS,
+    use_region,
+)
+
+from .fan_out import fan_out
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+P = ParamSpec("P")
+M = TypeVar("M", bound="BaseModel")
+
+
+def parse_regions(
+    ctx: click.Context,  # noqa: ARG001
+    param: click.Parameter,  # noqa: ARG001
+    value: str | None,
+) -> tuple[str, ...] | None:
+    """1,2,3またはallをリージョン番号の組へ変換する."""
+    if value is None:
+        return None
+    if value == "all":
+        return REGION_NOS
+    nos = tuple(dict.fromkeys(v.strip() for v in value.split(",")))
+    invalids = [no for no in nos if not no.isdigit()]
+    if len(invalids) > 0:
+        msg = f"{invalids}はリージョン番号ではありません"
+        raise click.BadParameter(msg)
+    return nos
+
+
+def in_regions(
+    func: Callable[[], list[M]],
+    region_nos: tuple[str, ...],
+) -> list[M]:
+    """リージョンごとに並行して一覧を取得し,region列を足してつなげる."""
+    contexts = {f"tyo{no}": functools.partial(use_region, no) for no in region_nos}
+    return fan_out(func, "region", contexts)
+
+
+def regions_option(func: Callable[P, list[M]]) -> Callable[P, list[M]]:
+    """一覧を複数リージョンから並行して取得するオプション.
+
+    view_optionsより下に付ける
+    """
+
+    @click.option(
+        "--regions",
+        callback=parse_regions,
+        help="1,2,3のように複数リージョンの一覧をregion列付きでまとめる. allで全て",
+    )
+    @functools.wraps(func)
+    def wrapper(
+        regions: tuple[str, ...] | None,
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> list[M]:
+        if regions is None:
+            return func(*args, **kwargs)
+        return in_regions(lambda: func(*args, **kwargs), regions)
+
+    return wrapper
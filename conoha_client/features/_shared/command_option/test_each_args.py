@@ -7,7 +7,15 @@ import click
 import pytest
 from click.testing import CliRunner
 
-from .each_args import VariadicArgumentsUndefinedError, each_args, rename_argument
+from conoha_client.features._shared.concurrent import map_concurrently
+
+from .each_args import (
+    VariadicArgumentsUndefinedError,
+    bulk_args,
+    each_args,
+    raise_for_failures,
+    rename_argument,
+)
 
 ONE = uuid4()
 
@@ -78,3 +86,19 @@ def test_invalid_rename_argument() -> None:
         def func(a: str, b: int) -> tuple[str, int]:
             # def func(a: str, b: int) -> tuple[str, int]:
             return a, b
+
+
+@click.command()
+@bulk_args("names")
+def bulk_cli(names: list[str]) -> None:
+    """Testee cli3."""
+    raise_for_failures(map_concurrently(int, names))
+
+
+def test_raise_for_failures() -> None:
+    """1件でも失敗すれば終了コードが非0になる."""
+    runner = CliRunner()
+    assert runner.invoke(bulk_cli, ["1", "2"]).exit_code == 0
+    result = runner.invoke(bulk_cli, ["1", "x"])
+    assert result.exit_code == 1
+    assert "1/2" in result.output
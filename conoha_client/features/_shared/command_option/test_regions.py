@@ -0,0 +1,43 @@
+"""regions option test."""
+from __future__ import annotations
+
+from uuid import UUID, uuid4
+
+import click
+import pytest
+from pydantic import AliasPath, BaseModel, Field
+
+from conoha_client.features._shared.endpoints.environments import env_region
+
+from .regions import in_regions, parse_regions
+
+
+class _Model(BaseModel, frozen=True):
+    name: str = Field(alias=AliasPath("meta", "name"))
+    model_id: UUID
+
+
+def test_parse_regions() -> None:
+    """カンマ区切りかall."""
+    assert parse_regions(None, None, None) is None  # type: ignore[arg-type]
+    assert parse_regions(None, None, "all") == ("1", "2", "3")  # type: ignore[arg-type]
+    assert parse_regions(None, None, "2, 1,2") == ("2", "1")  # type: ignore[arg-type]
+    with pytest.raises(click.BadParameter):
+        parse_regions(None, None, "1,tyo2")  # type: ignore[arg-type]
+
+
+def test_in_regions() -> None:
+    """リージョンを切り替えて並行実行しregion列を足す."""
+    model_id = uuid4()
+
+    def _list() -> list[_Model]:
+        d = {"meta": {"name": env_region()}, "model_id": model_id}
+        return [_Model.model_validate(d)]
+
+    ls = in_regions(_list, ("1", "3"))
+    assert [(m.name, m.region) for m in ls] == [("tyo1", "tyo1"), ("tyo3", "tyo3")]
+    assert ls[0].model_dump() == {
+        "name": "tyo1",
+        "model_id": model_id,
+        "region": "tyo1",
+    }
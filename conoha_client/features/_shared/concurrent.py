@@ -0,0 +1,54 @@
+"""並行実行."""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Callable, Generic, Iterable, TypeVar
+
+from pydantic import BaseModel, ConfigDict
+
+A = TypeVar("A")
+R = TypeVar("R")
+
+MAX_WORKERS = 8
+
+
+class Outcome(BaseModel, Generic[A, R], frozen=True):
+    """一要素分の実行結果.
+
+    失敗しても他の要素の実行を止めないため例外を値として保持する
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    arg: A
+    value: R | None = None
+    error: Exception | None = None
+
+    def is_ok(self) -> bool:
+        """成功したか."""
+        return self.error is None
+
+
+def attempt(func: Callable[[A], R], arg: A) -> Outcome[A, R]:
+    """例外を送出せずに結果として返す."""
+    try:
+        return Outcome(arg=arg, value=func(arg))
+    except Exception as e:  # noqa: BLE001
+        return Outcome(arg=arg, error=e)
+
+
+def map_concurrently(
+    func: Callable[[A], R],
+    args: Iterable[A],
+    max_workers: int = MAX_WORKERS,
+) -> list[Outcome[A, R]]:
+    """引数それぞれに並行してfuncを適用する.
+
+    呼び出し元のcontextvars(e.g. use_regionで切り替えたリージョン)を引き継ぐ
+    :param max_workers: 同時実行数の上限
+    :return: 引数と同じ順序の実行結果
+    """
+    ctx = copy_context()
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        return list(ex.map(lambda a: ctx.copy().run(attempt, func, a), args))
@@ -0,0 +1,231 @@
+"""HTTPリクエストの記録と再生.
+
+実際のセッションのリクエストとレスポンスをJSON Linesのカセットへ記録し,
+後から同じ順序で再生する. 本番の性能シナリオを手元で再現して版ごとに比べる
+トークン,パスワード,秘密鍵は記録しない
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+
+import requests
+from pydantic import BaseModel, Field
+from requests.structures import CaseInsensitiveDict
+
+from . import transport
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+REDACTED = "***"
+# 値を記録しないキー. 再生時の照合も伏せた値で行う
+SECRET_KEYS = frozenset({"password", "adminPass", "private_key"})
+_SECRET_HEADERS = frozenset({"x-auth-token", "x-subject-token"})
+# 実行時刻で変わるので照合に使わないクエリパラメータ
+VOLATILE_PARAMS = frozenset({"changes-since"})
+_DROP_HEADERS = frozenset({"set-cookie"})
+
+
+class CassetteMissError(Exception):
+    """再生するレスポンスがカセットにない."""
+
+
+class Interaction(BaseModel, frozen=True):
+    """1往復分のリクエストとレスポンス."""
+
+    method: str
+    url: str
+    params: dict[str, str] | None = None
+    body: Any = Field(None, description="送信したJSON")
+    status: int
+    headers: dict[str, str] = {}
+    content: str = ""
+    elapsed: float = Field(description="レスポンスまでの秒数")
+
+    def key(self) -> str:
+        """再生時に照合するキー."""
+        params = {
+            k: v for k, v in (self.params or {}).items() if k not in VOLATILE_PARAMS
+        }
+        return json.dumps(
+            [self.method, self.url, params, self.body],
+            sort_keys=True,
+            default=str,
+        )
+
+    def to_response(self) -> requests.Response:
+        """記録したレスポンス."""
+        res = requests.Response()
+        res.status_code = self.status
+        res.headers = CaseInsensitiveDict(self.headers)
+        res._content = self.content.encode()  # noqa: SLF001
+        res.encoding = "utf-8"
+        res.url = self.url
+        return res
+
+
+def redact(v: object, parent: str | None = None) -> object:
+    """トークン,パスワード,秘密鍵を伏せる.
+
+    トークンはaccess.token.idに返される
+    """
+    if isinstance(v, dict):
+        return {
+            k: REDACTED
+            if k in SECRET_KEYS or (parent == "token" and k == "id")
+            else redact(x, k)
+            for k, x in v.items()
+        }
+    if isinstance(v, list):
+        return [redact(x, parent) for x in v]
+    return v
+
+
+def _redact_content(text: str) -> str:
+    try:
+        js = json.loads(text)
+    except ValueError:
+        return text
+    return json.dumps(redact(js), ensure_ascii=False)
+
+
+def _params(kwargs: dict[str, Any]) -> dict[str, str] | None:
+    params = kwargs.get("params")
+    return None if params is None else {k: str(v) for k, v in params.items()}
+
+
+def _interaction(
+    method: str,
+    url: str,
+    kwargs: dict[str, Any],
+    res: requests.Response,
+    elapsed: float,
+) -> Interaction:
+    return Interaction(
+        method=method,
+        url=url,
+        params=_params(kwargs),
+        body=redact(kwargs.get("json")),
+        status=res.status_code,
+        headers={
+            k: REDACTED if k.lower() in _SECRET_HEADERS else v
+            for k, v in res.headers.items()
+            if k.lower() not in _DROP_HEADERS
+        },
+        content=_redact_content(res.text),
+        elapsed=elapsed,
+    )
+
+
+class Recorder:
+    """送信したリクエストとレスポンスをカセットへ追記する."""
+
+    def __init__(self, path: Path) -> None:
+        """Init.
+
+        :param path: カセット. 既にあれば空にする
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("", encoding="utf-8")
+
+    def __call__(
+        self,
+        s: requests.Session,
+        method: str,
+        url: str,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> requests.Response:
+        """transport.set_senderへ渡す."""
+        started = time.perf_counter()
+        res = s.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - started
+        line = _interaction(method, url, kwargs, res, elapsed).model_dump_json()
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        return res
+
+
+class Player:
+    """カセットのレスポンスを記録した順に返す.
+
+    同じリクエストが複数回あれば記録した順に返すので,状態監視のループも再現できる
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        zero_latency: bool = False,  # noqa: FBT002
+        sleep: Callable[[float], object] = time.sleep,
+    ) -> None:
+        """Init.
+
+        :param zero_latency: Trueなら記録した所要時間を待たずに返す
+        """
+        self.zero_latency = zero_latency
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._queues: dict[str, deque[Interaction]] = {}
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip() == "":
+                    continue
+                i = Interaction.model_validate_json(line)
+                self._queues.setdefault(i.key(), deque()).append(i)
+
+    def __call__(
+        self,
+        _s: requests.Session,
+        method: str,
+        url: str,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> requests.Response:
+        """transport.set_senderへ渡す."""
+        key = Interaction(
+            method=method,
+            url=url,
+            params=_params(kwargs),
+            body=redact(kwargs.get("json")),
+            status=0,
+            elapsed=0,
+        ).key()
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                msg = f"{method} {url}の記録がありません"
+                raise CassetteMissError(msg)
+            i = queue.popleft()
+        if not self.zero_latency:
+            self._sleep(i.elapsed)
+        return i.to_response()
+
+
+@contextmanager
+def recording(path: Path) -> Iterator[Recorder]:
+    """この中で送信したリクエストを記録する."""
+    recorder = Recorder(path)
+    prev = transport.set_sender(recorder)
+    try:
+        yield recorder
+    finally:
+        transport.set_sender(prev)
+
+
+@contextmanager
+def replaying(
+    path: Path,
+    zero_latency: bool = False,  # noqa: FBT002
+) -> Iterator[Player]:
+    """この中ではリクエストを送信せずにカセットから返す."""
+    player = Player(path, zero_latency)
+    prev = transport.set_sender(player)
+    try:
+        yield player
+    finally:
+        transport.set_sender(prev)
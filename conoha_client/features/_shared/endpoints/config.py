@@ -0,0 +1,185 @@
+"""API呼び出しの設定.
+
+設定ファイル,環境変数,コマンドライン引数の順に上書きして1度だけ解決する
+設定ファイル(ini形式)の例
+    [default]
+    region_no = 3
+    timeout = 5
+    rate_limit = 20
+"""
+from __future__ import annotations
+
+import os
+import threading
+from configparser import ConfigParser
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from .profiles import Profile, current_profile
+
+DEFAULT_CONFIG_PATH = "~/.config/conoha-client/config.ini"
+DEFAULT_BASE_URL = "https://{prefix}.{region}.conoha.io/{version}/"
+DEFAULT_RATE_LIMIT = 10.0
+DEFAULT_TIMEOUT = 3.0
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CACHE_DIR = "~/.cache/conoha-client"
+REGION_NOS = ("1", "2", "3")
+
+# 設定項目と対応する環境変数
+ENV_NAMES = {
+    "username": "OS_USERNAME",
+    "password": "OS_PASSWORD",
+    "tenant_id": "OS_TENANT_ID",
+    "region_no": "OS_CONOHA_REGION_NO",
+    "base_url": "OS_CONOHA_BASE_URL",
+    "rate_limit": "OS_CONOHA_RATE_LIMIT",
+    "timeout": "OS_CONOHA_TIMEOUT",
+    "pool_size": "OS_CONOHA_POOL_SIZE",
+    "cache_dir": "OS_CONOHA_CACHE_DIR",
+    "billing_db": "OS_CONOHA_BILLING_DB",
+    "metrics_textfile": "OS_CONOHA_METRICS_TEXTFILE",
+    "metrics_port": "OS_CONOHA_METRICS_PORT",
+}
+
+_region_no: ContextVar[str | None] = ContextVar("region_no", default=None)
+_lock = threading.Lock()
+_loaded: Settings | None = None
+_overrides: dict[str, object] = {}
+
+
+class Settings(BaseModel, frozen=True):
+    """解決済みの設定.
+
+    認証情報,リージョン,テナントIDは未設定でもよく,使うときに検証する
+    """
+
+    username: str | None = None
+    password: str | None = Field(None, repr=False)
+    tenant_id: str | None = None
+    region_no: str | None = None
+    base_url: str = DEFAULT_BASE_URL
+    rate_limit: float = Field(DEFAULT_RATE_LIMIT, description="0以下なら制限しない")
+    timeout: float = Field(DEFAULT_TIMEOUT, gt=0)
+    pool_size: int = Field(DEFAULT_POOL_SIZE, gt=0, description="ホストごとの接続数")
+    cache_dir: Path = Path(DEFAULT_CACHE_DIR).expanduser()
+    billing_db: Path | None = None
+    metrics_textfile: Path | None = Field(None, description="終了時に計測値を書き出す")
+    metrics_port: int | None = Field(None, ge=0, description="計測値を公開するポート")
+
+    @field_validator("region_no")
+    @classmethod
+    def _digits(cls, v: str | None) -> str | None:
+        if v is not None and not v.isdigit():
+            msg = "数字を入力してください"
+            raise ValueError(msg)
+        return v
+
+    @field_validator("cache_dir", "billing_db", "metrics_textfile")
+    @classmethod
+    def _expand(cls, v: Path | None) -> Path | None:
+        return None if v is None else v.expanduser()
+
+
+def config_path() -> Path:
+    """設定ファイルのパス. OS_CONOHA_CONFIGで変更できる."""
+    p = os.environ.get("OS_CONOHA_CONFIG", DEFAULT_CONFIG_PATH)
+    return Path(p).expanduser()
+
+
+def load_settings(
+    path: Path | None = None,
+    overrides: dict[str, object] | None = None,
+) -> Settings:
+    """設定ファイル,環境変数,overridesの順に上書きして解決する.
+
+    :param path: 設定ファイル. なければ読まない
+    :param overrides: コマンドライン引数など. Noneの値は無視する
+    """
+    parser = ConfigParser()
+    parser.read(config_path() if path is None else path, encoding="utf-8")
+    values: dict[str, object] = {
+        k: v for k, v in parser["DEFAULT"].items() if k in ENV_NAMES
+    }
+    if parser.has_section("default"):
+        values |= {k: v for k, v in parser["default"].items() if k in ENV_NAMES}
+    values |= {k: os.environ[e] for k, e in ENV_NAMES.items() if e in os.environ}
+    values |= {k: v for k, v in (overrides or {}).items() if v is not None}
+    try:
+        return Settings.model_validate(values)
+    except ValidationError as e:
+        field = str(e.errors()[0]["loc"][0])
+        msg = f"{ENV_NAMES.get(field, field)}の値が不正です: {e.errors()[0]['msg']}"
+        raise ValueError(msg) from e
+
+
+def configure(**overrides: object) -> None:
+    """コマンドライン引数で設定を上書きする. 次の参照時に解決し直す."""
+    global _loaded  # noqa: PLW0603
+    with _lock:
+        _overrides.update(overrides)
+        _loaded = None
+
+
+def reset_settings() -> None:
+    """解決済みの設定と上書きを捨てる. 環境変数を変えたテストなどで使う."""
+    global _loaded  # noqa: PLW0603
+    with _lock:
+        _overrides.clear()
+        _loaded = None
+    _override.cache_clear()
+
+
+def base_settings() -> Settings:
+    """プロセスで1度だけ解決する設定."""
+    global _loaded  # noqa: PLW0603
+    with _lock:
+        if _loaded is None:
+            _loaded = load_settings(overrides=_overrides)
+        return _loaded
+
+
+def settings() -> Settings:
+    """現在のコンテキストの設定.
+
+    use_profile,use_regionで切り替えていればその値で上書きする
+    """
+    s = base_settings()
+    profile = current_profile()
+    no = _region_no.get()
+    if profile is None and no is None:
+        return s
+    return _override(s, profile, no)
+
+
+@lru_cache(maxsize=64)
+def _override(s: Settings, profile: Profile | None, no: str | None) -> Settings:
+    update: dict[str, object] = {}
+    if profile is not None:
+        update |= {
+            "username": profile.username,
+            "password": profile.password,
+            "tenant_id": profile.tenant_id,
+        }
+        if profile.region_no is not None:
+            update["region_no"] = profile.region_no
+    if no is not None:
+        update["region_no"] = no
+    return s.model_copy(update=update)
+
+
+@contextmanager
+def use_region(no: str) -> Iterator[None]:
+    """OS_CONOHA_REGION_NOの代わりに使うリージョン番号.
+
+    スレッドごとに切り替えられるので複数リージョンへ並行してリクエストできる
+    """
+    token = _region_no.set(no)
+    try:
+        yield
+    finally:
+        _region_no.reset(token)
@@ -2,14 +2,21 @@
 from __future__ import annotations
 
 from enum import Enum
+from functools import lru_cache
+from typing import TYPE_CHECKING
 from urllib.parse import urljoin
 
-import requests
+from conoha_client.features._shared.singleflight import SingleFlight
 
+from . import transport
+from .config import settings
 from .environments import env_region, env_tenant_id
 from .token import token_headers
 
-TIMEOUT = 3.0
+if TYPE_CHECKING:
+    import requests
+
+_inflight: SingleFlight[requests.Response] = SingleFlight()
 
 
 class Endpoints(Enum):
@@ -38,19 +45,15 @@ class Endpoints(Enum):
 
         :param relative: baseURL以降の文字列
         """
-        p = self.prefix
-        r = env_region()
-        v = self.version
-        base = f"https://{p}.{r}.conoha.io/{v}/"
-        return urljoin(base, relative)
+        return urljoin(_base_urls(settings().base_url, env_region())[self], relative)
 
     def tenant_id_url(self, relative: str) -> str:
         """Tenant id付きエンドポイントを組み立てる.
 
         :param relative: baseURL以降の文字列
         """
-        url = self.url(env_tenant_id())
-        return urljoin(f"{url}/", relative)
+        urls = _tenant_id_urls(settings().base_url, env_region(), env_tenant_id())
+        return urljoin(urls[self], relative)
 
     def get(
         self,
@@ -61,13 +64,19 @@ class Endpoints(Enum):
 
         :param relative: テナントID以降の文字列
         :param params: (optional) クエリパラメータ
+        同時に実行中の同一リクエストがあれば,そのレスポンスを共有する
         """
         url = self.tenant_id_url(relative)
-        return requests.get(
-            url,
-            headers=token_headers(),
-            timeout=TIMEOUT,
-            params=params,
+        key = (url, _query_key(params))
+        return _inflight.do(
+            key,
+            lambda: transport.send(
+                "GET",
+                url,
+                headers=token_headers(),
+                timeout=settings().timeout,
+                params=params,
+            ),
         )
 
     def post(self, relative: str, json: object) -> requests.Response:
@@ -77,10 +86,11 @@ class Endpoints(Enum):
         :param json: リクエストボディ(jsonable object)
         """
         url = self.tenant_id_url(relative)
-        return requests.post(
+        return transport.send(
+            "POST",
             url,
             headers=token_headers(),
-            timeout=TIMEOUT * 3,  # VM addでタイムアウトしたから延長
+            timeout=settings().timeout * 3,  # VM addでタイムアウトしたから延長
             json=json,
         )
 
@@ -92,8 +102,37 @@ class Endpoints(Enum):
         url = self.tenant_id_url(relative)
         if self == Endpoints.IMAGE:
             url = self.url(relative)
-        return requests.delete(
+        return transport.send(
+            "DELETE",
             url,
             headers=token_headers(),
-            timeout=TIMEOUT * 3,
+            timeout=settings().timeout * 3,
         )
+
+
+def _query_key(params: dict | None) -> tuple:
+    """同一リクエストの判定に使うクエリパラメータ. 複数値のリストも扱う."""
+    return tuple(
+        sorted(
+            (k, tuple(v) if isinstance(v, list) else v)
+            for k, v in (params or {}).items()
+        ),
+    )
+
+
+@lru_cache(maxsize=32)
+def _base_urls(base_url: str, region: str) -> dict[Endpoints, str]:
+    """エンドポイントごとのベースURL. 書式とリージョンごとに1度だけ組み立てる."""
+    return {
+        e: base_url.format(prefix=e.prefix, region=region, version=e.version)
+        for e in Endpoints
+    }
+
+
+@lru_cache(maxsize=32)
+def _tenant_id_urls(base_url: str, region: str, tenant_id: str) -> dict[Endpoints, str]:
+    """エンドポイントごとのテナントID付きベースURL."""
+    return {
+        e: f"{urljoin(url, tenant_id)}/"
+        for e, url in _base_urls(base_url, region).items()
+    }
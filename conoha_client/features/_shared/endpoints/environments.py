@@ -1,52 +1,88 @@
-"""環境変数からAPI呼び出しに必要な情報を読み取る."""
-import os
+"""API呼び出しに必要な情報を解決済みの設定から読み取る."""
+from __future__ import annotations
+
+from .config import (
+    DEFAULT_BASE_URL,
+    DEFAULT_RATE_LIMIT,
+    REGION_NOS,
+    settings,
+    use_region,
+)
+
+__all__ = [
+    "DEFAULT_BASE_URL",
+    "DEFAULT_RATE_LIMIT",
+    "REGION_NOS",
+    "env_base_url",
+    "env_credentials",
+    "env_rate_limit",
+    "env_region",
+    "env_tenant_id",
+    "use_region",
+]
 
 
 def env_credentials() -> dict:
-    """環境変数からトークン発行用認証情報を作成する."""
-    try:
-        return {
-            "auth": {
-                "passwordCredentials": {
-                    "username": os.environ["OS_USERNAME"],
-                    "password": os.environ["OS_PASSWORD"],
-                },
-                "tenantId": os.environ["OS_TENANT_ID"],
-            },
-        }
-    except KeyError as e:
+    """トークン発行用認証情報を作成する.
+
+    use_profileで切り替えていればプロファイルの認証情報を使う
+    """
+    s = settings()
+    if s.username is None or s.password is None or s.tenant_id is None:
         msg = (
             "環境変数にConoHa VPSのAPI情報を設定してください:"
             "OS_USERNAME: APIユーザー名, "
             "OS_PASSWORD: APIユーザーのパスワード, "
             "OS_TENANT_ID: テナント情報のテナントID"
         )
-        raise KeyError(msg) from e
+        raise KeyError(msg)
+    return {
+        "auth": {
+            "passwordCredentials": {
+                "username": s.username,
+                "password": s.password,
+            },
+            "tenantId": s.tenant_id,
+        },
+    }
 
 
 def env_region() -> str:
-    """ConoHa VPSのリージョンを環境変数から取得する."""
-    no_str = ""
-    try:
-        no_str = os.environ["OS_CONOHA_REGION_NO"]
-    except KeyError as e:
+    """ConoHa VPSのリージョン.
+
+    use_region,プロファイルのリージョン番号,OS_CONOHA_REGION_NOの順に優先する
+    """
+    no_str = settings().region_no
+    if no_str is None:
         msg = (
             "環境変数OS_CONOHA_REGION_NOに"
             "ConoHa VPSのリージョン番号を指定してください"
         )
-        raise KeyError(msg) from e
-
-    if not str.isdigit(no_str):
-        msg = "OS_CONOHA_REGION_NO環境変数には数字を入力してください"
-        raise ValueError(msg)
-
+        raise KeyError(msg)
     return f"tyo{no_str}"
 
 
 def env_tenant_id() -> str:
-    """ConoHa VPSのテナントIDを環境変数から取得する."""
-    try:
-        return os.environ["OS_TENANT_ID"]
-    except KeyError as e:
+    """ConoHa VPSのテナントID."""
+    tenant_id = settings().tenant_id
+    if tenant_id is None:
         msg = "OS_TENANT_ID環境変数にテナントIDを入力してください"
-        raise KeyError(msg) from e
+        raise KeyError(msg)
+    return tenant_id
+
+
+def env_base_url() -> str:
+    """APIのベースURLの書式.
+
+    偽サーバーなどへ向ける場合にOS_CONOHA_BASE_URLを指定する
+    e.g. http://localhost:8080/{prefix}/{version}/
+    """
+    return settings().base_url
+
+
+def env_rate_limit() -> float:
+    """エンドポイントのホストごとの1秒あたりのリクエスト数上限.
+
+    0以下なら制限しない
+    """
+    return settings().rate_limit
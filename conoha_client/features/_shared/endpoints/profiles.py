@@ -0,0 +1,83 @@
+"""複数アカウント(テナント)の認証情報.
+
+設定ファイル(ini形式)の例
+    [dev]
+    username = gncu12345678
+    password = ***
+    tenant_id = 0123456789abcdef
+    region_no = 3  ; optional
+"""
+from __future__ import annotations
+
+import os
+from configparser import ConfigParser
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cache
+from pathlib import Path
+from typing import Iterator
+
+from pydantic import BaseModel, Field
+
+DEFAULT_PROFILES_PATH = "~/.config/conoha-client/profiles.ini"
+
+_profile: ContextVar[Profile | None] = ContextVar("profile", default=None)
+
+
+class Profile(BaseModel, frozen=True):
+    """1アカウント分の認証情報."""
+
+    name: str
+    username: str
+    password: str = Field(repr=False)
+    tenant_id: str
+    region_no: str | None = None
+
+
+class ProfileNotFoundError(Exception):
+    """設定ファイルにないプロファイル名が指定された."""
+
+
+def profiles_path() -> Path:
+    """設定ファイルのパス. OS_CONOHA_PROFILESで変更できる."""
+    p = os.environ.get("OS_CONOHA_PROFILES", DEFAULT_PROFILES_PATH)
+    return Path(p).expanduser()
+
+
+@cache
+def load_profiles(path: Path | None = None) -> dict[str, Profile]:
+    """設定ファイルを1度だけ読み込む. ファイルがなければ空."""
+    p = profiles_path() if path is None else path
+    parser = ConfigParser()
+    parser.read(p, encoding="utf-8")
+    return {
+        name: Profile.model_validate({"name": name, **parser[name]})
+        for name in parser.sections()
+    }
+
+
+def find_profile(name: str, path: Path | None = None) -> Profile:
+    """名前からプロファイルを探す."""
+    profiles = load_profiles(path)
+    if name not in profiles:
+        msg = f"{name}は{profiles_path() if path is None else path}にありません"
+        raise ProfileNotFoundError(msg)
+    return profiles[name]
+
+
+def current_profile() -> Profile | None:
+    """use_profileで切り替え中のプロファイル."""
+    return _profile.get()
+
+
+@contextmanager
+def use_profile(profile: Profile) -> Iterator[None]:
+    """環境変数の代わりにプロファイルの認証情報を使う.
+
+    スレッドごとに切り替えられるので複数アカウントへ並行してリクエストできる
+    """
+    token = _profile.set(profile)
+    try:
+        yield
+    finally:
+        _profile.reset(token)
@@ -0,0 +1,76 @@
+"""cassette test."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from . import transport
+from .cassette import REDACTED, CassetteMissError, Player, recording, replaying
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from requests_mock import Mocker
+
+TOKENS = "https://identity.tyo1.conoha.io/v2.0/tokens"
+SERVERS = "https://compute.tyo1.conoha.io/v2/xxx/servers/detail"
+KEYPAIRS = "https://compute.tyo1.conoha.io/v2/xxx/os-keypairs"
+CREDENTIALS = {"auth": {"passwordCredentials": {"username": "u", "password": "p"}}}
+
+
+def test_record_replay(requests_mock: Mocker, tmp_path: Path) -> None:
+    """トークンとパスワードを伏せて記録し,記録した順に再生する."""
+    requests_mock.post(
+        TOKENS,
+        json={"access": {"token": {"id": "secret", "expires": "2100-01-01T00:00:00Z"}}},
+        headers={"X-Subject-Token": "secret"},
+    )
+    requests_mock.get(SERVERS, [{"json": {"servers": []}}, {"json": {"servers": [1]}}])
+    path = tmp_path / "cassette.jsonl"
+    with recording(path):
+        transport.send("POST", TOKENS, json=CREDENTIALS, timeout=1)
+        transport.send("GET", SERVERS, params={"changes-since": "a"}, timeout=1)
+        transport.send("GET", SERVERS, params={"changes-since": "b"}, timeout=1)
+    recorded = path.read_text(encoding="utf-8")
+    assert "secret" not in recorded
+    assert '"password":"p"' not in recorded
+    assert recorded.count("\n") == 3  # noqa: PLR2004
+
+    n_sent = requests_mock.call_count
+    with replaying(path, zero_latency=True):
+        token = transport.send("POST", TOKENS, json=CREDENTIALS, timeout=1)
+        first = transport.send("GET", SERVERS, params={"changes-since": "c"})
+        second = transport.send("GET", SERVERS, params={"changes-since": "d"})
+        with pytest.raises(CassetteMissError):
+            transport.send("GET", SERVERS)
+    assert requests_mock.call_count == n_sent
+    assert token.json()["access"]["token"]["id"] == REDACTED
+    assert token.headers["x-subject-token"] == REDACTED
+    assert first.json() == {"servers": []}
+    assert second.json() == {"servers": [1]}
+
+
+def test_record_keypair(requests_mock: Mocker, tmp_path: Path) -> None:
+    """キーペア作成で返される秘密鍵を記録しない."""
+    keypair = {"name": "k", "public_key": "ssh-rsa pub", "private_key": "PRIVATE"}
+    requests_mock.post(KEYPAIRS, json={"keypair": keypair})
+    path = tmp_path / "cassette.jsonl"
+    with recording(path):
+        transport.send("POST", KEYPAIRS, json={"keypair": {"name": "k"}})
+    recorded = path.read_text(encoding="utf-8")
+    assert "PRIVATE" not in recorded
+    assert "ssh-rsa pub" in recorded
+
+
+def test_latency(requests_mock: Mocker, tmp_path: Path) -> None:
+    """記録した所要時間だけ待って返す."""
+    requests_mock.get(SERVERS, json={})
+    path = tmp_path / "cassette.jsonl"
+    with recording(path):
+        transport.send("GET", SERVERS)
+    slept = []
+    player = Player(path, sleep=slept.append)
+    assert player(None, "GET", SERVERS).status_code == 200  # noqa: PLR2004
+    assert len(slept) == 1
+    assert slept[0] >= 0
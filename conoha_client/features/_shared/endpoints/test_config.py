@@ -0,0 +1,61 @@
+"""config test."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from .config import configure, load_settings, settings, use_region
+from .endpoints import Endpoints
+from .profiles import Profile, use_profile
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+INI = """
+[default]
+region_no = 2
+timeout = 5
+rate_limit = 20
+"""
+
+
+def test_precedence(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """設定ファイル < 環境変数 < コマンドライン引数."""
+    p = tmp_path / "config.ini"
+    p.write_text(INI)
+    monkeypatch.setenv("OS_CONOHA_RATE_LIMIT", "30")
+    s = load_settings(p, {"timeout": 7, "region_no": None})
+    assert s.region_no == "2"
+    assert s.rate_limit == 30  # noqa: PLR2004
+    assert s.timeout == 7  # noqa: PLR2004
+
+    monkeypatch.setenv("OS_CONOHA_POOL_SIZE", "x")
+    with pytest.raises(ValueError, match="OS_CONOHA_POOL_SIZE"):
+        load_settings(p)
+
+
+def test_resolve_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """解決後の環境変数の変更は反映せず,切り替えとconfigureは反映する."""
+    monkeypatch.setenv("OS_CONOHA_REGION_NO", "1")
+    monkeypatch.setenv("OS_TENANT_ID", "env-tenant")
+    assert settings() is settings()
+    url = Endpoints.COMPUTE.tenant_id_url("servers")
+    assert url == "https://compute.tyo1.conoha.io/v2/env-tenant/servers"
+
+    monkeypatch.setenv("OS_CONOHA_REGION_NO", "3")
+    assert settings().region_no == "1"
+    with use_region("2"):
+        assert Endpoints.COMPUTE.url("x") == "https://compute.tyo2.conoha.io/v2/x"
+    profile = Profile(
+        name="dev",
+        username="u",
+        password="p",  # noqa: S106
+        tenant_id="dev-tenant",
+    )
+    with use_profile(profile):
+        assert settings().tenant_id == "dev-tenant"
+        assert settings().region_no == "1"
+
+    configure(region_no="2")
+    assert settings().region_no == "2"
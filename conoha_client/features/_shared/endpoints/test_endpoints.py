@@ -3,7 +3,7 @@
 
 from _pytest.monkeypatch import MonkeyPatch
 
-from .endpoints import Endpoints
+from .endpoints import Endpoints, _query_key
 
 
 def test_url(monkeypatch: MonkeyPatch) -> None:
@@ -38,3 +38,21 @@ def test_tenant_id_url(monkeypatch: MonkeyPatch) -> None:
     if relative not in url:
         msg = "Expected with relative"
         raise ValueError(msg)
+
+
+def test_base_url(monkeypatch: MonkeyPatch) -> None:
+    """偽サーバーなどへ向ける."""
+    monkeypatch.setenv("OS_CONOHA_REGION_NO", "1")
+    monkeypatch.setenv("OS_CONOHA_BASE_URL", "http://localhost:8080/{prefix}/{version}/")
+
+    url = Endpoints.COMPUTE.url("xxx")
+    assert url == "http://localhost:8080/compute/v2/xxx"
+
+
+def test_query_key() -> None:
+    """複数値のパラメータでもキーにできる."""
+    key = _query_key({"status": ["ACTIVE", "SHUTOFF"], "limit": 10})
+    assert hash(key) == hash(
+        _query_key({"limit": 10, "status": ["ACTIVE", "SHUTOFF"]}),
+    )
+    assert _query_key(None) == ()
@@ -6,6 +6,7 @@ import pytest
 from _pytest.monkeypatch import MonkeyPatch
 
 from . import environments
+from .config import reset_settings
 
 
 @pytest.mark.parametrize(
@@ -39,5 +40,6 @@ def test_invalid_env_region(monkeypatch: MonkeyPatch) -> None:
         environments.env_region()
 
     monkeypatch.setenv(env_attr, "NaN")
+    reset_settings()
     with pytest.raises(ValueError, match=env_attr):
         environments.env_region()
@@ -0,0 +1,48 @@
+"""profiles test."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from .environments import env_credentials, env_region, env_tenant_id, use_region
+from .profiles import ProfileNotFoundError, find_profile, load_profiles, use_profile
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+INI = """
+[dev]
+username = dev-user
+password = dev-pass
+tenant_id = dev-tenant
+
+[prod]
+username = prod-user
+password = prod-pass
+tenant_id = prod-tenant
+region_no = 3
+"""
+
+
+def test_use_profile(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """切り替え中は環境変数よりプロファイルを優先する."""
+    monkeypatch.setenv("OS_CONOHA_REGION_NO", "1")
+    monkeypatch.setenv("OS_TENANT_ID", "env-tenant")
+    p = tmp_path / "profiles.ini"
+    p.write_text(INI)
+    assert list(load_profiles(p)) == ["dev", "prod"]
+
+    with use_profile(find_profile("dev", p)):
+        assert env_tenant_id() == "dev-tenant"
+        assert env_region() == "tyo1"
+        auth = env_credentials()["auth"]
+        assert auth["passwordCredentials"]["username"] == "dev-user"
+    with use_profile(find_profile("prod", p)):
+        assert env_region() == "tyo3"
+        with use_region("2"):
+            assert env_region() == "tyo2"
+    assert env_tenant_id() == "env-tenant"
+
+    with pytest.raises(ProfileNotFoundError):
+        find_profile("stg", p)
@@ -0,0 +1,32 @@
+"""token test."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from conoha_client.features._shared.conftest import prepare
+
+from .config import reset_settings
+from .endpoints import Endpoints
+from .token import clear_tokens, issue_token_id
+
+if TYPE_CHECKING:
+    import pytest
+    from requests_mock import Mocker
+
+
+def test_token_cache(requests_mock: Mocker, monkeypatch: pytest.MonkeyPatch) -> None:
+    """有効期限のあるトークンはリージョンごとに使い回す."""
+    prepare(requests_mock, monkeypatch)
+    clear_tokens()
+    for no in ("1", "2"):
+        requests_mock.post(
+            Endpoints.IDENTITY.url("tokens").replace("tyo1", f"tyo{no}"),
+            json={"access": {"token": {"id": no, "expires": "2099-01-01T00:00:00Z"}}},
+        )
+    assert issue_token_id() == "1"
+    assert issue_token_id() == "1"
+    monkeypatch.setenv("OS_CONOHA_REGION_NO", "2")
+    reset_settings()
+    assert issue_token_id() == "2"
+    assert requests_mock.call_count == 2  # noqa: PLR2004
+    clear_tokens()
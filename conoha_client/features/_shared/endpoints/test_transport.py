@@ -0,0 +1,55 @@
+"""transport test."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from . import transport
+from .config import reset_settings
+
+if TYPE_CHECKING:
+    import pytest
+    from requests_mock import Mocker
+
+URL = "https://compute.tyo1.conoha.io/v2/xxx"
+
+
+def test_retry_after(requests_mock: Mocker) -> None:
+    """429はRetry-Afterに従って再送する."""
+    requests_mock.get(
+        URL,
+        [
+            {"status_code": 429, "headers": {"Retry-After": "0"}},
+            {"status_code": 503, "headers": {"Retry-After": "0"}},
+            {"status_code": 200, "json": {}},
+        ],
+    )
+    before = transport.throttle_stats()
+    res = transport.send("GET", URL, timeout=1)
+    assert res.status_code == 200  # noqa: PLR2004
+    assert requests_mock.call_count == 3  # noqa: PLR2004
+    assert transport.throttle_stats().retries == before.retries + 2
+
+
+def test_no_retry(requests_mock: Mocker) -> None:
+    """Retry-Afterのない503は再送しない."""
+    requests_mock.get(URL, status_code=503)
+    res = transport.send("GET", URL, timeout=1)
+    assert res.status_code == 503  # noqa: PLR2004
+    assert requests_mock.call_count == 1
+
+
+def test_no_retry_post(requests_mock: Mocker) -> None:
+    """POSTは処理されたか分からないので503では再送しない."""
+    requests_mock.post(URL, status_code=503, headers={"Retry-After": "0"})
+    res = transport.send("POST", URL, timeout=1)
+    assert res.status_code == 503  # noqa: PLR2004
+    assert requests_mock.call_count == 1
+
+
+def test_unlimited(monkeypatch: pytest.MonkeyPatch) -> None:
+    """0以下なら流量制限しない."""
+    monkeypatch.setenv("OS_CONOHA_RATE_LIMIT", "0")
+    assert transport.limiter("unlimited.example.com") is None
+    monkeypatch.setenv("OS_CONOHA_RATE_LIMIT", "5")
+    reset_settings()
+    assert transport.limiter("limited.example.com").rate == 5  # noqa: PLR2004
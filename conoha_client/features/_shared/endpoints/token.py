@@ -1,17 +1,66 @@
 """認証周りの処理."""
 from __future__ import annotations
 
-import requests
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 
-from . import endpoints
+from conoha_client.features._shared import metrics
+from conoha_client.features._shared.util import utc2jst
+
+from . import endpoints, transport
+from .config import settings
 from .environments import env_credentials
 
+# 期限切れ間際のトークンを使わないための余裕
+EXPIRY_MARGIN = timedelta(minutes=5)
+
+_lock = threading.Lock()
+_tokens: dict[tuple[str, str, str], tuple[str, datetime]] = {}
+
+
+def _token_key(url: str) -> tuple[str, str, str]:
+    """リージョン(URL),テナント,ユーザーごとにトークンを分ける."""
+    s = settings()
+    return (url, s.tenant_id or "", s.username or "")
+
 
 def issue_token_id() -> str:
-    """ConoHa API用のトークンを発行する."""
+    """ConoHa API用のトークンを発行する.
+
+    有効期限が返されたトークンは期限が近づくまで使い回す
+    認証情報は使い回せないときだけ組み立てる
+    """
     url = endpoints.Endpoints.IDENTITY.url("tokens")
-    res = requests.post(url, json=env_credentials(), timeout=3.0)
-    return res.json()["access"]["token"]["id"]
+    key = _token_key(url)
+    with _lock:
+        cached = _tokens.get(key)
+    if cached is not None and datetime.now(timezone.utc) < cached[1]:
+        metrics.count_cache("token", hit=True)
+        return cached[0]
+
+    metrics.count_cache("token", hit=False)
+    started = time.perf_counter()
+    res = transport.send(
+        "POST",
+        url,
+        json=env_credentials(),
+        timeout=settings().timeout,
+    )
+    elapsed = time.perf_counter() - started
+    metrics.observe("conoha_token_issue_duration_seconds", elapsed)
+    token = res.json()["access"]["token"]
+    expires = token.get("expires")
+    if expires is not None:
+        with _lock:
+            _tokens[key] = (token["id"], utc2jst(expires) - EXPIRY_MARGIN)
+    return token["id"]
+
+
+def clear_tokens() -> None:
+    """使い回しているトークンを捨てる."""
+    with _lock:
+        _tokens.clear()
 
 
 def token_headers() -> dict[str, str]:
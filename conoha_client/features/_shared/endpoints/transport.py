@@ -0,0 +1,198 @@
+"""HTTPリクエストの送信窓口.
+
+Endpointsとトークン発行のリクエストは全てここを経由する
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+import requests
+from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
+
+from conoha_client.features._shared import metrics
+from conoha_client.features._shared.throttle import TokenBucket
+
+from .config import settings
+
+Hook = Callable[[requests.Response, float], None]
+# (セッション, メソッド, URL, requests.requestの引数)からレスポンスを得る
+Sender = Callable[..., requests.Response]
+
+MAX_RETRIES = 5
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+_hooks: list[Hook] = []
+_lock = threading.Lock()
+_limiters: dict[str, TokenBucket] = {}
+_sessions: dict[str, requests.Session] = {}
+_stats = {"throttled_sec": 0.0, "retries": 0}
+_sender: Sender | None = None
+
+
+class ThrottleStats(BaseModel, frozen=True):
+    """流量制限で待たされた実績."""
+
+    throttled_sec: float
+    retries: int
+
+
+def add_hook(hook: Hook) -> None:
+    """レスポンス受信毎に呼ばれる関数を登録する.
+
+    :param hook: (レスポンス, 所要秒数)を受け取る関数
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    """登録済みの関数を解除する."""
+    _hooks.remove(hook)
+
+
+def set_sender(sender: Sender | None) -> Sender | None:
+    """送信処理を差し替える. 記録と再生に使う.
+
+    :param sender: Noneなら実際に送信する
+    :return: 差し替える前の送信処理
+    """
+    global _sender
+    with _lock:
+        prev, _sender = _sender, sender
+    return prev
+
+
+def _request(
+    s: requests.Session,
+    method: str,
+    url: str,
+    **kwargs: Any,  # noqa: ANN401
+) -> requests.Response:
+    return s.request(method, url, **kwargs)
+
+
+def throttle_stats() -> ThrottleStats:
+    """プロセス開始からの流量制限の実績."""
+    with _lock:
+        return ThrottleStats.model_validate(_stats)
+
+
+def limiter(host: str) -> TokenBucket | None:
+    """ホストごとにスレッド間で共有する流量制限.
+
+    OS_CONOHA_RATE_LIMITが0以下なら制限しない
+    """
+    with _lock:
+        if host not in _limiters:
+            rate = settings().rate_limit
+            if rate <= 0:
+                return None
+            _limiters[host] = TokenBucket(rate=rate, capacity=max(rate, 1))
+        return _limiters[host]
+
+
+def session(host: str) -> requests.Session:
+    """ホスト(リージョン)ごとにコネクションを使い回すセッション.
+
+    並行実行で接続を捨てないよう接続数の上限をOS_CONOHA_POOL_SIZEに合わせる
+    """
+    with _lock:
+        if host not in _sessions:
+            s = requests.Session()
+            size = settings().pool_size
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _sessions[host] = s
+        return _sessions[host]
+
+
+def retry_after(res: requests.Response) -> float | None:
+    """Retry-Afterヘッダーの秒数. 秒数とHTTP日付の両形式に対応."""
+    v = res.headers.get("Retry-After")
+    if v is None:
+        return None
+    if v.strip().isdigit():
+        return float(v)
+    try:
+        dt = parsedate_to_datetime(v)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (dt - datetime.now(timezone.utc)).total_seconds())
+
+
+def _retry_wait(
+    method: str,
+    res: requests.Response,
+    n_retried: int,
+) -> float | None:
+    """再送するまでの秒数. 再送しないならNone.
+
+    503は処理されたか分からないので冪等なメソッドだけ再送する
+    """
+    if res.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+        wait = retry_after(res)
+        return float(2**n_retried) if wait is None else wait
+    if (
+        res.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        and method.upper() in IDEMPOTENT_METHODS
+    ):
+        return retry_after(res)
+    return None
+
+
+def _record(host: str, throttled_sec: float = 0, retries: int = 0) -> None:
+    with _lock:
+        _stats["throttled_sec"] += throttled_sec
+        _stats["retries"] += retries
+    if throttled_sec > 0:
+        metrics.inc("conoha_api_throttled_seconds_total", throttled_sec, host=host)
+    if retries > 0:
+        metrics.inc("conoha_api_retries_total", retries, host=host)
+
+
+def send(method: str, url: str, **kwargs: Any) -> requests.Response:  # noqa: ANN401
+    """HTTPリクエストを送信する.
+
+    ホストごとの流量制限に従い,429と503はRetry-Afterに従って再送する
+    POSTなど冪等でないリクエストは503では再送しない
+    :param method: HTTPメソッド
+    :param url: リクエスト先URL
+    :param kwargs: requests.requestへそのまま渡す引数
+    """
+    host = urlparse(url).netloc
+    bucket = limiter(host)
+    s = session(host)
+    sender = _sender or _request
+    n_retried = 0
+    while True:
+        if bucket is not None:
+            _record(host, throttled_sec=bucket.acquire())
+        started = time.perf_counter()
+        try:
+            res = sender(s, method, url, **kwargs)
+        except requests.RequestException:
+            metrics.observe_request(method, url, "error", time.perf_counter() - started)
+            raise
+        elapsed = time.perf_counter() - started
+        metrics.observe_request(method, url, str(res.status_code), elapsed)
+        for hook in tuple(_hooks):
+            hook(res, elapsed)
+
+        wait = _retry_wait(method, res, n_retried)
+        if wait is None or n_retried >= MAX_RETRIES:
+            return res
+        n_retried += 1
+        _record(host, retries=1)
+        if bucket is None:
+            _record(host, throttled_sec=wait)
+            time.sleep(wait)
+        else:
+            # 同じホストへの他のスレッドのリクエストも待たせる
+            bucket.pause(wait)
@@ -0,0 +1,86 @@
+"""JSONの変換.
+
+orjsonがインストールされていれば使い,なければ標準ライブラリを使う
+"""
+from __future__ import annotations
+
+import json
+from functools import cache
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
+
+from pydantic import BaseModel, ConfigDict, create_model
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if TYPE_CHECKING:
+    import requests
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class JsonBackend(BaseModel, frozen=True):
+    """JSONの変換関数の組."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    loads: Callable[[bytes | str], Any]
+    dumps: Callable[[object], str]
+
+
+STDLIB = JsonBackend(
+    name="json",
+    loads=json.loads,
+    dumps=lambda obj: json.dumps(obj, indent=2),
+)
+
+
+def available_backends() -> list[JsonBackend]:
+    """利用可能なJSONの変換関数の組. 末尾ほど速い."""
+    if orjson is None:
+        return [STDLIB]
+    fast = JsonBackend(
+        name="orjson",
+        loads=orjson.loads,
+        dumps=lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode(),
+    )
+    return [STDLIB, fast]
+
+
+def backend() -> JsonBackend:
+    """利用するJSONの変換関数の組."""
+    return available_backends()[-1]
+
+
+def loads(data: bytes | str) -> Any:  # noqa: ANN401
+    """JSONをpythonオブジェクトへ変換する."""
+    return backend().loads(data)
+
+
+def dumps(obj: object) -> str:
+    """Pythonオブジェクトをインデント付きのJSONへ変換する."""
+    return backend().dumps(obj)
+
+
+def decode(res: requests.Response) -> Any:  # noqa: ANN401
+    """レスポンスボディを変換する. requests.Response.json()の代わり."""
+    return loads(res.content)
+
+
+@cache
+def _body_model(t: type[BaseModel], key: str) -> type[BaseModel]:
+    """{key: [t, ...]}の形のレスポンスボディのモデル."""
+    return create_model(f"{t.__name__}Body", **{key: (list[t], ...)})
+
+
+def validate_list(t: type[M], content: bytes, key: str) -> list[M]:
+    """レスポンスボディのkeyの配列をdictを経由せずbytesから直接検証する.
+
+    :param t: 配列の要素のモデル
+    :param content: レスポンスボディ
+    :param key: 配列を持つキー e.g. images
+    """
+    return getattr(_body_model(t, key).model_validate_json(content), key)
@@ -0,0 +1,223 @@
+"""クライアント側のAPI呼び出しの計測.
+
+リクエスト数,レイテンシ,キャッシュのヒット率,監視のポーリング回数を数え,
+Prometheusのテキスト形式で書き出す
+cronならnode-exporterのtextfileへ終了時に書き出し,常駐するならHTTPで公開する
+"""
+from __future__ import annotations
+
+import atexit
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Literal
+from urllib.parse import urlparse
+
+from .endpoints.config import settings
+
+MetricType = Literal["counter", "gauge", "histogram"]
+Labels = tuple[tuple[str, str], ...]
+
+# Prometheusクライアントの既定値
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+METRICS: dict[str, tuple[MetricType, str]] = {
+    "conoha_api_requests_total": ("counter", "API呼び出し回数"),
+    "conoha_api_request_duration_seconds": ("histogram", "API呼び出しの所要秒数"),
+    "conoha_api_retries_total": ("counter", "429,503による再送回数"),
+    "conoha_api_throttled_seconds_total": ("counter", "流量制限で待たされた秒数"),
+    "conoha_token_issue_duration_seconds": ("histogram", "トークン発行の所要秒数"),
+    "conoha_cache_lookups_total": ("counter", "キャッシュの参照回数"),
+    "conoha_cache_hit_ratio": ("gauge", "キャッシュのヒット率"),
+    "conoha_watcher_polls_total": ("counter", "状態監視の問い合わせ回数"),
+}
+
+# URLの中のID. 要素ごとに系列が増えないようまとめる
+_ID = re.compile(r"^([0-9a-fA-F-]{16,}|\d+)$")
+
+_lock = threading.Lock()
+_counters: dict[str, dict[Labels, float]] = {}
+_histograms: dict[str, dict[Labels, list[float]]] = {}
+_lru_caches: dict[str, Callable] = {}
+_started = False
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1, **labels: str) -> None:
+    """カウンターを増やす."""
+    key = _labels(labels)
+    with _lock:
+        series = _counters.setdefault(name, {})
+        series[key] = series.get(key, 0) + value
+
+
+def observe(name: str, value: float, **labels: str) -> None:
+    """ヒストグラムへ計測値を加える."""
+    key = _labels(labels)
+    with _lock:
+        series = _histograms.setdefault(name, {})
+        # 各バケットの累積数,合計,件数
+        h = series.setdefault(key, [0.0] * (len(BUCKETS) + 2))
+        for i, le in enumerate(BUCKETS):
+            if value <= le:
+                h[i] += 1
+        h[-2] += value
+        h[-1] += 1
+
+
+def endpoint(url: str) -> str:
+    """系列のラベルにするURLのパス. IDは{id}にまとめる."""
+    path = urlparse(url).path
+    return "/".join("{id}" if _ID.match(p) else p for p in path.split("/"))
+
+
+def observe_request(method: str, url: str, status: str, elapsed: float) -> None:
+    """API呼び出し1回分を記録する.
+
+    :param status: HTTPステータスコード. 接続できなければerror
+    """
+    labels = {
+        "method": method.upper(),
+        "host": urlparse(url).netloc,
+        "endpoint": endpoint(url),
+        "status": status,
+    }
+    inc("conoha_api_requests_total", **labels)
+    observe("conoha_api_request_duration_seconds", elapsed, **labels)
+
+
+def count_cache(cache: str, *, hit: bool) -> None:
+    """キャッシュの参照を数える."""
+    inc("conoha_cache_lookups_total", cache=cache, result="hit" if hit else "miss")
+
+
+def count_poll(watcher: str) -> None:
+    """状態監視の問い合わせを数える."""
+    inc("conoha_watcher_polls_total", watcher=watcher)
+
+
+def track_lru(cache: str, func: Callable) -> None:
+    """functools.cacheのヒット数を書き出し時に集計する."""
+    with _lock:
+        _lru_caches[cache] = func
+
+
+def reset_metrics() -> None:
+    """計測値を捨てる. テストで使う."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _lookups() -> dict[str, tuple[float, float]]:
+    """キャッシュごとの(ヒット数,ミス数)."""
+    hits: dict[str, tuple[float, float]] = {}
+    for key, v in _counters.get("conoha_cache_lookups_total", {}).items():
+        d = dict(key)
+        h, m = hits.get(d["cache"], (0, 0))
+        hits[d["cache"]] = (h + v, m) if d["result"] == "hit" else (h, m + v)
+    for cache, func in _lru_caches.items():
+        info = func.cache_info()
+        hits[cache] = (info.hits, info.misses)
+    return hits
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _series(name: str, labels: Labels, value: float) -> str:
+    if len(labels) == 0:
+        return f"{name} {value:g}"
+    s = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+    return f"{name}{{{s}}} {value:g}"
+
+
+def render() -> str:
+    """Prometheusのテキスト形式."""
+    with _lock:
+        counters = {n: dict(s) for n, s in _counters.items()}
+        histograms = {
+            n: {k: list(h) for k, h in s.items()} for n, s in _histograms.items()
+        }
+        lookups = _lookups()
+    for cache, (h, m) in lookups.items():
+        counters.setdefault("conoha_cache_lookups_total", {})
+        counters["conoha_cache_lookups_total"] |= {
+            _labels({"cache": cache, "result": "hit"}): h,
+            _labels({"cache": cache, "result": "miss"}): m,
+        }
+    ratios = {
+        _labels({"cache": c}): h / (h + m) for c, (h, m) in lookups.items() if h + m > 0
+    }
+
+    lines = []
+    for name, (kind, doc) in METRICS.items():
+        lines += [f"# HELP {name} {doc}", f"# TYPE {name} {kind}"]
+        if kind == "histogram":
+            for labels, h in sorted(histograms.get(name, {}).items()):
+                for le, n in zip((*map(str, BUCKETS), "+Inf"), (*h[:-2], h[-1])):
+                    lines.append(_series(f"{name}_bucket", (*labels, ("le", le)), n))
+                lines.append(_series(f"{name}_sum", labels, h[-2]))
+                lines.append(_series(f"{name}_count", labels, h[-1]))
+            continue
+        series = ratios if name == "conoha_cache_hit_ratio" else counters.get(name, {})
+        lines += [_series(name, k, v) for k, v in sorted(series.items())]
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: Path) -> None:
+    """node-exporterのtextfileへ書き出す.
+
+    読み込み途中のファイルを読まれないよう一時ファイルから置き換える
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(render(), encoding="utf-8")
+    tmp.replace(path)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_: object) -> None:
+        """アクセスログを出さない."""
+
+
+def serve(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """計測値をHTTPで公開する. 終了するにはshutdownを呼ぶ.
+
+    :param port: 0なら空いているポート
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_exporters() -> None:
+    """設定に従って書き出しを始める. プロセスで1度だけ."""
+    global _started  # noqa: PLW0603
+    try:
+        s = settings()
+    except ValueError:
+        # 設定の誤りはAPIを呼び出すときに報告する
+        return
+    with _lock:
+        if _started:
+            return
+        _started = True
+    if s.metrics_textfile is not None:
+        atexit.register(write_textfile, s.metrics_textfile)
+    if s.metrics_port is not None:
+        serve(s.metrics_port)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Any, Callable, Iterator, TypeVar
+from bisect import bisect_left
+from operator import itemgetter
+from typing import Any, Callable, Generic, Iterator, TypeVar
 
 from pydantic import BaseModel, RootModel
 
@@ -71,6 +73,37 @@ class ModelList(RootModel[list[T]], frozen=True):
             return founds[0]
         raise MultipleMatchError
 
+    def prefix_index(self, attr: str) -> PrefixIndex[T]:
+        """前方一致検索用の索引を作る."""
+        return PrefixIndex(self.root, attr)
+
+
+class PrefixIndex(Generic[T]):
+    """属性値の前方一致を二分探索する索引.
+
+    多数の前方一致検索を1回の一覧取得で済ませるため
+    """
+
+    def __init__(self, models: list[T], attr: str) -> None:
+        """属性値でソートしておく."""
+        if len(models) > 0:
+            check_include_keys(models[0].__class__, {attr})
+        pairs = sorted(((str(getattr(m, attr)), m) for m in models), key=itemgetter(0))
+        self._keys = [k for k, _ in pairs]
+        self._models = [m for _, m in pairs]
+
+    def find_one(self, prefix: str) -> T:
+        """前方一致するものを一意に検索."""
+        i = bisect_left(self._keys, prefix)
+        n = len(self._keys)
+        if i == n or not self._keys[i].startswith(prefix):
+            msg = f"{prefix}に前方一致するものがありません"
+            raise NotMatchError(msg)
+        if i + 1 < n and self._keys[i + 1].startswith(prefix):
+            msg = f"{prefix}に前方一致するものが複数あります"
+            raise MultipleMatchError(msg)
+        return self._models[i]
+
 
 class NotMatchError(Exception):
     """ひとつだけマッチすることを期待したのに."""
@@ -80,3 +80,20 @@ def test_startswith() -> None:
 
     with pytest.raises(NotMatchError):
         ls.find_one_by(startswith("x", "0"))
+
+
+def test_prefix_index() -> None:
+    """startswithと同じ結果になる."""
+    ls = OneList([OneModel(x=x, y="any") for x in ["dev", "dev2", "prod", "stg"]])
+    index = ls.prefix_index("x")
+    assert index.find_one("p") == ls[2]
+    assert index.find_one("dev2") == ls[1]
+
+    with pytest.raises(MultipleMatchError):
+        index.find_one("de")
+    with pytest.raises(NotMatchError):
+        index.find_one("x")
+    with pytest.raises(NotMatchError):
+        OneList([]).prefix_index("x").find_one("x")
+    with pytest.raises(ExtraKeyError):
+        ls.prefix_index("extra")
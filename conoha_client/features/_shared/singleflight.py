@@ -0,0 +1,56 @@
+"""同一リクエストの相乗り."""
+from __future__ import annotations
+
+import threading
+from typing import Callable, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    """実行中の呼び出し."""
+
+    def __init__(self) -> None:
+        """Init."""
+        self.done = threading.Event()
+        self.value: T | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight(Generic[T]):
+    """同じキーで同時に実行される呼び出しを1回にまとめる.
+
+    先に来たスレッドだけがfuncを実行し,実行中に来たスレッドはその結果を共有する
+    結果は保持しないので完了後の呼び出しは再度実行される
+    """
+
+    def __init__(self) -> None:
+        """Init."""
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call[T]] = {}
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Funcを実行するか,実行中の同じキーの結果を待つ."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value  # type: ignore[return-value]
+
+        try:
+            call.value = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
@@ -0,0 +1,27 @@
+"""fastjson test."""
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+from .fastjson import available_backends, validate_list
+
+
+class _Item(BaseModel, frozen=True):
+    item_id: int
+
+
+def test_backends_roundtrip() -> None:
+    """どのbackendでも同じ値に戻る."""
+    obj = [{"name": "日本語", "n": 1}]
+    for b in available_backends():
+        assert b.loads(b.dumps(obj)) == obj
+        assert b.loads(b.dumps(obj).encode()) == obj
+
+
+def test_validate_list() -> None:
+    """指定キー以外は無視してbytesから検証する."""
+    content = b'{"items": [{"item_id": 1}, {"item_id": 2}], "total_count": 2}'
+    assert validate_list(_Item, content, "items") == [
+        _Item(item_id=1),
+        _Item(item_id=2),
+    ]
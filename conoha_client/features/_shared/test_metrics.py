@@ -0,0 +1,58 @@
+"""metrics test."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import requests
+
+from . import metrics
+from .endpoints import transport
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from requests_mock import Mocker
+
+TENANT = "0123456789abcdef0123456789abcdef"
+URL = f"https://compute.tyo1.conoha.io/v2/{TENANT}/servers/detail"
+
+
+def test_render(requests_mock: Mocker, tmp_path: Path) -> None:
+    """IDをまとめたエンドポイントとステータスごとに数える."""
+    metrics.reset_metrics()
+    requests_mock.get(URL, [{"status_code": 200}, {"status_code": 500}])
+    transport.send("GET", URL, timeout=1)
+    transport.send("GET", URL, timeout=1)
+    metrics.count_cache("token", hit=True)
+    metrics.count_cache("token", hit=False)
+    metrics.count_cache("token", hit=True)
+    metrics.count_poll("wait_vm")
+
+    text = metrics.render()
+    labels = 'endpoint="/v2/{id}/servers/detail",host="compute.tyo1.conoha.io"'
+    assert f'conoha_api_requests_total{{{labels},method="GET",status="200"}} 1' in text
+    assert f'conoha_api_requests_total{{{labels},method="GET",status="500"}} 1' in text
+    assert "# TYPE conoha_api_request_duration_seconds histogram" in text
+    assert (
+        "conoha_api_request_duration_seconds_bucket"
+        f'{{{labels},method="GET",status="200",le="+Inf"}} 1'
+    ) in text
+    assert 'conoha_cache_hit_ratio{cache="token"} 0.666667' in text
+    assert 'conoha_watcher_polls_total{watcher="wait_vm"} 1' in text
+
+    path = tmp_path / "metrics" / "conoha.prom"
+    metrics.write_textfile(path)
+    assert path.read_text(encoding="utf-8") == metrics.render()
+
+
+def test_serve() -> None:
+    """HTTPで公開する."""
+    metrics.reset_metrics()
+    metrics.count_poll("watch")
+    server = metrics.serve(0)
+    try:
+        res = requests.get(f"http://127.0.0.1:{server.server_port}/", timeout=1)
+    finally:
+        server.shutdown()
+    assert res.headers["Content-Type"] == metrics.CONTENT_TYPE
+    assert 'conoha_watcher_polls_total{watcher="watch"} 1' in res.text
@@ -0,0 +1,51 @@
+"""singleflight test."""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from .singleflight import SingleFlight
+
+
+def test_single_flight() -> None:
+    """実行中の同じキーは1回の呼び出しにまとまる."""
+    sf: SingleFlight[int] = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow() -> int:
+        calls.append(1)
+        started.set()
+        release.wait()
+        return 42
+
+    with ThreadPoolExecutor(max_workers=5) as ex:
+        leader = ex.submit(sf.do, "k", slow)
+        started.wait()
+        followers = [ex.submit(sf.do, "k", slow) for _ in range(3)]
+        other = ex.submit(sf.do, "other", lambda: 0)
+        assert other.result() == 0
+        time.sleep(0.1)  # 後続が待ちに入るまで
+        release.set()
+        results = [f.result() for f in [leader, *followers]]
+
+    assert results == [42] * 4
+    assert len(calls) == 1
+    # 完了後は再度実行される
+    assert sf.do("k", lambda: 1) == 1
+
+
+def test_error_shared() -> None:
+    """例外も共有し,次の呼び出しには持ち越さない."""
+    sf: SingleFlight[int] = SingleFlight()
+
+    def fail() -> int:
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        sf.do("k", fail)
+    assert sf.do("k", lambda: 1) == 1
@@ -0,0 +1,51 @@
+"""throttle test."""
+from __future__ import annotations
+
+import pytest
+
+from .throttle import TokenBucket
+
+
+class FakeClock:
+    """時間を進めるだけの時計."""
+
+    def __init__(self) -> None:
+        """Init."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """現在時刻."""
+        return self.now
+
+    def sleep(self, sec: float) -> None:
+        """時間を進める."""
+        self.now += sec
+
+
+def test_token_bucket() -> None:
+    """容量を使い切ると補充を待つ."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+    clock.now += 10
+    assert bucket.acquire() == 0
+
+
+def test_invalid_rate() -> None:
+    """Invalid case."""
+    with pytest.raises(ValueError, match="rate"):
+        TokenBucket(rate=0)
+
+
+def test_pause() -> None:
+    """Retry-Afterの秒数だけ待たせる."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=10, clock=clock, sleep=clock.sleep)
+    bucket.pause(3)
+    # 同時に429を受けた他のスレッドの分は積み重ならない
+    bucket.pause(3)
+    assert bucket.acquire() == pytest.approx(3)
+    assert bucket.acquire() == pytest.approx(0.1)
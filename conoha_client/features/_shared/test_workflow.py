@@ -0,0 +1,79 @@
+"""workflow test."""
+from __future__ import annotations
+
+import threading
+
+from .workflow import Stage, StageTimeoutError, run_workflow
+
+
+def test_run_workflow() -> None:
+    """段階は要素ごとに進み,段階内の同時実行数を守り,失敗は他を止めない."""
+    lock = threading.Lock()
+    started: list[tuple[str, str]] = []
+
+    def _start(stage: str) -> object:
+        def _f(item: str) -> None:
+            with lock:
+                started.append((stage, item))
+            if (stage, item) == ("save", "c"):
+                msg = "failed"
+                raise ValueError(msg)
+
+        return _f
+
+    polls: dict[str, int] = {}
+
+    def _stopped(items: list[str]) -> set[str]:
+        for i in items:
+            polls[i] = polls.get(i, 0) + 1
+        return {i for i in items if polls[i] >= 2}  # noqa: PLR2004
+
+    views: list[dict[str, str]] = []
+    outcomes = run_workflow(
+        ["a", "b", "c"],
+        [
+            Stage(name="stop", start=_start("stop"), done=_stopped, skip="b".__eq__),
+            Stage(name="save", start=_start("save"), concurrency=1),
+            Stage(name="rm", start=_start("rm")),
+        ],
+        interval_sec=0,
+        view=lambda d: views.append(dict(d)),
+        sleep=lambda _: None,
+    )
+    assert [o.is_ok() for o in outcomes] == [True, True, False]
+    assert ("stop", "b") not in started
+    assert ("rm", "c") not in started
+    assert all(list(v.values()).count("save") <= 1 for v in views)
+    assert any(v["a"] == "stop" and v["b"] != "stop" for v in views)
+
+
+def test_stage_timeout() -> None:
+    """完了しないまま期限を過ぎれば失敗にする."""
+    now = iter(range(100))
+    outcomes = run_workflow(
+        ["a"],
+        [Stage(name="stop", start=lambda _: None, done=lambda _: set(), timeout_sec=3)],
+        sleep=lambda _: None,
+        clock=lambda: next(now),
+    )
+    assert isinstance(outcomes[0].error, StageTimeoutError)
+
+
+def test_stage_failed() -> None:
+    """失敗と分かった要素は期限を待たずに失敗にし,他の要素は進める."""
+    error = RuntimeError("ERROR")
+    outcomes = run_workflow(
+        ["a", "b"],
+        [
+            Stage(
+                name="save",
+                start=lambda _: None,
+                done=lambda items: {i for i in items if i == "a"},
+                failed=lambda items: {i: error for i in items if i == "b"},
+                timeout_sec=3600,
+            ),
+        ],
+        sleep=lambda _: None,
+    )
+    assert outcomes[0].is_ok()
+    assert outcomes[1].error is error
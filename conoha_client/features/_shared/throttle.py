@@ -0,0 +1,67 @@
+"""流量制限."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """トークンバケット方式の流量制限.
+
+    スレッド間で共有して使う
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], object] = time.sleep,
+    ) -> None:
+        """Init.
+
+        :param rate: 1秒あたりに補充されるトークン数
+        :param capacity: 貯められるトークン数の上限(=瞬間的に許すリクエスト数)
+        """
+        if rate <= 0:
+            msg = "rateには正の値を指定してください"
+            raise ValueError(msg)
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """トークンを1つ取得できるまで待つ.
+
+        待ち時間を先に予約するので待っている間もロックを占有しない
+        :return: 待った秒数
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate)
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def pause(self, sec: float) -> None:
+        """以降の取得をsec秒後まで待たせる.
+
+        e.g. 429 Too Many RequestsのRetry-Afterに従う
+        複数のスレッドが同時に呼んでも待ち時間は積み重ならない
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 1 - sec * self.rate)
+
+    def _refill(self) -> None:
+        """経過時間分のトークンを補充する. ロック内で呼ぶ."""
+        now = self._clock()
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
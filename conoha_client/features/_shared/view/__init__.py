@@ -1,4 +1,5 @@
 """cli表示."""
 from .domain import view, view_options
+from .watch import watch_options
 
-__all__ = ["view", "view_options"]
+__all__ = ["view", "view_options", "watch_options"]
@@ -1,14 +1,17 @@
 """CLI表示用モデル変換."""
 from __future__ import annotations
 
+import csv
 import functools
-import json
+import io
 from typing import Callable, Literal, ParamSpec, TypeVar
 
 import click
 from pydantic import BaseModel
 from tabulate import tabulate
 
+from conoha_client.features._shared.fastjson import dumps
+
 
 class ExtraKeyError(Exception):
     """View表示keysにモデルプロパィにない値が指定された."""
@@ -63,6 +66,20 @@ def _tabulate(js: list[dict], pass_command: bool) -> str:
     return tabulate(js, headers="keys", showindex=True)
 
 
+def _csv(js: list[dict], pass_command: bool) -> str:
+    """jsonリストをCSV文字列へ変換.
+
+    :param pass_command: ヘッダー行を出力しない
+    """
+    buf = io.StringIO()
+    fields = list(js[0]) if len(js) > 0 else []
+    w = csv.DictWriter(buf, fieldnames=fields, lineterminator="\n")
+    if not pass_command:
+        w.writeheader()
+    w.writerows(js)
+    return buf.getvalue().rstrip("\n")
+
+
 def view(
     models: list[R],
     keys: set[str],
@@ -73,13 +90,15 @@ def view(
     js = [model_extract(m, _keys) for m in models]
 
     if style == "json":
-        txt = json.dumps(js, indent=2)
+        txt = dumps(js)
     elif style == "table":
         txt = _tabulate(js, pass_command)
+    elif style == "csv":
+        txt = _csv(js, pass_command)
     click.echo(txt)
 
 
-Style = Literal["json", "table"]
+Style = Literal["json", "table", "csv"]
 
 
 P = ParamSpec("P")
@@ -120,12 +139,19 @@ def view_options(func: Callable[P, list[R]]) -> Callable[P, None]:
         help="json style print",
         show_default=True,
     )
+    @click.option(
+        "--csv",
+        "style",
+        flag_value="csv",
+        help="csv style print",
+        show_default=True,
+    )
     @click.option(
         "--pass-command",
         "-p",
         is_flag=True,
         default=False,
-        help="他のコマンドに渡しやすいようにtable viewの装飾をなくす",
+        help="他のコマンドに渡しやすいようにtable viewの装飾やcsvのヘッダーをなくす",
     )
     @functools.wraps(func)
     def wrapper(
@@ -77,3 +77,13 @@ def test_view_filter_option() -> None:
     result = runner.invoke(cli, ["-k", "x", "--where", "x", "1", "-p"])
     assert result.exit_code == 0
     assert result.stdout.split() == [t1.x]
+
+
+def test_view_option_csv() -> None:
+    """Csv view test."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["-k", "x", "--csv"])
+    assert result.exit_code == 0
+    assert result.stdout.split() == ["x", *[t.x for t in tm]]
+    result = runner.invoke(cli, ["-k", "x", "--csv", "-p"])
+    assert result.stdout.split() == [t.x for t in tm]
@@ -0,0 +1,50 @@
+"""watch test."""
+from __future__ import annotations
+
+import click
+
+from .watch import ScreenPatcher, highlight, watch
+
+
+def test_highlight() -> None:
+    """変わった行を強調し,消えた行を末尾に添える."""
+    prev = ["h", "0 a ACTIVE", "1 b ACTIVE", "2 c ACTIVE"]
+    cur = ["h", "0 a SHUTOFF", "1 c ACTIVE", "2 d BUILD"]
+    assert highlight(None, cur) == cur
+    assert highlight(prev, cur) == [
+        "h",
+        click.style("0 a SHUTOFF", fg="yellow"),
+        "1 c ACTIVE",
+        click.style("2 d BUILD", fg="green"),
+        click.style("- 1 b ACTIVE", fg="red"),
+    ]
+    # 行番号のずれは変更とみなさない
+    hl = highlight(prev, ["h", "0 a ACTIVE", "1 c ACTIVE"])
+    assert hl[:3] == ["h", "0 a ACTIVE", "1 c ACTIVE"]
+    assert hl[3] == click.style("- 1 b ACTIVE", fg="red")
+
+
+def test_screen_patcher() -> None:
+    """変わった行だけを書き換える."""
+    s = ScreenPatcher()
+    assert s.patch(["a", "b"]) == "\x1b[2Ka\n\x1b[2Kb\n\x1b[J"
+    assert s.patch(["a", "c"]) == "\x1b[2F\x1b[1E\x1b[2Kc\n\x1b[J"
+    assert s.patch(["a"]) == "\x1b[2F\x1b[1E\x1b[J"
+
+
+def test_watch() -> None:
+    """指定回数だけ描画する."""
+    frames = iter([["a"], ["b"]])
+    out = []
+    sleeps = []
+    watch(
+        lambda: next(frames),
+        interval_sec=1,
+        echo=out.append,
+        sleep=sleeps.append,
+        tty=False,
+        count=2,
+    )
+    assert len(out) == 2  # noqa: PLR2004
+    assert out[1].endswith(click.style("b", fg="yellow") + "\n\n")
+    assert sleeps == [1]
@@ -0,0 +1,165 @@
+"""一覧表示の監視."""
+from __future__ import annotations
+
+import functools
+import io
+import re
+import sys
+import time
+from contextlib import redirect_stdout, suppress
+from difflib import SequenceMatcher
+from typing import Callable, ParamSpec
+
+import click
+
+from conoha_client.features._shared import metrics
+from conoha_client.features._shared.util import now_jst
+
+P = ParamSpec("P")
+
+_INDEX = re.compile(r"^\s*\d+\s")
+
+
+def _strip_index(line: str) -> str:
+    """行の追加削除で番号がずれても同じ行とみなすため表の行番号を除く."""
+    return _INDEX.sub("", line)
+
+
+def highlight(prev: list[str] | None, cur: list[str]) -> list[str]:
+    """前回から変わった行を強調し,消えた行を末尾に添える.
+
+    :param prev: 前回の行. 初回はNone
+    :param cur: 今回の行
+    """
+    if prev is None:
+        return list(cur)
+    sm = SequenceMatcher(
+        a=[_strip_index(line) for line in prev],
+        b=[_strip_index(line) for line in cur],
+        autojunk=False,
+    )
+    lines = list(cur)
+    removed = []
+    for tag, i1, i2, j1, j2 in sm.get_opcodes():
+        if tag in ("replace", "insert"):
+            color = "yellow" if tag == "replace" else "green"
+            for j in range(j1, j2):
+                lines[j] = click.style(cur[j], fg=color)
+        if tag in ("replace", "delete"):
+            # 置換で行数が減った分は削除とみなす
+            gone = prev[i1 + (j2 - j1) : i2]
+            removed.extend(click.style(f"- {line}", fg="red") for line in gone)
+    return lines + removed
+
+
+class ScreenPatcher:
+    """前回描画した行と比べて変わった行だけを書き換える."""
+
+    def __init__(self) -> None:
+        """Init."""
+        self._lines: list[str] = []
+
+    def patch(self, lines: list[str]) -> str:
+        """端末へ出力するエスケープシーケンス付きの文字列."""
+        buf = []
+        if len(self._lines) > 0:
+            buf.append(f"\x1b[{len(self._lines)}F")  # 前回の先頭行へ戻る
+        for i, line in enumerate(lines):
+            if i < len(self._lines) and self._lines[i] == line:
+                buf.append("\x1b[1E")  # 変わらない行は飛ばす
+            else:
+                buf.append(f"\x1b[2K{line}\n")
+        buf.append("\x1b[J")  # 前回より短ければ残りを消す
+        self._lines = list(lines)
+        return "".join(buf)
+
+
+def watch(  # noqa: PLR0913
+    render: Callable[[], list[str]],
+    interval_sec: float,
+    *,
+    echo: Callable[[str], object] = functools.partial(click.echo, nl=False),
+    sleep: Callable[[float], object] = time.sleep,
+    tty: bool = True,
+    count: int | None = None,
+) -> None:
+    """一定間隔で再描画する.
+
+    :param render: 表示する行を返す関数
+    :param tty: Falseなら書き換えずに毎回全行を出力する
+    :param count: 描画回数. Noneなら中断されるまで
+    """
+    screen = ScreenPatcher()
+    prev = None
+    n = 0
+    while True:
+        metrics.count_poll("watch")
+        cur = render()
+        lines = [f"Every {interval_sec}s: {now_jst()}", "", *highlight(prev, cur)]
+        if tty:
+            echo(screen.patch(lines))
+        else:
+            echo("\n".join(lines) + "\n\n")
+        prev = cur
+        n += 1
+        if count is not None and n >= count:
+            return
+        sleep(interval_sec)
+
+
+def _capture(func: Callable[[], object]) -> list[str]:
+    """標準出力への表示を行のリストとして得る."""
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        func()
+    return buf.getvalue().splitlines()
+
+
+def watch_options(
+    default_keys: tuple[str, ...] = (),
+) -> Callable[[Callable[P, None]], Callable[P, None]]:
+    """view_optionsの表示を一定間隔で更新し続けるオプション.
+
+    view_optionsより上に付ける
+    :param default_keys: 監視中に-kの指定がなければ表示するキー
+        e.g. 経過時間のように毎回変わる列を除いて書き換えを減らす
+    """
+
+    def _deco(func: Callable[P, None]) -> Callable[P, None]:
+        @click.option(
+            "--watch",
+            "-W",
+            "watch_",
+            is_flag=True,
+            default=False,
+            help="一定間隔で更新し,変わった行を強調する",
+        )
+        @click.option(
+            "--interval",
+            type=click.FloatRange(min=0.5),
+            default=5.0,
+            show_default=True,
+            help="--watchの更新間隔(秒)",
+        )
+        @functools.wraps(func)
+        def wrapper(
+            watch_: bool,
+            interval: float,
+            *args: P.args,
+            **kwargs: P.kwargs,
+        ) -> None:
+            if not watch_:
+                return func(*args, **kwargs)
+            if len(kwargs.get("keys") or ()) == 0:
+                kwargs["keys"] = default_keys
+            with suppress(KeyboardInterrupt):
+                watch(
+                    lambda: _capture(lambda: func(*args, **kwargs)),
+                    interval,
+                    tty=sys.stdout.isatty(),
+                )
+            return None
+
+        return wrapper
+
+    return _deco
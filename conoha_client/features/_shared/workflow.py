@@ -0,0 +1,172 @@
+"""段階的な処理の並行実行.
+
+要素ごとに段階を順に進め,異なる要素の異なる段階を重ねて実行する
+e.g. VM Bを停止している間にVM Aを保存する
+"""
+from __future__ import annotations
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from . import metrics
+from .concurrent import MAX_WORKERS, Outcome
+
+T = TypeVar("T", bound=Hashable)
+
+
+class StageTimeoutError(Exception):
+    """段階が期限内に完了しなかった."""
+
+
+class Stage(BaseModel, Generic[T], frozen=True):
+    """処理の1段階.
+
+    startで操作を依頼し,doneで完了を確認する
+    doneは段階内の未完了の要素をまとめて受け取るので1回の一覧取得で確認できる
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    start: Callable[[T], Any]
+    done: Callable[[list[T]], set[T]] | None = Field(
+        None,
+        description="完了した要素. Noneならstartの終了で完了",
+    )
+    failed: Callable[[list[T]], dict[T, Exception]] | None = Field(
+        None,
+        description="doneの確認後に呼び,失敗と分かった要素と原因を返す. 期限を待たない",
+    )
+    skip: Callable[[T], bool] | None = Field(None, description="この段階が不要か")
+    concurrency: int = Field(MAX_WORKERS, ge=1, description="段階内の同時実行数")
+    timeout_sec: float | None = None
+
+
+class _Task(Generic[T]):
+    """1要素の進み具合."""
+
+    def __init__(self, item: T) -> None:
+        self.item = item
+        self.stage = 0
+        self.future: Future | None = None
+        self.started = 0.0
+        self.error: Exception | None = None
+
+    def running(self) -> bool:
+        return self.future is not None
+
+
+def run_workflow(  # noqa: PLR0913
+    items: list[T],
+    stages: list[Stage[T]],
+    interval_sec: float = 5,
+    view: Callable[[dict[T, str]], Any] | None = None,
+    sleep: Callable[[float], object] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> list[Outcome[T, None]]:
+    """全要素の全段階が終わるまで進める.
+
+    失敗した要素はそれ以降の段階へ進まず,他の要素は止めない
+    :param view: 要素ごとの段階名を受け取る進捗表示
+        順番待ちはwaiting:段階名,完了はdone,失敗はfailed
+    :return: itemsと同じ順序の実行結果
+    """
+    tasks = [_Task(item) for item in items]
+    n_workers = max(s.concurrency for s in stages) if len(stages) > 0 else 1
+    ctx = copy_context()
+    with ThreadPoolExecutor(max_workers=min(n_workers * len(stages), 32)) as ex:
+        while True:
+            _advance_skipped(tasks, stages)
+            for i, stage in enumerate(stages):
+                queued = [t for t in tasks if _at(t, i) and not t.running()]
+                n_running = len([t for t in tasks if _at(t, i) and t.running()])
+                for t in queued[: max(0, stage.concurrency - n_running)]:
+                    t.future = ex.submit(ctx.copy().run, stage.start, t.item)
+                    t.started = clock()
+            for i, stage in enumerate(stages):
+                _check(i, stage, [t for t in tasks if _at(t, i) and t.running()], clock)
+            if view is not None:
+                view({t.item: _label(t, stages) for t in tasks})
+            if all(t.error is not None or t.stage >= len(stages) for t in tasks):
+                return [Outcome(arg=t.item, error=t.error) for t in tasks]
+            if any(t.running() for t in tasks):
+                sleep(interval_sec)
+
+
+def _at(t: _Task, i: int) -> bool:
+    return t.error is None and t.stage == i
+
+
+def _label(t: _Task, stages: list[Stage]) -> str:
+    if t.error is not None:
+        return "failed"
+    if t.stage >= len(stages):
+        return "done"
+    name = stages[t.stage].name
+    return name if t.running() else f"waiting:{name}"
+
+
+def _advance_skipped(tasks: list[_Task], stages: list[Stage]) -> None:
+    """不要な段階を飛ばす."""
+    for t in tasks:
+        while (
+            t.error is None
+            and not t.running()
+            and t.stage < len(stages)
+            and stages[t.stage].skip is not None
+            and stages[t.stage].skip(t.item)
+        ):
+            t.stage += 1
+
+
+def _requested(running: list[_Task]) -> list[_Task]:
+    """依頼が成功した要素. 失敗した要素は失敗にする."""
+    requested = []
+    for t in running:
+        if not t.future.done():
+            continue
+        e = t.future.exception()
+        if e is None:
+            requested.append(t)
+        else:
+            t.error = e
+    return requested
+
+
+def _check(
+    i: int,
+    stage: Stage,
+    running: list[_Task],
+    clock: Callable[[], float],
+) -> None:
+    """依頼が終わった要素の完了をまとめて確認し,次の段階へ進める."""
+    requested = _requested(running)
+    if len(requested) == 0:
+        return
+    completed = {t.item for t in requested}
+    errors = {}
+    if stage.done is not None:
+        metrics.count_poll(f"workflow:{stage.name}")
+        items = [t.item for t in requested]
+        try:
+            completed = stage.done(items)
+            if stage.failed is not None:
+                errors = stage.failed(items)
+        except Exception as e:  # noqa: BLE001
+            for t in requested:
+                t.error = e
+            return
+    now = clock()
+    for t in requested:
+        if t.item in errors:
+            t.error = errors[t.item]
+        elif t.item in completed:
+            t.stage = i + 1
+            t.future = None
+        elif stage.timeout_sec is not None and now - t.started > stage.timeout_sec:
+            msg = f"{t.item}の{stage.name}が{stage.timeout_sec}秒で完了しませんでした"
+            t.error = StageTimeoutError(msg)
@@ -7,21 +7,36 @@ import click
 from dateutil.relativedelta import relativedelta
 
 from conoha_client.features._shared import view_options
-from conoha_client.features.billing.domain.invoice import Term, first_day
-
-from .repo import (
-    list_invoice_items,
-    list_invoices,
-    list_orders,
-    list_payment,
-    list_vps_orders,
+from conoha_client.features._shared.command_option import profiles_option
+from conoha_client.features.billing.domain.invoice import (
+    SUMMARY_KEYS,
+    Term,
+    first_day,
 )
 
+from .store import BillingStore, billing_store
+
 if TYPE_CHECKING:
     from conoha_client.features.billing.domain import (
         Deposit,
+        InvoiceSummary,
     )
 
+sync_option = click.option(
+    "--sync/--offline",
+    default=True,
+    show_default=True,
+    help="差分を取得してから表示/保存済みの履歴のみ表示",
+)
+
+
+def _store(sync: bool) -> BillingStore:
+    """ローカルに保存した課金履歴."""
+    store = billing_store()
+    if sync:
+        store.sync()
+    return store
+
 
 @click.command(name="lsorder")
 @click.option(
@@ -31,20 +46,25 @@ if TYPE_CHECKING:
     default=True,
     help="VPS契約のみ/全契約",
 )
+@sync_option
 @view_options
-def order_cli(vps: bool) -> list:
+@profiles_option
+def order_cli(vps: bool, sync: bool) -> list:
     """契約一覧."""
+    store = _store(sync)
     if vps:
-        return list_vps_orders()
+        return store.list_vps_orders()
 
-    return list_orders().root
+    return store.list_orders().root
 
 
 @click.command(name="lspaid")
+@sync_option
 @view_options
-def paid_cli() -> list[Deposit]:
+@profiles_option
+def paid_cli(sync: bool) -> list[Deposit]:
     """入金履歴."""
-    return list_payment()
+    return _store(sync).list_payments()
 
 
 @click.command(name="lsinvoice")
@@ -73,16 +93,67 @@ def paid_cli() -> list[Deposit]:
     default=1,
     show_default=True,
 )
+@sync_option
 @view_options
+@profiles_option
 def invoice_cli(
     detail: bool,
     offset: int,
     months: int,
+    sync: bool,
 ) -> list:
     """課金一覧."""
     start = first_day() + relativedelta(months=offset)
     term = Term.create(start, months)
+    store = _store(sync)
     if detail:
-        return list_invoice_items(term)
+        return store.list_invoice_items(term)
 
-    return list_invoices().filter_by_term(term).root
+    return store.list_invoices(term).root
+
+
+@click.group(name="invoice")
+def invoice_group_cli() -> None:
+    """課金の集計."""
+
+
+@invoice_group_cli.command(name="summary")
+@click.option(
+    "--by",
+    "-b",
+    type=click.Choice(SUMMARY_KEYS),
+    multiple=True,
+    default=("month", "product_name"),
+    show_default=True,
+    help="集計キー[複数指定可]",
+)
+@click.option(
+    "--offset-monthly",
+    "-o",
+    "offset",
+    type=click.INT,
+    help="検索期間開始月のオフセット. 未指定なら全期間 e.g. 1年前から=> -12",
+)
+@click.option(
+    "--months",
+    "-m",
+    type=click.IntRange(min=1),
+    help="検索月数",
+    default=12,
+    show_default=True,
+)
+@sync_option
+@view_options
+@profiles_option
+def invoice_summary_cli(
+    by: tuple[str, ...],
+    offset: int | None,
+    months: int,
+    sync: bool,
+) -> list[InvoiceSummary]:
+    """請求項目を月,商品,プラン,VMごとに集計する. --csvや--jsonで出力できる."""
+    term = None
+    if offset is not None:
+        term = Term.create(first_day() + relativedelta(months=offset), months)
+    keys = tuple(k for k in SUMMARY_KEYS if k in by)
+    return _store(sync).summarize(keys, term)
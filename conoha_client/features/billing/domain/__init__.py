@@ -5,6 +5,7 @@ from .invoice import (  # noqa: F401
     Invoice,
     InvoiceItem,
     InvoiceList,
+    InvoiceSummary,
 )
 from .order import (  # noqa: F401
     DetailOrder,
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime
+from uuid import UUID
 
 from dateutil.relativedelta import relativedelta
 from pydantic import BaseModel, Field, field_validator
@@ -67,6 +68,24 @@ class ConcatedInvoiceItem(BaseModel, frozen=True):
     started: datetime | None
 
 
+class InvoiceSummary(BaseModel, frozen=True):
+    """請求項目の集計. 集計に使わなかったキーはNone."""
+
+    month: str | None = Field(None, description="支払い期日の年月 e.g. 2023-10")
+    product_name: str | None = None
+    plan: str | None = Field(
+        None,
+        description="VPS契約のサービス名. 同じ商品のVPS契約で1つに決まる場合のみ",
+    )
+    vm_id: UUID | None = Field(None, description="同じ商品のVPS契約が1つの場合のみ")
+    n_items: int
+    use_hours: int
+    cost: float = Field(description="単価x利用時間の合計")
+
+
+SUMMARY_KEYS = ("month", "product_name", "plan", "vm_id")
+
+
 class InvoiceList(ModelList[Invoice], frozen=True):
     """invoice container."""
 
@@ -7,6 +7,7 @@ from typing import Callable
 from uuid import UUID
 
 from conoha_client.features._shared import Endpoints
+from conoha_client.features._shared.fastjson import decode, validate_list
 from conoha_client.features.billing.domain.invoice import InvoiceList, Term
 
 from .domain import (
@@ -22,9 +23,8 @@ from .domain import (
 
 def list_orders() -> OrderList:
     """契約一覧."""
-    res = Endpoints.ACCOUNT.get("order-items").json()
-    ls = [Order.model_validate(e) for e in res["order_items"]]
-    return OrderList(root=ls)
+    res = Endpoints.ACCOUNT.get("order-items")
+    return OrderList(root=validate_list(Order, res.content, "order_items"))
 
 
 def detail_order(order_id: UUID) -> DetailOrder:
@@ -44,8 +44,8 @@ def list_vps_orders(
 
 def list_payment() -> list[Deposit]:
     """入金履歴."""
-    res = Endpoints.ACCOUNT.get("payment-history").json()
-    return [Deposit.model_validate(e) for e in res["payment_history"]]
+    res = Endpoints.ACCOUNT.get("payment-history")
+    return validate_list(Deposit, res.content, "payment_history")
 
 
 def dep_invoice_json(offset: int, limit: int) -> list[object]:
@@ -55,7 +55,7 @@ def dep_invoice_json(offset: int, limit: int) -> list[object]:
         "limit": limit,
     }
     res = Endpoints.ACCOUNT.get("billing-invoices", params)
-    return res.json()["billing_invoices"]
+    return decode(res)["billing_invoices"]
 
 
 def list_invoices(
@@ -74,7 +74,7 @@ def invoice_items(invoice_id: int) -> list[InvoiceItem]:
     if res.status_code == HTTPStatus.INTERNAL_SERVER_ERROR:
         # 課金項目が存在しないっぽい
         return []
-    items = res.json()["billing_invoice"]["items"]
+    items = decode(res)["billing_invoice"]["items"]
     ls = [InvoiceItem.model_validate(e) for e in items]
     return sorted(ls, key=attrgetter("detail_id"))
 
@@ -0,0 +1,358 @@
+"""課金履歴のローカル保存.
+
+請求,請求項目,入金,契約をSQLiteへ保存し,同期は差分だけ取得する
+列名はAPIのキーと同じにしてモデルへそのまま戻せるようにする
+"""
+from __future__ import annotations
+
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator
+
+from pydantic import BaseModel
+
+from conoha_client.features._shared.concurrent import map_concurrently
+from conoha_client.features._shared.endpoints.config import settings
+from conoha_client.features._shared.endpoints.environments import env_tenant_id
+from conoha_client.features._shared.util import now_jst
+
+from .domain import (
+    ConcatedInvoiceItem,
+    Deposit,
+    DetailOrder,
+    Invoice,
+    InvoiceItem,
+    InvoiceList,
+    InvoiceSummary,
+    Order,
+    OrderList,
+)
+from .domain.invoice import SUMMARY_KEYS
+from .repo import detail_order, invoice_items, list_invoices, list_orders, list_payment
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+    from .domain.invoice import Term
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS invoices (
+    invoice_id INTEGER PRIMARY KEY,
+    bill_plus_tax INTEGER NOT NULL,
+    payment_method_type TEXT NOT NULL,
+    invoice_date TEXT NOT NULL,
+    due_date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS invoices_due ON invoices (due_date);
+
+CREATE TABLE IF NOT EXISTS invoice_items (
+    invoice_detail_id INTEGER PRIMARY KEY,
+    invoice_id INTEGER NOT NULL REFERENCES invoices (invoice_id),
+    product_name TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    unit_price REAL NOT NULL,
+    start_date TEXT
+);
+CREATE INDEX IF NOT EXISTS invoice_items_invoice ON invoice_items (invoice_id);
+CREATE INDEX IF NOT EXISTS invoice_items_product ON invoice_items (product_name);
+CREATE INDEX IF NOT EXISTS invoice_items_start ON invoice_items (start_date);
+
+CREATE TABLE IF NOT EXISTS payments (
+    deposit_amount INTEGER NOT NULL,
+    money_type TEXT NOT NULL,
+    received_date TEXT NOT NULL,
+    UNIQUE (received_date, deposit_amount, money_type)
+);
+
+CREATE TABLE IF NOT EXISTS orders (
+    uu_id TEXT,
+    service_name TEXT NOT NULL,
+    item_status TEXT NOT NULL,
+    service_start_date TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS vps_orders (
+    uu_id TEXT PRIMARY KEY,
+    product_name TEXT NOT NULL,
+    service_name TEXT NOT NULL,
+    unit_price REAL NOT NULL,
+    status TEXT NOT NULL,
+    bill_start_date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vps_orders_product ON vps_orders (product_name);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class BillingTenantMismatchError(Exception):
+    """保存先が別のテナントの課金履歴."""
+
+
+class SyncResult(BaseModel, frozen=True):
+    """同期で取得した件数."""
+
+    invoices: int
+    payments: int
+    orders: int
+    vps_orders: int
+
+
+def default_db_path() -> Path:
+    """テナントごとの保存先. OS_CONOHA_BILLING_DBで変更できる.
+
+    変更した保存先は1テナント専用になる
+    """
+    s = settings()
+    if s.billing_db is not None:
+        return s.billing_db
+    return s.cache_dir / f"billing-{env_tenant_id()}.sqlite3"
+
+
+def _row(model: BaseModel) -> dict:
+    """APIのキーを列名とした行."""
+    return model.model_dump(mode="json", by_alias=True)
+
+
+class BillingStore:
+    """課金履歴のSQLite."""
+
+    def __init__(self, path: Path, tenant_id: str | None = None) -> None:
+        """Init.
+
+        同期は保存済みの契約一覧を置き換えるので,1ファイルに1テナントだけ保存する
+        :param path: SQLiteファイル. なければ作る
+        :param tenant_id: 保存するテナント. 初めて開いたテナントのファイルになる
+        :raises BillingTenantMismatchError: 別のテナントのファイル
+        """
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            if tenant_id is None:
+                return
+            conn.execute(
+                "INSERT OR IGNORE INTO meta VALUES ('tenant_id', ?)",
+                (tenant_id,),
+            )
+            owner = conn.execute(
+                "SELECT value FROM meta WHERE key = 'tenant_id'",
+            ).fetchone()[0]
+        if owner != tenant_id:
+            msg = (
+                f"{path}はテナント{owner}の課金履歴です."
+                "OS_CONOHA_BILLING_DBを外すかテナントごとに変えてください"
+            )
+            raise BillingTenantMismatchError(msg)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """スレッドをまたがないよう操作ごとに接続する."""
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def sync(  # noqa: PLR0913
+        self,
+        invoices_dep: Callable[[], InvoiceList] = list_invoices,
+        items_dep: Callable[[int], list[InvoiceItem]] = invoice_items,
+        payments_dep: Callable[[], list[Deposit]] = list_payment,
+        orders_dep: Callable[[], OrderList] = list_orders,
+        detail_dep: Callable[[UUID], DetailOrder] = detail_order,
+        now: datetime | None = None,
+    ) -> SyncResult:
+        """保存済みより新しい分だけ取得して保存する.
+
+        請求項目は未保存の請求と支払い期日前(確定前)の請求の分だけ取得する
+        契約詳細は未保存か状態が変わった契約の分だけ取得する
+        """
+        if now is None:
+            now = now_jst()
+        with self._connect() as conn:
+            stored = {r[0] for r in conn.execute("SELECT invoice_id FROM invoices")}
+            stored_orders = {
+                r["uu_id"]: r["item_status"]
+                for r in conn.execute("SELECT uu_id, item_status FROM orders")
+            }
+            stored_vps = {r[0] for r in conn.execute("SELECT uu_id FROM vps_orders")}
+
+        invoices = [
+            e for e in invoices_dep() if e.invoice_id not in stored or e.due >= now
+        ]
+        items = map_concurrently(lambda e: items_dep(e.invoice_id), invoices)
+        payments = payments_dep()
+        orders = orders_dep()
+        changed = [
+            o
+            for o in orders.filter_vps()
+            if str(o.order_id) not in stored_vps
+            or stored_orders.get(str(o.order_id)) != o.status
+        ]
+        details = map_concurrently(lambda o: detail_dep(o.order_id), changed)
+
+        with self._connect() as conn:
+            for o in items:
+                if not o.is_ok():
+                    raise o.error
+                conn.execute(
+                    "INSERT OR REPLACE INTO invoices VALUES"
+                    " (:invoice_id, :bill_plus_tax, :payment_method_type,"
+                    " :invoice_date, :due_date)",
+                    _row(o.arg),
+                )
+                conn.execute(
+                    "DELETE FROM invoice_items WHERE invoice_id = ?",
+                    (o.arg.invoice_id,),
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO invoice_items VALUES"
+                    " (:invoice_detail_id, :invoice_id, :product_name,"
+                    " :quantity, :unit_price, :start_date)",
+                    [_row(i) | {"invoice_id": o.arg.invoice_id} for i in o.value],
+                )
+            conn.executemany(
+                "INSERT OR IGNORE INTO payments VALUES"
+                " (:deposit_amount, :money_type, :received_date)",
+                [_row(p) for p in payments],
+            )
+            conn.execute("DELETE FROM orders")
+            conn.executemany(
+                "INSERT INTO orders VALUES"
+                " (:uu_id, :service_name, :item_status, :service_start_date)",
+                [_row(o) | {"uu_id": _text(o.order_id)} for o in orders],
+            )
+            for o in details:
+                if not o.is_ok():
+                    raise o.error
+                conn.execute(
+                    "INSERT OR REPLACE INTO vps_orders VALUES"
+                    " (:uu_id, :product_name, :service_name,"
+                    " :unit_price, :status, :bill_start_date)",
+                    _row(o.value),
+                )
+        return SyncResult(
+            invoices=len(invoices),
+            payments=len(payments),
+            orders=len(orders),
+            vps_orders=len(details),
+        )
+
+    def list_invoices(self, term: Term | None = None) -> InvoiceList:
+        """請求一覧. termは支払い期日で絞る."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM invoices WHERE due_date >= ? AND due_date < ?"
+                " ORDER BY invoice_id",
+                _term_params(term),
+            ).fetchall()
+        return InvoiceList(root=[Invoice.model_validate(dict(r)) for r in rows])
+
+    def list_invoice_items(
+        self,
+        term: Term | None = None,
+    ) -> list[ConcatedInvoiceItem]:
+        """請求項目一覧. termは支払い期日で絞る."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT v.*, i.invoice_detail_id, i.product_name, i.quantity,"
+                " i.unit_price, i.start_date"
+                " FROM invoice_items i JOIN invoices v USING (invoice_id)"
+                " WHERE v.due_date >= ? AND v.due_date < ?"
+                " ORDER BY i.invoice_detail_id",
+                _term_params(term),
+            ).fetchall()
+        return [
+            Invoice.model_validate(r).concat(InvoiceItem.model_validate(r))
+            for r in map(dict, rows)
+        ]
+
+    def summarize(
+        self,
+        by: tuple[str, ...],
+        term: Term | None = None,
+    ) -> list[InvoiceSummary]:
+        """請求項目を集計する. 集計はSQLiteで行う.
+
+        :param by: 集計キー. SUMMARY_KEYSから選ぶ
+        :param term: 支払い期日で絞る
+        """
+        invalids = set(by) - set(SUMMARY_KEYS)
+        if len(invalids) > 0:
+            msg = f"{invalids}では集計できません.{SUMMARY_KEYS}から選んでください"
+            raise ValueError(msg)
+        # 列名は上で検証済みの固定値のみ
+        keys = ", ".join(by) if len(by) > 0 else "NULL"
+        sql = (
+            "WITH vm AS ("  # noqa: S608
+            "  SELECT product_name,"
+            "   CASE WHEN COUNT(DISTINCT service_name) = 1"
+            "    THEN MAX(service_name) END AS plan,"
+            "   CASE WHEN COUNT(*) = 1 THEN MAX(uu_id) END AS vm_id"
+            "  FROM vps_orders GROUP BY product_name"
+            "), item AS ("
+            "  SELECT substr(v.due_date, 1, 7) AS month, i.product_name,"
+            "   vm.plan, vm.vm_id,"
+            "   i.quantity, i.quantity * i.unit_price AS cost"
+            "  FROM invoice_items i JOIN invoices v USING (invoice_id)"
+            "  LEFT JOIN vm USING (product_name)"
+            "  WHERE v.due_date >= ? AND v.due_date < ?"
+            f") SELECT {', '.join(by)}{', ' if len(by) > 0 else ''}"
+            "  COUNT(*) AS n_items,"
+            "  COALESCE(SUM(quantity), 0) AS use_hours,"
+            "  COALESCE(SUM(cost), 0) AS cost"
+            f" FROM item GROUP BY {keys} ORDER BY {keys}"
+        )
+        with self._connect() as conn:
+            rows = conn.execute(sql, _term_params(term)).fetchall()
+        return [InvoiceSummary.model_validate(dict(r)) for r in rows]
+
+    def list_payments(self) -> list[Deposit]:
+        """入金履歴."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM payments ORDER BY received_date",
+            ).fetchall()
+        return [Deposit.model_validate(dict(r)) for r in rows]
+
+    def list_orders(self) -> OrderList:
+        """契約一覧."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM orders").fetchall()
+        return OrderList(root=[Order.model_validate(dict(r)) for r in rows])
+
+    def list_vps_orders(self) -> list[DetailOrder]:
+        """VPS契約詳細一覧. 現在の契約一覧にあるものだけ."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT v.* FROM vps_orders v JOIN orders o USING (uu_id)"
+                " ORDER BY v.bill_start_date",
+            ).fetchall()
+        return [DetailOrder.model_validate(dict(r)) for r in rows]
+
+
+def _text(v: object) -> str | None:
+    return None if v is None else str(v)
+
+
+def _term_params(term: Term | None) -> tuple[str, str]:
+    """期間の始まりと終わり.
+
+    日時はJSTのISO形式で保存しているので文字列比較で絞れる
+    """
+    if term is None:
+        return ("", "\uffff")
+    return (term.start.isoformat(), term.end.isoformat())
+
+
+def billing_store() -> BillingStore:
+    """既定の保存先の現在のテナントの課金履歴."""
+    return BillingStore(default_db_path(), env_tenant_id())
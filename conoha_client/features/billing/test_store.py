@@ -0,0 +1,187 @@
+"""billing store test."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
+import pytest
+
+from conoha_client.features._shared.util import TOKYO_TZ
+
+from .domain import (
+    Deposit,
+    DetailOrder,
+    Invoice,
+    InvoiceItem,
+    InvoiceList,
+    Order,
+    OrderList,
+)
+from .domain.invoice import Term
+from .store import BillingStore, BillingTenantMismatchError
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def invoice(invoice_id: int, due: str) -> Invoice:
+    """billing-invoicesの要素."""
+    return Invoice.model_validate(
+        {
+            "invoice_id": invoice_id,
+            "bill_plus_tax": 1000,
+            "payment_method_type": "Charge",
+            "invoice_date": due,
+            "due_date": due,
+        },
+    )
+
+
+def item(detail_id: int, product_name: str) -> InvoiceItem:
+    """billing-invoices/{id}の項目."""
+    return InvoiceItem.model_validate(
+        {
+            "invoice_detail_id": detail_id,
+            "product_name": product_name,
+            "quantity": 720,
+            "unit_price": 1.5,
+            "start_date": "2023-09-01T00:00:00+09:00",
+        },
+    )
+
+
+def test_sync(tmp_path: Path) -> None:
+    """2回目は未保存と確定前の請求の項目だけ取得する."""
+    store = BillingStore(tmp_path / "billing.sqlite3")
+    vm_id = uuid4()
+    invoices = [
+        invoice(1, "2023-09-30T00:00:00+09:00"),
+        invoice(2, "2023-10-31T00:00:00+09:00"),
+    ]
+    requested = []
+
+    def items_dep(invoice_id: int) -> list[InvoiceItem]:
+        requested.append(invoice_id)
+        return [item(invoice_id * 10, f"VPS {invoice_id}")]
+
+    order = Order.model_validate(
+        {
+            "uu_id": str(vm_id),
+            "service_name": "VPS",
+            "item_status": "Active",
+            "service_start_date": "2023-09-01T00:00:00+09:00",
+        },
+    )
+    detail = DetailOrder.model_validate(
+        {
+            "uu_id": str(vm_id),
+            "product_name": "VPS 1GB",
+            "service_name": "VPS",
+            "unit_price": 1.5,
+            "status": "Active",
+            "bill_start_date": "2023-09-01T00:00:00+09:00",
+        },
+    )
+    deposit = Deposit.model_validate(
+        {
+            "deposit_amount": 1000,
+            "money_type": "Charge",
+            "received_date": "2023-09-01T00:00:00+09:00",
+        },
+    )
+    details = []
+
+    def sync(now: datetime) -> None:
+        store.sync(
+            invoices_dep=lambda: InvoiceList(root=invoices),
+            items_dep=items_dep,
+            payments_dep=lambda: [deposit],
+            orders_dep=lambda: OrderList(root=[order]),
+            detail_dep=lambda uid: details.append(uid) or detail,
+            now=now,
+        )
+
+    sync(datetime(2023, 10, 15, tzinfo=TOKYO_TZ))
+    assert sorted(requested) == [1, 2]
+    assert details == [vm_id]
+
+    invoices.append(invoice(3, "2023-11-30T00:00:00+09:00"))
+    requested.clear()
+    sync(datetime(2023, 10, 15, tzinfo=TOKYO_TZ))
+    # 2は支払い期日前なので取り直す
+    assert sorted(requested) == [2, 3]
+    assert details == [vm_id]
+
+    assert [e.invoice_id for e in store.list_invoices()] == [1, 2, 3]
+    term = Term.create(datetime(2023, 10, 1, tzinfo=TOKYO_TZ), 1)
+    assert [e.invoice_id for e in store.list_invoices(term)] == [2]
+    items = store.list_invoice_items(term)
+    assert [(i.invoice_id, i.product_name) for i in items] == [(2, "VPS 2")]
+    assert store.list_payments() == [deposit]
+    assert store.list_orders().root == [order]
+    assert store.list_vps_orders() == [detail]
+
+
+def test_summarize(tmp_path: Path) -> None:
+    """月と商品ごとに集計し,商品が1つのVPS契約に対応すればVMも分かる."""
+    store = BillingStore(tmp_path / "billing.sqlite3")
+    vm_id = uuid4()
+    items = {
+        1: [item(11, "VPS 1GB"), item(12, "VPS 2GB"), item(13, "VPS 2GB")],
+        2: [item(21, "VPS 1GB")],
+    }
+    detail = DetailOrder.model_validate(
+        {
+            "uu_id": str(vm_id),
+            "product_name": "VPS 1GB",
+            "service_name": "VPS",
+            "unit_price": 1.5,
+            "status": "Active",
+            "bill_start_date": "2023-09-01T00:00:00+09:00",
+        },
+    )
+    order = Order.model_validate(
+        {
+            "uu_id": str(vm_id),
+            "service_name": "VPS",
+            "item_status": "Active",
+            "service_start_date": "2023-09-01T00:00:00+09:00",
+        },
+    )
+    store.sync(
+        invoices_dep=lambda: InvoiceList(
+            root=[
+                invoice(1, "2023-09-30T00:00:00+09:00"),
+                invoice(2, "2023-10-31T00:00:00+09:00"),
+            ],
+        ),
+        items_dep=items.__getitem__,
+        payments_dep=list,
+        orders_dep=lambda: OrderList(root=[order]),
+        detail_dep=lambda _: detail,
+    )
+
+    by_product = store.summarize(("product_name", "plan", "vm_id"))
+    assert [(s.product_name, s.plan, s.vm_id, s.n_items) for s in by_product] == [
+        ("VPS 1GB", "VPS", vm_id, 2),
+        ("VPS 2GB", None, None, 2),
+    ]
+    assert by_product[0].cost == 720 * 1.5 * 2
+
+    term = Term.create(datetime(2023, 10, 1, tzinfo=TOKYO_TZ), 1)
+    by_month = store.summarize(("month",), term)
+    assert [(s.month, s.product_name, s.n_items) for s in by_month] == [
+        ("2023-10", None, 1),
+    ]
+    with pytest.raises(ValueError):  # noqa: PT011
+        store.summarize(("price",))
+
+
+def test_one_tenant_per_file(tmp_path: Path) -> None:
+    """同期で他のテナントの契約一覧を消さないよう,別のテナントでは開けない."""
+    path = tmp_path / "billing.sqlite3"
+    BillingStore(path, "tenant-a")
+    BillingStore(path, "tenant-a")
+    with pytest.raises(BillingTenantMismatchError):
+        BillingStore(path, "tenant-b")
@@ -6,6 +6,10 @@ from typing import TYPE_CHECKING
 import click
 
 from conoha_client.features import view_options
+from conoha_client.features._shared.command_option import (
+    profiles_option,
+    regions_option,
+)
 
 from .repo import list_images
 
@@ -15,6 +19,8 @@ if TYPE_CHECKING:
 
 @click.command(name="lsimg", help="list image")
 @view_options
+@profiles_option
+@regions_option
 def vm_image_cli() -> list[Image]:
     """VM Image CLI."""
     return list_images().root
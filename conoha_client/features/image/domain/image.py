@@ -71,6 +71,7 @@ class Image(BaseModel, frozen=True):
         description="インスタンス化に必要なディスク容量",
     )
     progress: int = Field(description="保存進捗率")
+    status: str = Field("", description="ACTIVE, SAVING, ERRORなど", exclude=True)
     created: datetime = Field(alias="created", description="作成日時")
     updated: datetime = Field(alias="updated", description="更新日時", exclude=True)
     sizeGB: int = Field(alias="OS-EXT-IMG-SIZE:size")  # noqa: N815
@@ -4,6 +4,7 @@ from __future__ import annotations
 from http import HTTPStatus
 
 from conoha_client.features import Endpoints
+from conoha_client.features._shared.fastjson import validate_list
 from conoha_client.features.image.domain.errors import (
     DeleteImageError,
     DeletePriorImageForbiddenError,
@@ -14,8 +15,8 @@ from .domain import Image, ImageList
 
 def list_images() -> ImageList:
     """イメージ一覧を取得する."""
-    res = Endpoints.COMPUTE.get("images/detail").json()
-    return ImageList([Image.model_validate(e) for e in res["images"]])
+    res = Endpoints.COMPUTE.get("images/detail")
+    return ImageList(validate_list(Image, res.content, "images"))
 
 
 def remove_image(image: Image) -> None:
@@ -6,6 +6,9 @@ from typing import Callable
 from uuid import UUID
 
 from conoha_client.features import Endpoints
+from conoha_client.features._shared import metrics
+from conoha_client.features._shared.endpoints.environments import env_region
+from conoha_client.features._shared.fastjson import validate_list
 from conoha_client.features._shared.model_list.domain import ModelList, by
 from conoha_client.features._shared.view.domain import model_filter
 
@@ -13,11 +16,24 @@ from .domain import Memory, VMPlan
 from .errors import FlavorIdentificationError
 
 
-@cache
 def list_vmplans() -> list[VMPlan]:
-    """MVプラン一覧を取得する."""
-    res = Endpoints.COMPUTE.get("flavors/detail").json()
-    return [VMPlan.model_validate(e) for e in res["flavors"]]
+    """MVプラン一覧を取得する. リージョンごとに1度だけ取得する."""
+    return _list_vmplans(env_region())
+
+
+@cache
+def _list_vmplans(region: str) -> list[VMPlan]:  # noqa: ARG001 キャッシュのキー
+    res = Endpoints.COMPUTE.get("flavors/detail")
+    return validate_list(VMPlan, res.content, "flavors")
+
+
+metrics.track_lru("vmplans", _list_vmplans)
+
+
+def refresh_vmplans() -> list[VMPlan]:
+    """キャッシュを捨ててVMプラン一覧を取得し直す. 新しいプランが現れたとき用."""
+    _list_vmplans.cache_clear()
+    return list_vmplans()
 
 
 def find_vmplan(
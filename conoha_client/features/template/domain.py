@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import functools
 from pathlib import Path
-from typing import TYPE_CHECKING, Callable, ParamSpec, TypeAlias, TypeVar
+from typing import TYPE_CHECKING, Callable, Iterable, ParamSpec, TypeAlias, TypeVar
 
 import click
 from pydantic import BaseModel
@@ -79,14 +79,21 @@ def template_io_factory(
             mapping: list[tuple[str, str]],
             *args: P.args,
             **kwargs: P.kwargs,
-        ) -> T | None:
+        ) -> T | list[T] | None:
             model = func(*args, **kwargs)
             if model is None:
                 return model
             if rpath is None:
                 return model
             t = TemplateRepo[T](read_from=rpath, map_to=dict(mapping))
-            if wpath is None:
+            if isinstance(model, list):
+                # 複数なら各要素へ適用して1つにまとめる
+                if wpath is None:
+                    for txt in t.apply_all(model):
+                        click.echo(txt, nl=False)
+                else:
+                    t.write_all(model, wpath)
+            elif wpath is None:
                 click.echo(t.apply(model))
             else:
                 t.write(model, wpath)
@@ -101,3 +108,84 @@ template_io = template_io_factory(
     r_envvar="OS_TEMPLATE_READ",
     w_envvar="OS_TEMPLATE_WRITE",
 )
+
+
+BatchWrapped: TypeAlias = Callable[P, Iterable[T]]
+
+
+def template_batch_io_factory(
+    r_envvar: str,
+) -> Callable[[BatchWrapped], Callable]:
+    """一覧の全要素へテンプレートを適用するオプションを作る."""
+
+    def f(func: BatchWrapped) -> Callable:
+        """Template batch cli options."""
+
+        @click.option(
+            "--read-template",
+            "-r",
+            "rpath",
+            type=click.Path(
+                dir_okay=False,
+                readable=True,
+                path_type=Path,
+            ),
+            envvar=r_envvar,
+            show_envvar=True,
+            required=True,
+            help="テンプレートパス",
+        )
+        @click.option(
+            "--write-template",
+            "-w",
+            "wpath",
+            type=click.Path(
+                dir_okay=False,
+                writable=True,
+                path_type=Path,
+            ),
+            help="全要素をまとめた書き出し先[default: 標準出力]",
+        )
+        @click.option(
+            "--write-each",
+            "-e",
+            "each_format",
+            type=click.STRING,
+            help="要素ごとの書き出し先 e.g. out/${vm_id}.conf",
+        )
+        @click.option(
+            "--mapping",
+            "-map",
+            "mapping",
+            nargs=2,
+            multiple=True,
+            type=click.Tuple([str, str]),
+            default=[],
+        )
+        @functools.wraps(func)
+        def wrapper(
+            rpath: Path,
+            wpath: Path | None,
+            each_format: str | None,
+            mapping: list[tuple[str, str]],
+            *args: P.args,
+            **kwargs: P.kwargs,
+        ) -> None:
+            models = func(*args, **kwargs)
+            t = TemplateRepo[T](read_from=rpath, map_to=dict(mapping))
+            if each_format is not None:
+                for p, written in t.write_each(models, each_format).items():
+                    click.echo(f"{p} was {'written' if written else 'unchanged'}")
+            elif wpath is not None:
+                written = t.write_all(models, wpath)
+                click.echo(f"{wpath} was {'written' if written else 'unchanged'}")
+            else:
+                for txt in t.apply_all(models):
+                    click.echo(txt, nl=False)
+
+        return wrapper
+
+    return f
+
+
+template_batch_io = template_batch_io_factory(r_envvar="OS_TEMPLATE_READ")
@@ -1,13 +1,55 @@
 """template repository."""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
 from functools import cached_property
 from pathlib import Path
 from string import Template
-from typing import Generic, TypeVar
+from typing import Generic, Iterable, Iterator, TypeVar
 
+import click
 from pydantic import BaseModel, Field
 
 T = TypeVar("T", bound=BaseModel)
 
+DEFAULT_MODE = 0o644
+
+
+def _digest(path: Path) -> str | None:
+    """ファイル内容のハッシュ値. ファイルがなければNone."""
+    if not path.is_file():
+        return None
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def atomic_write(path: Path, chunks: Iterable[str]) -> bool:
+    """一時ファイルへ書き出してから置き換える.
+
+    書き出し途中の内容が読まれることはない. 親ディレクトリがなければ作る
+    :return: 内容が変わらず置き換えなかった場合はFalse
+    """
+    h = hashlib.sha256()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        # ハッシュ値と書き出すバイト列を一致させるため符号化と改行を固定する
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            for c in chunks:
+                f.write(c)
+                h.update(c.encode())
+        if h.hexdigest() == _digest(path):
+            Path(tmp).unlink()
+            return False
+        mode = path.stat().st_mode if path.is_file() else DEFAULT_MODE
+        Path(tmp).chmod(mode)
+        Path(tmp).replace(path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return True
+
 
 class TemplateRepo(BaseModel, Generic[T], frozen=True):
     """template IO."""
@@ -30,6 +72,39 @@ class TemplateRepo(BaseModel, Generic[T], frozen=True):
         d = model.model_dump(mode="json") | self.map_to
         return self.template.safe_substitute(d)
 
+    def apply_all(self, models: Iterable[T]) -> Iterator[str]:
+        """一覧の各要素へ適用する. 要素の区切りとして改行で終わらせる."""
+        for m in models:
+            txt = self.apply(m)
+            yield txt if txt.endswith("\n") else f"{txt}\n"
+
     def write(self, model: T, write_to: Path) -> None:
         """Write applied template."""
         write_to.write_text(self.apply(model))
+
+    def write_all(self, models: Iterable[T], write_to: Path) -> bool:
+        """一覧の全要素を1つのファイルへ書き出す.
+
+        :return: 内容が変わらず書き出さなかった場合はFalse
+        """
+        return atomic_write(write_to, self.apply_all(models))
+
+    def write_each(self, models: Iterable[T], path_format: str) -> dict[Path, bool]:
+        """要素ごとのファイルへ書き出す.
+
+        :param path_format: 要素の値で置換する出力先 e.g. out/${vm_id}.conf
+        :return: 出力先ごとの書き出したか否か
+        :raises click.UsageError: path_formatに要素にないキーがある
+        """
+        fmt = Template(path_format)
+        written = {}
+        for m in models:
+            values = m.model_dump(mode="json") | self.map_to
+            try:
+                p = Path(fmt.substitute(values))
+            except KeyError as e:
+                keys = ", ".join(sorted(values))
+                msg = f"--write-eachの{e}は使えません. 使えるキー: {keys}"
+                raise click.UsageError(msg) from e
+            written[p] = atomic_write(p, [self.apply(m)])
+        return written
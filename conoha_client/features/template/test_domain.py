@@ -1,17 +1,20 @@
 """template test."""
-
+from __future__ import annotations
 
 import os
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
-from _pytest.monkeypatch import MonkeyPatch
 from click.testing import CliRunner
 
-from conoha_client.features.template.domain import template_io
+from conoha_client.features.template.domain import template_batch_io, template_io
 
 from .test_repo import OneModel
 
+if TYPE_CHECKING:
+    from _pytest.monkeypatch import MonkeyPatch
+
 
 @click.command
 @template_io
@@ -35,3 +38,40 @@ def test_template_read(monkeypatch: MonkeyPatch) -> None:
     assert "xxx" in result.stdout
     assert y in result.stdout
     assert extra not in result.stdout
+
+
+@click.command
+@template_batch_io
+def batch_cli() -> list[OneModel]:
+    """Testee cli."""
+    return [OneModel(x=x, extra=None) for x in ["xxx", "yyy"]]
+
+
+def test_template_batch() -> None:
+    """全要素を標準出力へ."""
+    p = Path(__file__).parent / "fixture_template.txt"
+    runner = CliRunner()
+    result = runner.invoke(batch_cli, ["-r", str(p)])
+    assert result.stdout.count("Host dev") == 2  # noqa: PLR2004
+    assert "xxx" in result.stdout
+    assert "yyy" in result.stdout
+
+
+@click.command
+@template_io
+def many_cli() -> list[OneModel]:
+    """Testee cli."""
+    return [OneModel(x=x, extra=None) for x in ["xxx", "yyy"]]
+
+
+def test_template_many(tmp_path: Path) -> None:
+    """複数なら各要素へ適用して1つのファイルへまとめる."""
+    p = Path(__file__).parent / "fixture_template.txt"
+    out = tmp_path / "config"
+    runner = CliRunner()
+    result = runner.invoke(many_cli, ["-r", str(p), "-w", str(out)])
+    assert result.exit_code == 0
+    txt = out.read_text()
+    assert txt.count("Host dev") == 2  # noqa: PLR2004
+    assert "xxx" in txt
+    assert "yyy" in txt
@@ -3,9 +3,11 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import click
+import pytest
 from pydantic import BaseModel
 
-from .repo import TemplateRepo
+from .repo import TemplateRepo, atomic_write
 
 
 class OneModel(BaseModel, frozen=True):
@@ -26,3 +28,51 @@ def test_template() -> None:
     actual = t.apply(one)
     assert x in actual
     assert y in actual
+
+
+def test_write_all(tmp_path: Path) -> None:
+    """内容が変わらなければ書き出さない."""
+    p = Path(__file__).resolve().parent / "fixture_template.txt"
+    t = TemplateRepo(read_from=p, map_to={"y": "/path/to/file"})
+    models = [OneModel(x=x, extra=None) for x in ["a.a.a.a", "b.b.b.b"]]
+    out = tmp_path / "config"
+
+    assert t.write_all(models, out)
+    txt = out.read_text()
+    assert "a.a.a.a" in txt
+    assert "b.b.b.b" in txt
+    assert not t.write_all(models, out)
+    assert t.write_all(models[:1], out)
+    assert "b.b.b.b" not in out.read_text()
+    assert list(tmp_path.iterdir()) == [out]
+
+
+def test_write_each(tmp_path: Path) -> None:
+    """要素ごとに出力先を変える. 出力先のディレクトリがなければ作る."""
+    p = Path(__file__).resolve().parent / "fixture_template.txt"
+    t = TemplateRepo(read_from=p)
+    models = [OneModel(x=x, extra=None) for x in ["a", "b"]]
+    out = tmp_path / "out"
+
+    written = t.write_each(models, str(out / "${x}.conf"))
+    assert written == {out / "a.conf": True, out / "b.conf": True}
+    assert "HostName b" in (out / "b.conf").read_text()
+    written = t.write_each(models, str(out / "${x}.conf"))
+    assert not any(written.values())
+
+
+def test_write_each_unknown_key(tmp_path: Path) -> None:
+    """出力先に要素にないキーがあれば使えるキーを示す."""
+    p = Path(__file__).resolve().parent / "fixture_template.txt"
+    t = TemplateRepo(read_from=p)
+    with pytest.raises(click.UsageError, match="extra, x"):
+        t.write_each([OneModel(x="a", extra=None)], str(tmp_path / "${y}.conf"))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_atomic_write_non_ascii(tmp_path: Path) -> None:
+    """UTF-8で書き出し,同じ内容なら置き換えない."""
+    out = tmp_path / "hosts"
+    assert atomic_write(out, ["# 開発用\n", "Host a\n"])
+    assert out.read_text(encoding="utf-8") == "# 開発用\nHost a\n"
+    assert not atomic_write(out, ["# 開発用\n", "Host a\n"])
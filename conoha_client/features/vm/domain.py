@@ -1,6 +1,8 @@
 """VM Domain."""
 from __future__ import annotations
 
+import re
+from contextlib import suppress
 from datetime import datetime, timedelta
 from enum import Enum
 from ipaddress import IPv4Address
@@ -22,12 +24,18 @@ class VMStatus(Enum):
     VERIFY_RESIZE = "VERIFY_RESIZE"  # プラン変更確定処理待ち
     REVERT_RESIZE = "REVERT_RESIZE"
     REBUILD = "REBUILD"
+    ERROR = "ERROR"
+    DELETED = "DELETED"  # changes-sinceを指定したときのみ返される
 
     def is_shutoff(self) -> bool:
         """シャットダウン済みか否か."""
         return self == VMStatus.SHUTOFF
 
 
+# 構成ファイルから追加したVMに付けるmetadataのキー. 値は構成の名前
+FLEET_METADATA_KEY = "conoha-client-fleet"
+
+
 class VM(BaseModel, frozen=True):
     """契約中のサーバー."""
 
@@ -38,6 +46,18 @@ class VM(BaseModel, frozen=True):
     image_id: UUID = Field(alias=AliasPath("image", "id"))
     flavor_id: UUID = Field(alias=AliasPath("flavor", "id"))
     sshkey: str | None = Field(alias="key_name")
+    task_state: str | None = Field(
+        None,
+        alias="OS-EXT-STS:task_state",
+        description="実行中の操作. 操作が終われば無い",
+        exclude=True,
+    )
+    fleet: str | None = Field(
+        None,
+        alias=AliasPath("metadata", FLEET_METADATA_KEY),
+        description="追加した構成の名前. 構成から追加していなければ無い",
+        exclude=True,
+    )
 
     def elapsed_from_created(self, now: datetime | None = None) -> timedelta:
         """作成時からの経過時間を秒以下を省いて計算する."""
@@ -56,7 +76,76 @@ class VM(BaseModel, frozen=True):
         return v.astimezone(TOKYO_TZ)
 
 
+class ServerQuery(BaseModel, frozen=True):
+    """servers/detailのサーバー側で絞り込むクエリ."""
+
+    status: VMStatus | None = None
+    name: str | None = Field(None, description="正規表現で部分一致")
+    flavor_id: UUID | None = None
+    image_id: UUID | None = None
+    changes_since: datetime | None = Field(
+        None,
+        description="この日時以降に変更されたサーバー. 削除済みも含む",
+    )
+
+    def to_params(self) -> dict[str, str]:
+        """クエリパラメータへ変換."""
+        params = {
+            "status": None if self.status is None else self.status.value,
+            "name": self.name,
+            "flavor": None if self.flavor_id is None else str(self.flavor_id),
+            "image": None if self.image_id is None else str(self.image_id),
+            "changes-since": (
+                None if self.changes_since is None else self.changes_since.isoformat()
+            ),
+        }
+        return {k: v for k, v in params.items() if v is not None}
+
+    def push_down(self, key: str, value: str) -> ServerQuery:
+        """view_optionsの--where(部分一致)をサーバー側の絞り込みへ変換する.
+
+        結果が部分一致の結果を包含するときだけ変換し,できなければそのまま返す
+        クライアント側での絞り込みは変換の有無に関わらず行う前提
+        """
+        update = {}
+        if key == "name" and self.name is None and _NAME_PATTERN.fullmatch(value):
+            update["name"] = value
+        elif key == "status" and self.status is None:
+            matched = [s for s in VMStatus if value in s.value]
+            if len(matched) == 1:
+                update["status"] = matched[0]
+        elif key in ("flavor_id", "image_id") and getattr(self, key) is None:
+            with suppress(ValueError):
+                update[key] = UUID(value)
+        return self.model_copy(update=update)
+
+
+# 正規表現としても部分一致の意味が変わらない文字のみ
+_NAME_PATTERN = re.compile(r"[\w.-]+")
+
+
 class AddedVM(BaseModel, frozen=True):
     """新規追加されたVM."""
 
     vm_id: UUID = Field(alias="id")
+
+
+class Limits(BaseModel, frozen=True):
+    """テナントのVM作成上限. 負の値は無制限."""
+
+    max_instances: int = Field(alias=AliasPath("absolute", "maxTotalInstances"))
+    max_cores: int = Field(alias=AliasPath("absolute", "maxTotalCores"))
+    max_ram_mb: int = Field(alias=AliasPath("absolute", "maxTotalRAMSize"))
+
+    def exceeded(self, n_instances: int, n_cores: int, ram_mb: int) -> list[str]:
+        """上限を超える項目の説明. 超えなければ空."""
+        checks = [
+            ("VM数", n_instances, self.max_instances),
+            ("CPUコア数", n_cores, self.max_cores),
+            ("RAM[MB]", ram_mb, self.max_ram_mb),
+        ]
+        return [
+            f"{name}が上限を超えます: {n}/{limit}"
+            for name, n, limit in checks
+            if 0 <= limit < n
+        ]
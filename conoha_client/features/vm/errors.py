@@ -7,3 +7,11 @@ class VMMemoryShortageError(Exception):
 
 class NotFoundAddedVMError(Exception):
     """VMが追加されたはずなのに契約中VM一覧にはない."""
+
+
+class VMErrorStateError(Exception):
+    """待っている間にVMがERRORになった."""
+
+
+class VMWaitTimeoutError(Exception):
+    """VMが期限内に期待した状態にならなかった."""
@@ -9,7 +9,7 @@ from pydantic import BaseModel
 from requests import HTTPError
 
 from conoha_client.features._shared.endpoints.endpoints import Endpoints
-from conoha_client.features.vm.domain import AddedVM
+from conoha_client.features.vm.domain import FLEET_METADATA_KEY, AddedVM
 from conoha_client.features.vm.errors import (
     VMMemoryShortageError,
 )
@@ -33,6 +33,7 @@ class AddVMCommand(BaseModel, frozen=True):
     flavor_id: UUID
     image_id: UUID
     admin_pass: str
+    fleet: str | None = None
     dep: Callable[[dict], object] = post_add_vm
 
     def __call__(self, sshkey_name: str | None = None) -> AddedVM:
@@ -51,5 +52,7 @@ class AddVMCommand(BaseModel, frozen=True):
         }
         if sshkey_name is not None:
             js["server"]["key_name"] = sshkey_name
+        if self.fleet is not None:
+            js["server"]["metadata"] = {FLEET_METADATA_KEY: self.fleet}
         res = self.dep(js)
         return AddedVM.model_validate(res)
@@ -0,0 +1,59 @@
+"""差分取得で更新するVM一覧."""
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta
+from typing import Callable
+
+from conoha_client.features._shared import metrics
+from conoha_client.features._shared.util import now_jst
+from conoha_client.features.vm.domain import ServerQuery, VMStatus
+
+# 手元とサーバーの時計のずれで取りこぼさないよう前回の同期時刻から遡る
+OVERLAP = timedelta(minutes=1)
+
+
+class VMInventory:
+    """servers/detailの内容を保持してchanges-sinceの差分で更新する.
+
+    シェルや監視ループのように同じプロセスで何度も一覧を取得する場合に
+    2回目以降は変更されたVMだけを転送する
+    """
+
+    def __init__(
+        self,
+        dep: Callable[[ServerQuery | None], list[object]],
+        clock: Callable[[], datetime] = now_jst,
+    ) -> None:
+        """Init.
+
+        :param dep: クエリを受け取りservers/detailの要素を返す関数
+        """
+        self._dep = dep
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._servers: dict[str, object] = {}
+        self.synced: datetime | None = None
+
+    def refresh(self) -> list[object]:
+        """差分を取得して反映した一覧. list_vmsのdepとして使える."""
+        with self._lock:
+            started = self._clock()
+            metrics.count_cache("vm_inventory", hit=self.synced is not None)
+            if self.synced is None:
+                self._servers = {s["id"]: s for s in self._dep(None)}
+            else:
+                q = ServerQuery(changes_since=self.synced - OVERLAP)
+                for s in self._dep(q):
+                    if s["status"] == VMStatus.DELETED.value:
+                        self._servers.pop(s["id"], None)
+                    else:
+                        self._servers[s["id"]] = s
+            self.synced = started
+            return list(self._servers.values())
+
+    def clear(self) -> None:
+        """保持内容を捨てて次回は全件取得する."""
+        with self._lock:
+            self._servers = {}
+            self.synced = None
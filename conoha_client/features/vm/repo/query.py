@@ -1,18 +1,55 @@
 """契約中VM API."""
 from __future__ import annotations
 
+import threading
 from typing import Callable
 from uuid import UUID
 
 from conoha_client.features._shared import Endpoints
+from conoha_client.features._shared.endpoints.environments import (
+    env_region,
+    env_tenant_id,
+)
+from conoha_client.features._shared.fastjson import decode
 from conoha_client.features._shared.model_list.domain import ModelList, startswith
-from conoha_client.features.vm.domain import VM
+from conoha_client.features.vm.domain import VM, Limits, ServerQuery
 
+from .inventory import VMInventory
 
-def get_dep() -> list[object]:
-    """For Dependency Injection."""
-    res = Endpoints.COMPUTE.get("servers/detail").json()
-    return res["servers"]
+
+def get_dep(query: ServerQuery | None = None) -> list[object]:
+    """For Dependency Injection.
+
+    :param query: サーバー側での絞り込み
+    """
+    params = None if query is None else query.to_params()
+    res = Endpoints.COMPUTE.get("servers/detail", params)
+    return decode(res)["servers"]
+
+
+_lock = threading.Lock()
+_inventories: dict[tuple[str, str], VMInventory] = {}
+
+
+def inventory() -> VMInventory:
+    """プロセス内でテナントとリージョンごとに共有する差分更新のVM一覧."""
+    key = (env_tenant_id(), env_region())
+    with _lock:
+        if key not in _inventories:
+            _inventories[key] = VMInventory(dep=get_dep)
+        return _inventories[key]
+
+
+def inventory_dep() -> list[object]:
+    """差分更新のVM一覧. list_vmsのdepとして使う."""
+    return inventory().refresh()
+
+
+def servers_dep(query: ServerQuery) -> Callable[[], list[object]]:
+    """絞り込みがなければ差分更新,あればサーバー側で絞り込んで全件取得する."""
+    if query == ServerQuery():
+        return inventory_dep
+    return lambda: get_dep(query)
 
 
 def list_vms(
@@ -23,11 +60,28 @@ def list_vms(
     return [VM.model_validate(e) for e in res]
 
 
+def get_limits() -> Limits:
+    """テナントのVM作成上限を取得する."""
+    res = Endpoints.COMPUTE.get("limits")
+    return Limits.model_validate(decode(res)["limits"])
+
+
 def complete_vm(s: str) -> VM:
     """uuidを補完して検索."""
-    return ModelList[VM](list_vms()).find_one_by(startswith("vm_id", s))
+    return ModelList[VM](list_vms(inventory_dep)).find_one_by(
+        startswith("vm_id", s),
+    )
 
 
 def complete_vm_id(s: str) -> UUID:
     """uuidを補完して検索."""
     return complete_vm(s).vm_id
+
+
+def complete_vms(
+    prefixes: list[str],
+    dep: Callable[[], list[object]] = inventory_dep,
+) -> list[VM]:
+    """複数のuuidを1回の一覧取得で補完して検索."""
+    index = ModelList[VM](list_vms(dep)).prefix_index("vm_id")
+    return [index.find_one(s) for s in prefixes]
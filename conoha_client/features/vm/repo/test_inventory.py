@@ -0,0 +1,43 @@
+"""inventory test."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
+from conoha_client.features._shared.util import TOKYO_TZ
+from conoha_client.features.vm.domain import VMStatus
+
+from .inventory import OVERLAP, VMInventory
+from .query import list_vms
+from .test_wait import server
+
+if TYPE_CHECKING:
+    from conoha_client.features.vm.domain import ServerQuery
+
+
+def test_refresh() -> None:
+    """初回は全件,以降は差分を反映する."""
+    a, b, c = uuid4(), uuid4(), uuid4()
+    t0 = datetime(2023, 11, 1, tzinfo=TOKYO_TZ)
+    times = iter([t0, t0 + timedelta(minutes=5)])
+    responses = iter(
+        [
+            [server(a, VMStatus.ACTIVE), server(b, VMStatus.ACTIVE)],
+            [server(b, VMStatus.DELETED), server(c, VMStatus.BUILD)],
+        ],
+    )
+    queries = []
+
+    def dep(q: ServerQuery | None) -> list[object]:
+        queries.append(q)
+        return next(responses)
+
+    inv = VMInventory(dep=dep, clock=lambda: next(times))
+    assert {vm.vm_id for vm in list_vms(inv.refresh)} == {a, b}
+    assert {vm.vm_id for vm in list_vms(inv.refresh)} == {a, c}
+    assert queries[0] is None
+    assert queries[1].changes_since == t0 - OVERLAP
+
+    inv.clear()
+    assert inv.synced is None
@@ -0,0 +1,101 @@
+"""wait tests."""
+from __future__ import annotations
+
+from uuid import UUID, uuid4
+
+import pytest
+
+from conoha_client.features.vm.domain import VMStatus
+from conoha_client.features.vm.errors import VMErrorStateError, VMWaitTimeoutError
+
+from .wait import backoff, wait_vm, wait_vms
+
+
+def server(vm_id: UUID, status: VMStatus) -> dict:
+    """servers/detailの要素."""
+    return {
+        "name": "160-251-1-1",
+        "id": str(vm_id),
+        "status": status.value,
+        "created": "2023-11-08T17:56:00Z",
+        "image": {"id": str(uuid4())},
+        "flavor": {"id": str(uuid4())},
+        "key_name": None,
+    }
+
+
+def test_wait_vms() -> None:
+    """一覧に現れてACTIVEかERRORになるまで待つ."""
+    a, b = uuid4(), uuid4()
+    listings = iter(
+        [
+            [server(a, VMStatus.BUILD)],
+            [server(a, VMStatus.BUILD), server(b, VMStatus.BUILD)],
+            [server(a, VMStatus.ACTIVE), server(b, VMStatus.ERROR)],
+        ],
+    )
+    views = []
+    vms = wait_vms(
+        [a, b],
+        dep=lambda: next(listings),
+        view=views.append,
+        sleep=lambda _: None,
+    )
+    assert [vm.status for vm in vms] == [VMStatus.ACTIVE, VMStatus.ERROR]
+    assert len(views) == 3  # noqa: PLR2004
+    assert views[0][1] is None
+
+
+def test_wait_vm() -> None:
+    """操作中はACTIVEでも待ち,間隔をあけながら確認する."""
+    vm_id = uuid4()
+    rebuilding = server(vm_id, VMStatus.ACTIVE) | {
+        "OS-EXT-STS:task_state": "rebuilding",
+    }
+    responses = iter(
+        [rebuilding, server(vm_id, VMStatus.REBUILD), server(vm_id, VMStatus.ACTIVE)],
+    )
+    slept = []
+    vm = wait_vm(
+        vm_id,
+        dep=lambda _: next(responses),
+        intervals=backoff(1, 2, 3),
+        sleep=slept.append,
+        clock=lambda: 0,
+    )
+    assert vm.status == VMStatus.ACTIVE
+    assert slept == [1, 2]
+
+
+def test_wait_vm_fails() -> None:
+    """ERRORになれば待たずに,期限を過ぎれば諦める."""
+    vm_id = uuid4()
+    with pytest.raises(VMErrorStateError):
+        wait_vm(vm_id, dep=lambda _: server(vm_id, VMStatus.ERROR))
+
+    now = iter(range(100))
+    with pytest.raises(VMWaitTimeoutError):
+        wait_vm(
+            vm_id,
+            timeout_sec=3,
+            dep=lambda _: server(vm_id, VMStatus.BUILD),
+            intervals=backoff(1, 1, 1),
+            sleep=lambda _: None,
+            clock=lambda: next(now),
+        )
+
+
+def test_wait_vms_timeout() -> None:
+    """一覧に現れないかBUILDのままのVMがあれば期限を過ぎたら諦める."""
+    a, b = uuid4(), uuid4()
+    slept = []
+    with pytest.raises(VMWaitTimeoutError, match=str(b)):
+        wait_vms(
+            [a, b],
+            interval_sec=2,
+            dep=lambda: [server(a, VMStatus.BUILD)],
+            sleep=slept.append,
+            timeout_sec=5,
+            clock=lambda: sum(slept),
+        )
+    assert slept == [2, 2]
@@ -0,0 +1,116 @@
+"""VMの状態変化を待つ."""
+from __future__ import annotations
+
+import time
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+
+from conoha_client.features._shared import Endpoints, metrics
+from conoha_client.features._shared.fastjson import decode
+from conoha_client.features.vm.domain import VM, VMStatus
+from conoha_client.features.vm.errors import VMErrorStateError, VMWaitTimeoutError
+
+from .query import inventory_dep, list_vms
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+DEFAULT_WAIT_TIMEOUT = 600.0
+
+
+def wait_vms(  # noqa: PLR0913
+    vm_ids: list[UUID],
+    expected: VMStatus = VMStatus.ACTIVE,
+    interval_sec: float = 5,
+    dep: Callable[[], list[object]] = inventory_dep,
+    view: Callable[[list[VM | None]], Any] | None = None,
+    sleep: Callable[[float], object] = time.sleep,
+    timeout_sec: float = DEFAULT_WAIT_TIMEOUT,
+    clock: Callable[[], float] = time.monotonic,
+) -> list[VM]:
+    """複数VMが期待した状態になるまで1回の一覧取得で確認しながら待つ.
+
+    ERRORになったVMはそれ以上待たない
+    :return: vm_idsと同じ順序の最後に確認したVM
+    :raises VMWaitTimeoutError: timeout_sec秒待っても期待した状態にならないVMがある
+    """
+    done = {expected, VMStatus.ERROR}
+    started = clock()
+    while True:
+        metrics.count_poll("wait_vms")
+        vms = {vm.vm_id: vm for vm in list_vms(dep)}
+        targets = [vms.get(i) for i in vm_ids]
+        if view is not None:
+            view(targets)
+        pending = [
+            i
+            for i, vm in zip(vm_ids, targets)
+            if vm is None or vm.status not in done
+        ]
+        if len(pending) == 0:
+            return targets
+        if clock() - started + interval_sec > timeout_sec:
+            ids = ", ".join(str(i) for i in pending)
+            msg = f"{ids}は{timeout_sec}秒待っても{expected.value}になりません"
+            raise VMWaitTimeoutError(msg)
+        sleep(interval_sec)
+
+
+def server_dep(vm_id: UUID) -> object | None:
+    """1台分のVM情報. まだ(もう)なければNone."""
+    res = Endpoints.COMPUTE.get(f"servers/{vm_id}")
+    if res.status_code == HTTPStatus.NOT_FOUND:
+        return None
+    return decode(res)["server"]
+
+
+def backoff(
+    initial_sec: float = 2,
+    factor: float = 1.5,
+    max_sec: float = 15,
+) -> Iterator[float]:
+    """確認間隔. 操作直後は短く,長引くほど間隔をあける."""
+    sec = initial_sec
+    while True:
+        yield sec
+        sec = min(sec * factor, max_sec)
+
+
+def wait_vm(  # noqa: PLR0913
+    vm_id: UUID,
+    expected: tuple[VMStatus, ...] = (VMStatus.ACTIVE,),
+    timeout_sec: float = DEFAULT_WAIT_TIMEOUT,
+    dep: Callable[[UUID], object | None] = server_dep,
+    view: Callable[[VM | None, float], Any] | None = None,
+    intervals: Iterator[float] | None = None,
+    sleep: Callable[[float], object] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> VM:
+    """VMが期待した状態になり,実行中の操作がなくなるまで1台分だけ取得して待つ.
+
+    受付直後は元の状態のまま操作中のことがあるのでtask_stateも確認する
+    :param view: (最後に確認したVM, 経過秒数)を受け取る進捗表示
+    :raises VMErrorStateError: ERRORになった
+    :raises VMWaitTimeoutError: timeout_sec秒待っても期待した状態にならない
+    """
+    if intervals is None:
+        intervals = backoff()
+    started = clock()
+    while True:
+        metrics.count_poll("wait_vm")
+        js = dep(vm_id)
+        vm = None if js is None else VM.model_validate(js)
+        elapsed = clock() - started
+        if view is not None:
+            view(vm, elapsed)
+        if vm is not None and vm.status == VMStatus.ERROR:
+            msg = f"{vm_id}がERRORになりました"
+            raise VMErrorStateError(msg)
+        if vm is not None and vm.status in expected and vm.task_state is None:
+            return vm
+        wait = next(intervals)
+        if elapsed + wait > timeout_sec:
+            status = "不明" if vm is None else vm.status.value
+            msg = f"{vm_id}は{timeout_sec}秒待っても{status}のままです"
+            raise VMWaitTimeoutError(msg)
+        sleep(wait)
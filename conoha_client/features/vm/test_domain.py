@@ -0,0 +1,44 @@
+"""VM domain test."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from conoha_client.features._shared.util import TOKYO_TZ
+
+from .domain import ServerQuery, VMStatus
+
+
+def test_to_params() -> None:
+    """指定した条件のみクエリパラメータになる."""
+    image_id = uuid4()
+    q = ServerQuery(
+        status=VMStatus.SHUTOFF,
+        image_id=image_id,
+        changes_since=datetime(2023, 10, 31, 15, tzinfo=timezone.utc).astimezone(
+            TOKYO_TZ,
+        ),
+    )
+    assert q.to_params() == {
+        "status": "SHUTOFF",
+        "image": str(image_id),
+        "changes-since": "2023-11-01T00:00:00+09:00",
+    }
+    assert ServerQuery().to_params() == {}
+
+
+def test_push_down() -> None:
+    """部分一致の結果を包含できるときだけ変換する."""
+    q = ServerQuery()
+    assert q.push_down("status", "SHUT").status == VMStatus.SHUTOFF
+    # VERIFY_RESIZEなども一致するので変換しない
+    assert q.push_down("status", "RESIZE") == q
+    assert q.push_down("name", "160-251").name == "160-251"
+    assert q.push_down("name", "(a|b)") == q
+    vm_id = uuid4()
+    assert q.push_down("image_id", str(vm_id)).image_id == vm_id
+    assert q.push_down("image_id", str(vm_id)[:8]) == q
+    assert q.push_down("sshkey", "x") == q
+    # オプションでの明示を優先する
+    named = ServerQuery(name="a")
+    assert named.push_down("name", "b") == named
@@ -9,7 +9,6 @@ from pydantic import BaseModel
 from requests import Response
 
 from conoha_client.features._shared.endpoints.endpoints import Endpoints
-from conoha_client.features.vm.repo.query import complete_vm
 from conoha_client.features.vm_actions.domain.errors import (
     VMActionConflictingError,
     VMActionTargetNotFoundError,
@@ -101,18 +100,23 @@ class VMActionCommands(BaseModel, frozen=True):
             raise VMSnapshotError(msg)
 
     def resize(self, flavor_id: UUID) -> None:
-        """VMのmemoryを変更."""
+        """VMのmemoryを変更.
+
+        変更前と同じプランか512MBプランとそれ以外の間の変更は400が返される
+        """
         params = {"resize": {"flavorRef": str(flavor_id)}}
         res = self.dep(self.vm_id, params)
         if res.status_code == HTTPStatus.BAD_REQUEST:
-            msg = "メモリ512MGプランから1G,2G,...プランへの変更またはその逆はできません"
-            vm = complete_vm(str(self.vm_id))
-            if vm.flavor_id == flavor_id:
-                msg = "変更前と異なるメモリを指定してください"
+            rmsg = res.json().get("badRequest", {}).get("message", "")
+            msg = (
+                "変更前と異なるメモリを指定してください."
+                "メモリ512MGプランから1G,2G,...プランへの変更またはその逆はできません"
+                f":{rmsg}"
+            )
             raise VMResizeError(msg)
         if res.status_code != HTTPStatus.ACCEPTED:
             msg = f"{self.vm_id}をプラン変更できませんでした"
-            VMResizeError(msg)
+            raise VMResizeError(msg)
 
     def confirm_resize(self) -> None:
         """memory変更を確定."""
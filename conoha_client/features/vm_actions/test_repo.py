@@ -11,6 +11,7 @@ from conoha_client.features._shared.endpoints.endpoints import Endpoints
 from conoha_client.features.vm_actions.domain.errors import (
     VMActionTargetNotFoundError,
     VMDeleteError,
+    VMResizeError,
     VMShutdownError,
 )
 
@@ -62,3 +63,25 @@ def test_invalid_shutdown(
     cmd = VMActionCommands(vm_id=uid)
     with pytest.raises(VMShutdownError):
         cmd.shutdown()
+
+
+def test_invalid_resize(
+    requests_mock: Mocker,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """400はVM一覧を取得せずにレスポンスのメッセージで失敗する."""
+    prepare(requests_mock, monkeypatch)
+    uid = uuid4()
+    requests_mock.post(
+        Endpoints.COMPUTE.tenant_id_url(f"servers/{uid}/action"),
+        [
+            {"status_code": 400, "json": {"badRequest": {"message": "same"}}},
+            {"status_code": 500},
+        ],
+    )
+    cmd = VMActionCommands(vm_id=uid)
+    with pytest.raises(VMResizeError, match="same"):
+        cmd.resize(uuid4())
+    with pytest.raises(VMResizeError):
+        cmd.resize(uuid4())
+    assert all(r.method == "POST" for r in requests_mock.request_history)
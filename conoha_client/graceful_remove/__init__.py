@@ -1,2 +1,2 @@
 """watch init."""
-from .cli import graceful_rm_cli  # noqa: F401
+from .cli import graceful_rm_cli, save_rm_cli, stop_save_rm_cli  # noqa: F401
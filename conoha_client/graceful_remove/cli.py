@@ -1,8 +1,16 @@
 """watch cli."""
+from __future__ import annotations
+
+from typing import Callable, TypeVar
 
 import click
 
-from conoha_client.features.vm.repo.query import complete_vm
+from conoha_client._shared.snapshot.domain import SaveTarget, parse_save_targets
+from conoha_client._shared.snapshot.repo import DEFAULT_SAVE_TIMEOUT_SEC
+from conoha_client.features._shared.command_option import bulk_args, raise_for_failures
+from conoha_client.features._shared.concurrent import MAX_WORKERS
+from conoha_client.features._shared.workflow import run_workflow
+from conoha_client.features.vm.repo.query import complete_vm, complete_vms
 from conoha_client.features.vm_actions.repo import remove_vm
 
 from .repo import (
@@ -10,9 +18,12 @@ from .repo import (
     elapsed_from_created,
     saved_vm,
     stopped_vm,
+    teardown_stages,
     wait_plus_charge,
 )
 
+F = TypeVar("F", bound=Callable)
+
 
 @click.command("rm-gracefully", help="追加課金される前にVMを保存・削除する")
 @click.argument("vm_id", nargs=1, type=click.STRING)
@@ -78,3 +89,121 @@ def graceful_rm_cli(
     except Exception:  # noqa: BLE001
         errmsg = f"failed to remove VM({id_}) gracefully."
         broadcast_message(errmsg)
+
+
+def teardown_options(func: F) -> F:
+    """複数VMの保存・削除の共通オプション."""
+    func = bulk_args("targets")(func)
+    func = click.option(
+        "--concurrency",
+        type=click.IntRange(min=1),
+        default=MAX_WORKERS,
+        show_default=True,
+        help="停止,削除の同時実行数",
+    )(func)
+    func = click.option(
+        "--save-concurrency",
+        type=click.IntRange(min=1),
+        default=MAX_WORKERS,
+        show_default=True,
+        help="保存の同時実行数",
+    )(func)
+    func = click.option(
+        "--interval",
+        "-i",
+        type=click.FLOAT,
+        default=10,
+        show_default=True,
+        help="完了の確認間隔[sec]",
+    )(func)
+    return click.option(
+        "--timeout",
+        type=click.FloatRange(min=0, min_open=True),
+        default=DEFAULT_SAVE_TIMEOUT_SEC,
+        show_default=True,
+        help="停止,保存,削除それぞれの完了を待つ最大秒数. 過ぎたVMは失敗とする",
+    )(func)
+
+
+def teardown(  # noqa: PLR0913
+    targets: list[str],
+    *,
+    stop: bool,
+    concurrency: int,
+    save_concurrency: int,
+    interval: float,
+    timeout: float,
+) -> None:
+    """VM_ID:NAMEの組ごとに段階を重ねて保存・削除する."""
+    pairs = parse_save_targets(targets)
+    vms = complete_vms([vm_id for vm_id, _ in pairs])
+    items = [SaveTarget(vm_id=vm.vm_id, name=n) for vm, (_, n) in zip(vms, pairs)]
+    stages = teardown_stages(
+        items,
+        stop=stop,
+        concurrency=concurrency,
+        save_concurrency=save_concurrency,
+        timeout_sec=timeout,
+    )
+    outcomes = run_workflow(
+        items,
+        stages,
+        interval_sec=interval,
+        view=lambda d: click.echo(
+            ", ".join(f"{t.vm_id}:{stage}" for t, stage in d.items()),
+        ),
+    )
+    for o in outcomes:
+        t = o.arg
+        if o.is_ok():
+            click.echo(f"{t.vm_id} was saved as {t.name} and removed.")
+        else:
+            click.echo(f"failed to save and remove {t.vm_id}: {o.error}", err=True)
+    raise_for_failures(outcomes)
+
+
+@click.command("stop-save-rm")
+@teardown_options
+def stop_save_rm_cli(
+    targets: list[str],
+    concurrency: int,
+    save_concurrency: int,
+    interval: float,
+    timeout: float,
+) -> None:
+    """複数VMを停止,保存,削除する.
+
+    VM_ID NAME または VM_ID:NAME を複数(標準入力からも)指定する.
+    VMごとに段階を進めるので,あるVMの停止中に別のVMを保存する.
+    """
+    teardown(
+        targets,
+        stop=True,
+        concurrency=concurrency,
+        save_concurrency=save_concurrency,
+        interval=interval,
+        timeout=timeout,
+    )
+
+
+@click.command("save-rm")
+@teardown_options
+def save_rm_cli(
+    targets: list[str],
+    concurrency: int,
+    save_concurrency: int,
+    interval: float,
+    timeout: float,
+) -> None:
+    """停止済みの複数VMを保存,削除する.
+
+    VM_ID NAME または VM_ID:NAME を複数(標準入力からも)指定する.
+    """
+    teardown(
+        targets,
+        stop=False,
+        concurrency=concurrency,
+        save_concurrency=save_concurrency,
+        interval=interval,
+        timeout=timeout,
+    )
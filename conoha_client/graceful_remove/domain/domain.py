@@ -8,6 +8,7 @@ from typing import Any, Callable, Generic, TypeVar
 
 from pydantic import BaseModel
 
+from conoha_client.features._shared import metrics
 from conoha_client.features._shared.util import now_jst
 
 T = TypeVar("T")
@@ -23,6 +24,7 @@ class Watcher(BaseModel, Generic[T], frozen=True):
 
     def is_ok(self) -> bool:
         """Is satisfied as expected."""
+        metrics.count_poll("graceful_rm")
         v = self.dep()
         if self.view is not None:
             self.view(v)
@@ -2,3 +2,4 @@
 from .broadcast_msg import broadcast_message  # noqa: F401
 from .curry import elapsed_from_created  # noqa: F401
 from .repo import saved_vm, stopped_vm, wait_plus_charge  # noqa: F401
+from .workflow import teardown_stages  # noqa: F401
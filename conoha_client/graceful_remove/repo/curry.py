@@ -5,10 +5,15 @@ from datetime import timedelta
 from typing import Callable
 from uuid import UUID
 
-from conoha_client._shared.snapshot.repo import complete_snapshot_by_name
+from conoha_client._shared.snapshot.repo import list_snapshots
+from conoha_client._shared.snapshot.tracker import SnapshotTracker
 from conoha_client.features._shared.model_list.domain import ModelList, by
 from conoha_client.features.vm.domain import VMStatus
-from conoha_client.features.vm.repo.query import complete_vm, list_vms
+from conoha_client.features.vm.repo.query import (
+    complete_vm,
+    inventory_dep,
+    list_vms,
+)
 
 
 def vm_status_finder(vm_id: UUID) -> Callable[[], VMStatus]:
@@ -21,12 +26,23 @@ def vm_status_finder(vm_id: UUID) -> Callable[[], VMStatus]:
     return _f
 
 
-def snapshot_progress_finder(name: str) -> Callable[[], int]:
-    """Find progress by name memo."""
+# 並行して保存するスナップショットの進捗をまとめて取得する
+_snapshot_tracker = SnapshotTracker(list_snapshots)
+SNAPSHOT_POLL_MAX_AGE_SEC = 5
+
+
+def snapshot_progress_finder(
+    name: str,
+    tracker: SnapshotTracker = _snapshot_tracker,
+) -> Callable[[], int]:
+    """Find progress by name memo.
+
+    同じtrackerの他のスナップショットと1回の一覧取得を共有する
+    """
+    tracker.register(name)
 
     def _f() -> int:
-        image = complete_snapshot_by_name(name)
-        return image.progress
+        return tracker.poll(max_age_sec=SNAPSHOT_POLL_MAX_AGE_SEC)[name].progress
 
     return _f
 
@@ -35,7 +51,7 @@ def exists_vm(vm_id: UUID) -> Callable[[], bool]:
     """Exists vm memo."""
 
     def _f() -> bool:
-        vm = ModelList(list_vms()).find_one_or_none_by(by("vm_id", vm_id))
+        vm = ModelList(list_vms(inventory_dep)).find_one_or_none_by(by("vm_id", vm_id))
         return vm is not None
 
     return _f
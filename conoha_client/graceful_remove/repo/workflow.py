@@ -0,0 +1,118 @@
+"""複数VMの停止,保存,削除."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable
+
+from conoha_client._shared.snapshot.domain import (
+    SaveTarget,
+    SnapshotNameDuplicatedError,
+    SnapshotSaveFailedError,
+)
+from conoha_client._shared.snapshot.repo import list_snapshots
+from conoha_client._shared.snapshot.tracker import SnapshotTracker
+from conoha_client.features._shared.concurrent import MAX_WORKERS
+from conoha_client.features._shared.model_list.domain import by
+from conoha_client.features._shared.workflow import Stage
+from conoha_client.features.image.repo import remove_image
+from conoha_client.features.vm.domain import VMStatus
+from conoha_client.features.vm.repo.query import inventory_dep, list_vms
+from conoha_client.features.vm_actions.repo import VMActionCommands, remove_vm
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+    from conoha_client.features.image.domain.image import ImageList
+
+
+def teardown_stages(  # noqa: PLR0913
+    targets: list[SaveTarget],
+    stop: bool = True,  # noqa: FBT002
+    concurrency: int = MAX_WORKERS,
+    save_concurrency: int = MAX_WORKERS,
+    vms_dep: Callable[[], list[object]] = inventory_dep,
+    snapshots_dep: Callable[[], ImageList] = list_snapshots,
+    timeout_sec: float | None = None,
+) -> list[Stage[SaveTarget]]:
+    """停止,保存,削除,同一名の既存スナップショット削除の段階.
+
+    完了の確認は段階ごとに1回の一覧取得で行う
+    :param stop: Falseなら停止済みのVMとして停止しない
+    :param timeout_sec: 停止,保存,削除それぞれの完了を待つ最大秒数. Noneなら期限なし
+    """
+    names = [t.name for t in targets]
+    if len(names) != len(set(names)):
+        msg = f"スナップショット名が重複しています:{names}"
+        raise SnapshotNameDuplicatedError(msg)
+    snapshots = snapshots_dep()
+    olds = {n: snapshots.find_one_or_none_by(by("name", n)) for n in names}
+    old_ids = {img.image_id for img in olds.values() if img is not None}
+    tracker = SnapshotTracker(snapshots_dep, exclude_ids=old_ids)
+    initial = {vm.vm_id: vm.status for vm in list_vms(vms_dep)}
+
+    def _statuses() -> dict[UUID, VMStatus]:
+        return {vm.vm_id: vm.status for vm in list_vms(vms_dep)}
+
+    def _stopped(ts: list[SaveTarget]) -> set[SaveTarget]:
+        statuses = _statuses()
+        return {t for t in ts if statuses.get(t.vm_id) == VMStatus.SHUTOFF}
+
+    def _save(t: SaveTarget) -> None:
+        VMActionCommands(vm_id=t.vm_id).snapshot(t.name)
+        tracker.register(t.name)
+
+    def _saved(ts: list[SaveTarget]) -> set[SaveTarget]:
+        progresses = tracker.poll()
+        return {t for t in ts if progresses[t.name].is_done()}
+
+    def _save_failed(ts: list[SaveTarget]) -> dict[SaveTarget, Exception]:
+        # _savedで取得した進捗を使い,一覧を取得し直さない
+        return {
+            t: SnapshotSaveFailedError(f"{t.name}の保存に失敗しました")
+            for t in ts
+            if tracker.progress(t.name).failed
+        }
+
+    def _removed(ts: list[SaveTarget]) -> set[SaveTarget]:
+        statuses = _statuses()
+        return {
+            t
+            for t in ts
+            if statuses.get(t.vm_id, VMStatus.DELETED) == VMStatus.DELETED
+        }
+
+    stages = [
+        Stage[SaveTarget](
+            name="save",
+            start=_save,
+            done=_saved,
+            failed=_save_failed,
+            concurrency=save_concurrency,
+            timeout_sec=timeout_sec,
+        ),
+        Stage[SaveTarget](
+            name="rm",
+            start=lambda t: remove_vm(t.vm_id),
+            done=_removed,
+            concurrency=concurrency,
+            timeout_sec=timeout_sec,
+        ),
+        Stage[SaveTarget](
+            name="clean",
+            start=lambda t: remove_image(olds[t.name]),
+            skip=lambda t: olds[t.name] is None,
+            concurrency=concurrency,
+        ),
+    ]
+    if not stop:
+        return stages
+    return [
+        Stage[SaveTarget](
+            name="stop",
+            start=lambda t: VMActionCommands(vm_id=t.vm_id).shutdown(),
+            done=_stopped,
+            skip=lambda t: initial.get(t.vm_id) == VMStatus.SHUTOFF,
+            concurrency=concurrency,
+            timeout_sec=timeout_sec,
+        ),
+        *stages,
+    ]
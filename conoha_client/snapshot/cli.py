@@ -5,16 +5,25 @@ from typing import TYPE_CHECKING
 
 import click
 
-from conoha_client._shared import save_snapshot
+from conoha_client._shared import remove_snapshots, save_snapshots
 from conoha_client._shared.renforced_vm.query import find_reinforced_vm_by_id
+from conoha_client._shared.snapshot.domain import SaveTarget, parse_save_targets
+from conoha_client._shared.snapshot.repo import DEFAULT_SAVE_TIMEOUT_SEC
 from conoha_client._shared.ssh_template import ssh_template_options
+from conoha_client._shared.wait import wait_if_needed, wait_options
 from conoha_client.features._shared import (
     view_options,
 )
-from conoha_client.features._shared.command_option import each_args
-from conoha_client.features.image.repo import remove_image
+from conoha_client.features._shared.command_option import (
+    bulk_args,
+    profiles_option,
+    raise_for_failures,
+    regions_option,
+)
+from conoha_client.features._shared.concurrent import MAX_WORKERS
+from conoha_client.features.image.domain.errors import DeletePriorImageForbiddenError
 from conoha_client.features.plan.domain import Memory
-from conoha_client.features.vm.repo.query import complete_vm
+from conoha_client.features.vm.repo.query import complete_vm, complete_vms
 from conoha_client.features.vm_actions.repo import VMActionCommands
 
 from .repo import (
@@ -35,32 +44,69 @@ def snapshot_cli() -> None:
 
 @snapshot_cli.command("ls")
 @view_options
+@profiles_option
+@regions_option
 def list_() -> list[Image]:
     """スナップショット一覧."""
     return list_snapshots().root
 
 
 @snapshot_cli.command()
-@click.argument("vm_id", nargs=1, type=click.STRING)
-@click.argument("name", nargs=1, type=click.STRING)
-def save(vm_id: str, name: str) -> None:
-    """VMをイメージとして保存."""
-    vm = complete_vm(vm_id)
-    old_id = save_snapshot(vm.vm_id, name)
-    if old_id is not None:
-        click.echo(f"old snapshot({old_id}) was deleted.")
-    click.echo(f"{vm.vm_id} was snapshot as {name}.")
+@bulk_args("targets")
+@click.option(
+    "--interval",
+    "-i",
+    type=click.FLOAT,
+    default=10,
+    show_default=True,
+    help="保存進捗率の確認間隔[sec]",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=DEFAULT_SAVE_TIMEOUT_SEC,
+    show_default=True,
+    help="保存完了を待つ最大秒数. 過ぎたものは失敗とし既存を残す",
+)
+def save(targets: list[str], interval: float, timeout: float) -> None:
+    """VMをイメージとして保存.
+
+    VM_ID NAME または VM_ID:NAME を複数(標準入力からも)指定して並行保存する
+    失敗したものは標準エラー出力に表示し,1つでもあれば失敗として終了する
+    """
+    pairs = parse_save_targets(targets)
+    vms = complete_vms([vm_id for vm_id, _ in pairs])
+    outcomes = save_snapshots(
+        [SaveTarget(vm_id=vm.vm_id, name=name) for vm, (_, name) in zip(vms, pairs)],
+        interval_sec=interval,
+        timeout_sec=timeout,
+        view=lambda d: click.echo(
+            "save progress is "
+            + ", ".join(f"{k}:{v}%" for k, v in sorted(d.items())),
+        ),
+    )
+    for o in outcomes:
+        t = o.arg
+        if not o.is_ok():
+            click.echo(f"failed to snapshot {t.vm_id} as {t.name}: {o.error}", err=True)
+            continue
+        if o.value is not None:
+            click.echo(f"old snapshot({o.value}) was deleted.")
+        click.echo(f"{t.vm_id} was snapshot as {t.name}.")
+    raise_for_failures(outcomes)
 
 
 @snapshot_cli.command(name="restore", help="スナップショットからVM起動")
 @click.argument("name", nargs=1, type=click.STRING)
 @click.argument("memory", nargs=1, type=click.Choice(Memory))
 @ssh_template_options
+@wait_options
 def restore(
     admin_password: str,
     keypair_name: str,
     name: str,
     memory: Memory,
+    wait_timeout: float | None,
 ) -> ReinforcedVM:
     """スナップショットからVM起動."""
     added, img = restore_snapshot(
@@ -69,6 +115,7 @@ def restore(
         admin_password,
         keypair_name,
     )
+    wait_if_needed(added.vm_id, wait_timeout)
     vm = find_reinforced_vm_by_id(added.vm_id)
     click.echo(f"VM(uuid={added.vm_id}) was restored from {img.name} snapshot")
     return vm
@@ -78,11 +125,13 @@ def restore(
 @click.argument("vm_id", nargs=1, type=click.STRING)
 @click.argument("name", nargs=1, type=click.STRING)
 @ssh_template_options
+@wait_options
 def rebuild(
     admin_password: str,
     keypair_name: str,
     vm_id: str,
     name: str,
+    wait_timeout: float | None,
 ) -> ReinforcedVM:
     """スナップショットからVM起動."""
     vm = complete_vm(vm_id)
@@ -93,14 +142,35 @@ def rebuild(
         admin_pass=admin_password,
         sshkey_name=keypair_name,
     )
+    wait_if_needed(vm.vm_id, wait_timeout)
     vm = find_reinforced_vm_by_id(vm.vm_id)
     click.echo(f"VM(uuid={vm.vm_id}) was rebuild from {img.name} snapshot")
     return vm
 
 
 @snapshot_cli.command("rm")
-@each_args("names", converter=complete_snapshot_by_name)
-def remove(snapshot: Image) -> None:
-    """スナップショットを削除."""
-    remove_image(snapshot)
-    click.echo(f"{snapshot.name} snapshot was deleted.")
+@bulk_args("names")
+@click.option(
+    "--concurrency",
+    "-c",
+    type=click.IntRange(min=1),
+    default=MAX_WORKERS,
+    show_default=True,
+    help="削除リクエストの同時実行数",
+)
+def remove(names: list[str], concurrency: int) -> None:
+    """スナップショットを削除.
+
+    全ての名前を1回の一覧取得で前方一致検索して並行削除する
+    失敗したものは標準エラー出力に表示し,1つでもあれば失敗として終了する
+    """
+    outcomes = remove_snapshots(names, max_workers=concurrency)
+    for o in outcomes:
+        if o.is_ok():
+            click.echo(f"{o.value.name} snapshot was deleted.")
+        elif isinstance(o.error, DeletePriorImageForbiddenError):
+            click.echo(f"{o.arg}: {o.error}", err=True)
+        else:
+            msg = f"failed to delete {o.arg}: {type(o.error).__name__} {o.error}"
+            click.echo(msg, err=True)
+    raise_for_failures(outcomes)
@@ -1,4 +1,5 @@
 """dependent vm."""
-from .add import vm_add_cli  # noqa: F401
+from .add import vm_add_cli, vm_add_fleet_cli  # noqa: F401
+from .apply import vm_apply_cli  # noqa: F401
 from .rebuild import vm_rebuild_cli  # noqa: F401
 from .resize import vm_resize_cli  # noqa: F401
@@ -1,18 +1,36 @@
 """add VM CLI."""
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, TypeVar
 
 import click
+from click.core import ParameterSource
 
+from conoha_client._shared.add_vm.domain import load_fleet_spec
 from conoha_client._shared.add_vm.options import (
     add_subcommands,
     identify_prior_image_options,
 )
-from conoha_client._shared.add_vm.repo import DistQuery, add_vm_command
-from conoha_client._shared.renforced_vm.query import find_reinforced_vm_by_id
+from conoha_client._shared.add_vm.preflight import fetch_catalog, preflight
+from conoha_client._shared.add_vm.repo import (
+    AddRequest,
+    DistQuery,
+    add_vm_command,
+    add_vms,
+    fleet_requests,
+)
+from conoha_client._shared.renforced_vm.query import (
+    find_reinforced_vm_by_id,
+    list_reinforced_vms,
+)
 from conoha_client._shared.ssh_template import ssh_template_options
+from conoha_client._shared.wait import wait_if_needed, wait_options
+from conoha_client.features._shared.command_option import build_vm_options
+from conoha_client.features._shared.concurrent import MAX_WORKERS
 from conoha_client.features.plan.domain import Memory
+from conoha_client.features.vm.domain import VMStatus
+from conoha_client.features.vm.repo.wait import DEFAULT_WAIT_TIMEOUT, wait_vms
 
 if TYPE_CHECKING:
     from conoha_client._shared.renforced_vm.domain import ReinforcedVM
@@ -21,6 +39,117 @@ if TYPE_CHECKING:
         Distribution,
         DistVersion,
     )
+    from conoha_client.features.vm.domain import VM
+
+F = TypeVar("F", bound=Callable)
+
+
+def provision_options(func: F) -> F:
+    """複数VM追加の共通オプション."""
+    func = click.option(
+        "--concurrency",
+        type=click.IntRange(min=1),
+        default=MAX_WORKERS,
+        show_default=True,
+        help="VM追加リクエストの同時実行数",
+    )(func)
+    func = click.option(
+        "--per-sec",
+        type=click.FloatRange(min=0, min_open=True),
+        default=1.0,
+        show_default=True,
+        help="1秒あたりのVM追加リクエスト数の上限",
+    )(func)
+    func = click.option(
+        "--interval",
+        type=click.FLOAT,
+        default=5.0,
+        show_default=True,
+        help="ACTIVEになったかの確認間隔[sec]",
+    )(func)
+    return click.option(
+        "--timeout",
+        type=click.FloatRange(min=0, min_open=True),
+        default=DEFAULT_WAIT_TIMEOUT,
+        show_default=True,
+        help="全てACTIVEになるまで待つ最大秒数",
+    )(func)
+
+
+def fleet_options(func: F) -> F:
+    """構成ファイルからVMを追加するコマンドの共通オプション."""
+    return click.option(
+        "--fleet",
+        help="構成の名前. 追加するVMのmetadataに付ける. 省略時はSPECのファイル名",
+    )(func)
+
+
+def fleet_name(spec: Path, fleet: str | None) -> str:
+    """構成の名前."""
+    return spec.stem if fleet is None else fleet
+
+
+def provision(
+    reqs: list[AddRequest],
+    concurrency: int,
+    per_sec: float,
+    interval: float,
+    timeout: float,
+) -> list[VM]:
+    """VMを並行追加して全てがACTIVEになるまで待つ.
+
+    追加に失敗したVMは標準エラー出力に表示して返り値に含めない
+    :return: 追加したVM. ERRORになったVMも含む
+    :raises VMWaitTimeoutError: timeout秒待ってもACTIVEにならないVMがある
+    """
+    outcomes = add_vms(reqs, concurrency, per_sec)
+    for o in outcomes:
+        if not o.is_ok():
+            click.echo(f"failed to add VM: {o.error}", err=True)
+    vm_ids = [o.value.vm_id for o in outcomes if o.is_ok()]
+    click.echo(f"{len(vm_ids)} VMs were added newly")
+
+    def _view(vms: list[VM | None]) -> None:
+        n = len([vm for vm in vms if vm is not None and vm.status == VMStatus.ACTIVE])
+        click.echo(f"{n}/{len(vms)} VMs are ACTIVE")
+
+    vms = wait_vms(vm_ids, interval_sec=interval, view=_view, timeout_sec=timeout)
+    for vm in vms:
+        click.echo(f"VM(uuid={vm.vm_id}) {vm.status.value} {vm.ipv4}")
+    return vms
+
+
+def raise_if_not_provisioned(reqs: list[AddRequest], vms: list[VM]) -> None:
+    """provisionでACTIVEにならなかった分があれば失敗とする."""
+    n_failed = len(reqs) - len([vm for vm in vms if vm.status == VMStatus.ACTIVE])
+    if n_failed > 0:
+        msg = f"{n_failed}/{len(reqs)}台のVMを追加できませんでした"
+        raise click.ClickException(msg)
+
+
+def _given(ctx: click.Context, *names: str) -> list[str]:
+    """既定値でなく明示的に指定されたオプション名."""
+    return [
+        "--" + name.replace("_", "-")
+        for name in names
+        if ctx.get_parameter_source(name) not in (None, ParameterSource.DEFAULT)
+    ]
+
+
+def reject_unused_wait_options(ctx: click.Context, count: int) -> None:
+    """台数によって使われない待機オプションの指定を拒否する.
+
+    1台なら--wait,--wait-timeoutで,2台以上なら--timeoutで待つ
+    """
+    unused, usage = (
+        (_given(ctx, "timeout"), "--wait-timeout")
+        if count == 1
+        else (_given(ctx, "wait", "wait_timeout"), "--timeout")
+    )
+    if len(unused) > 0:
+        names = ", ".join(unused)
+        msg = f"--count {count}では{names}は使えません. {usage}で指定してください"
+        raise click.UsageError(msg, ctx)
 
 
 @click.group("add", invoke_without_command=True, help="VM新規追加")
@@ -31,6 +160,16 @@ if TYPE_CHECKING:
     required=True,
     help="VMのRAM容量[GB]",
 )
+@click.option(
+    "--count",
+    "-n",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="追加するVM数. 2以上の場合は--timeout秒まで全てACTIVEになるまで待つ",
+)
+@provision_options
+@wait_options
 @identify_prior_image_options
 @ssh_template_options
 @click.pass_context
@@ -39,25 +178,47 @@ def vm_add_cli(  # noqa: PLR0913
     admin_password: str,
     keypair_name: str,
     memory: Memory,
+    count: int,
+    concurrency: int,
+    per_sec: float,
+    interval: float,
+    timeout: float,
+    wait_timeout: float | None,
     dist: Distribution,
     version: DistVersion,
     app: Application,
-) -> ReinforcedVM | None:
-    """Add VM CLI."""
+) -> ReinforcedVM | list[ReinforcedVM] | None:
+    """Add VM CLI.
+
+    POSTする前にイメージ,プラン,キーペア,作成上限をまとめて確認する
+    2台以上ならACTIVEになった全てのVMへテンプレートを適用する
+    """
     ctx.ensure_object(dict)
     query = DistQuery(memory=memory, dist=dist)
     ctx.obj["q"] = query
     ctx.obj["version"] = version
     ctx.obj["app"] = app
     if ctx.invoked_subcommand is None:
+        reject_unused_wait_options(ctx, count)
+        catalog = fetch_catalog()
         cmd = add_vm_command(
             memory=memory,
             dist=dist,
             ver=version,
             app=app,
             admin_pass=admin_password,
+            dep=lambda: catalog.images,
+            plans_dep=lambda: catalog.plans,
         )
+        reqs = [(cmd, keypair_name)] * count
+        preflight(catalog, reqs)
+        if count > 1:
+            vms = provision(reqs, concurrency, per_sec, interval, timeout)
+            raise_if_not_provisioned(reqs, vms)
+            ids = {vm.vm_id for vm in vms}
+            return [vm for vm in list_reinforced_vms() if vm.vm_id in ids]
         added = cmd(keypair_name)
+        wait_if_needed(added.vm_id, wait_timeout)
         vm = find_reinforced_vm_by_id(added.vm_id)
         click.echo(f"VM(uuid={vm.vm_id}) was added newly")
         return vm
@@ -65,3 +226,40 @@ def vm_add_cli(  # noqa: PLR0913
 
 
 add_subcommands(vm_add_cli)
+
+
+@click.command("add-fleet")
+@click.argument(
+    "spec",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@fleet_options
+@provision_options
+@build_vm_options
+def vm_add_fleet_cli(  # noqa: PLR0913
+    admin_password: str,
+    keypair_name: str,
+    spec: Path,
+    fleet: str | None,
+    concurrency: int,
+    per_sec: float,
+    interval: float,
+    timeout: float,
+) -> None:
+    """構成ファイルに従ってVMを並行追加する.
+
+    SPECは{"memory", "distro", "version", "app", "count", "keypair"}のJSONリスト
+    追加したVMは同じ構成名のapplyで管理される
+    """
+    catalog = fetch_catalog()
+    reqs = fleet_requests(
+        load_fleet_spec(spec),
+        admin_password,
+        keypair_name,
+        dep=lambda: catalog.images,
+        plans_dep=lambda: catalog.plans,
+        fleet=fleet_name(spec, fleet),
+    )
+    preflight(catalog, reqs)
+    vms = provision(reqs, concurrency, per_sec, interval, timeout)
+    raise_if_not_provisioned(reqs, vms)
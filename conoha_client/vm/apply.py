@@ -0,0 +1,121 @@
+"""構成ファイルにVMを合わせるCLI."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import click
+
+from conoha_client._shared.add_vm.domain import PreflightError, load_fleet_spec
+from conoha_client._shared.add_vm.preflight import fetch_catalog, find_problems
+from conoha_client._shared.fleet import FleetPlan, plan_fleet, remove_vms
+from conoha_client._shared.resize import resize_vms
+from conoha_client.features._shared.command_option import build_vm_options
+from conoha_client.features.vm.domain import VMStatus
+
+from .add import fleet_name, fleet_options, provision, provision_options
+
+
+@click.command("apply")
+@click.argument(
+    "spec",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option("--dry-run", is_flag=True, default=False, help="計画の表示のみ")
+@click.option("--yes", "-y", is_flag=True, default=False, help="確認せずに実行する")
+@click.option(
+    "--prune",
+    is_flag=True,
+    default=False,
+    help="この構成から追加していないVMも全て削除する",
+)
+@fleet_options
+@provision_options
+@build_vm_options
+def vm_apply_cli(  # noqa: PLR0913
+    admin_password: str,
+    keypair_name: str,
+    spec: Path,
+    dry_run: bool,
+    yes: bool,
+    prune: bool,
+    fleet: str | None,
+    concurrency: int,
+    per_sec: float,
+    interval: float,
+    timeout: float,
+) -> None:
+    """契約中VMを構成ファイルに合わせる.
+
+    SPECはadd-fleetと同じ形式で,同じ構成名で追加したVMのうち構成にないVMは削除する.
+    構成から追加していないVMは--pruneを付けたときだけ削除する.
+    追加,プラン変更,削除の順にそれぞれ並行して行う.
+    """
+    catalog = fetch_catalog()
+    plan = plan_fleet(
+        load_fleet_spec(spec),
+        catalog,
+        admin_password,
+        fleet_name(spec, fleet),
+        keypair_name,
+        prune=prune,
+    )
+    for line in plan.describe(catalog):
+        click.echo(line)
+    if plan.is_empty():
+        click.echo("no changes")
+        return
+
+    # 削除前の追加とプラン変更で増えるRAMとコア数も作成上限の確認に含める
+    peak = catalog.model_copy(update={"vms": plan.peak()})
+    problems = find_problems(peak, plan.add)
+    if len(problems) > 0:
+        raise PreflightError("\n".join(problems))
+    if dry_run:
+        return
+    if not yes:
+        click.confirm("apply this plan?", abort=True)
+
+    n = _execute(plan, concurrency, per_sec, interval, timeout)
+    click.echo("{} added, {} resized, {} removed".format(*n))
+    n_failed = len(plan.remove) + len(plan.resize) + len(plan.add) - sum(n)
+    if n_failed > 0:
+        msg = f"{n_failed}件の操作が失敗しました"
+        raise click.ClickException(msg)
+
+
+def _execute(
+    plan: FleetPlan,
+    concurrency: int,
+    per_sec: float,
+    interval: float,
+    timeout: float,
+) -> tuple[int, int, int]:
+    """追加,プラン変更,削除の順に行う. 置き換えるVMは追加後に削除する.
+
+    :return: 成功した追加,プラン変更,削除の数
+    """
+    added = []
+    if len(plan.add) > 0:
+        added = provision(plan.add, concurrency, per_sec, interval, timeout)
+    resized = resize_vms(
+        plan.resize,
+        concurrency,
+        view=lambda vm_id, step: click.echo(f"{vm_id} {step}"),
+    )
+    for o in resized:
+        if not o.is_ok():
+            click.echo(f"failed to resize {o.arg.vm.vm_id}: {o.error}")
+    n_added = len([vm for vm in added if vm.status == VMStatus.ACTIVE])
+    if n_added < len(plan.add):
+        # 置き換え先が揃わないまま削除すると台数が減るので削除しない
+        click.echo(f"skip removing {len(plan.remove)} VMs since some adds failed")
+        return n_added, len([o for o in resized if o.is_ok()]), 0
+    removed = remove_vms(plan.remove, concurrency)
+    for o in removed:
+        vm_id = o.arg.vm_id
+        click.echo(f"{vm_id} was removed" if o.is_ok() else f"{vm_id}: {o.error}")
+    return (
+        n_added,
+        len([o for o in resized if o.is_ok()]),
+        len([o for o in removed if o.is_ok()]),
+    )
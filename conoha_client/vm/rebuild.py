@@ -12,6 +12,7 @@ from conoha_client._shared.add_vm.options import (
 from conoha_client._shared.add_vm.repo import DistQuery
 from conoha_client._shared.renforced_vm.query import find_reinforced_vm_by_id
 from conoha_client._shared.ssh_template import ssh_template_options
+from conoha_client._shared.wait import wait_if_needed, wait_options
 from conoha_client.features.plan.repo import find_memory
 from conoha_client.features.vm.repo.query import complete_vm
 from conoha_client.features.vm_actions.repo import VMActionCommands
@@ -27,6 +28,7 @@ if TYPE_CHECKING:
 
 @click.group(name="rebuild", invoke_without_command=True, help="VM再構築")
 @click.option("--vm-id", "-i", type=click.STRING, required=True)
+@wait_options
 @identify_prior_image_options
 @ssh_template_options
 @click.pass_context
@@ -35,6 +37,7 @@ def vm_rebuild_cli(  # noqa: PLR0913
     admin_password: str,
     keypair_name: str,
     vm_id: str,
+    wait_timeout: float | None,
     dist: Distribution,
     version: DistVersion,
     app: Application,
@@ -58,6 +61,7 @@ def vm_rebuild_cli(  # noqa: PLR0913
             sshkey_name=keypair_name,
         )
         click.echo(f"{vm.vm_id} was rebuilt.")
+        wait_if_needed(vm.vm_id, wait_timeout)
         return find_reinforced_vm_by_id(vm.vm_id)
     return None
 
@@ -1,13 +1,21 @@
 """VM resize cli."""
+from __future__ import annotations
 
 from uuid import UUID
 
 import click
 
-from conoha_client.features._shared.command_option import each_args
+from conoha_client._shared.resize import ResizeTarget, resize_vms
+from conoha_client._shared.wait import wait_if_needed, wait_options
+from conoha_client.features._shared.command_option import (
+    each_args,
+    raise_for_failures,
+)
+from conoha_client.features._shared.concurrent import MAX_WORKERS
 from conoha_client.features.plan.domain import Memory
 from conoha_client.features.plan.repo import find_vmplan
-from conoha_client.features.vm.repo.query import complete_vm, complete_vm_id
+from conoha_client.features.vm.domain import VMStatus
+from conoha_client.features.vm.repo.query import complete_vm_id, complete_vms
 from conoha_client.features.vm_actions.repo import VMActionCommands
 
 
@@ -17,14 +25,56 @@ def vm_resize_cli() -> None:
 
 
 @vm_resize_cli.command(name="resize")
-@click.argument("vm_id", nargs=1, type=click.STRING)
+@click.argument("vm_ids", nargs=-1, required=True, type=click.STRING)
 @click.argument("memory", nargs=1, type=click.Choice(Memory))
-def resize(vm_id: str, memory: Memory) -> None:
-    """VMのメモリサイズを変更."""
-    vm = complete_vm(vm_id)
-    cmd = VMActionCommands(vm_id=vm.vm_id)
-    cmd.resize(find_vmplan(memory).flavor_id)
-    click.echo(f"{vm.vm_id} is resizing")
+@click.option(
+    "--confirm",
+    is_flag=True,
+    default=False,
+    help="停止,変更,確定(失敗時は取り消し),起動まで行う. 各段階を--wait-timeout秒待つ",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=MAX_WORKERS,
+    show_default=True,
+    help="--confirmで同時にプラン変更するVM数",
+)
+@wait_options
+def resize(
+    vm_ids: tuple[str, ...],
+    memory: Memory,
+    confirm: bool,
+    concurrency: int,
+    wait_timeout: float | None,
+) -> None:
+    """VMのメモリサイズを変更. --waitでは確定待ち(VERIFY_RESIZE)まで待つ.
+
+    VM_IDは複数指定できる. --confirmで1台でも失敗すれば失敗として終了する
+    """
+    vms = complete_vms(list(vm_ids))
+    flavor_id = find_vmplan(memory).flavor_id
+    if confirm:
+        # --confirmは--waitの有無に関わらず待つので指定値をそのまま使う
+        timeout = click.get_current_context().params["wait_timeout"]
+        outcomes = resize_vms(
+            [ResizeTarget(vm=vm, flavor_id=flavor_id) for vm in vms],
+            concurrency,
+            view=lambda vm_id, step: click.echo(f"{vm_id} {step}"),
+            timeout_sec=timeout,
+        )
+        for o in outcomes:
+            if not o.is_ok():
+                click.echo(f"failed to resize {o.arg.vm.vm_id}: {o.error}", err=True)
+            elif not o.value:
+                click.echo(f"{o.arg.vm.vm_id} is already {memory.value}GB")
+        raise_for_failures(outcomes)
+        return
+    for vm in vms:
+        cmd = VMActionCommands(vm_id=vm.vm_id)
+        cmd.resize(flavor_id)
+        click.echo(f"{vm.vm_id} is resizing")
+        wait_if_needed(vm.vm_id, wait_timeout, (VMStatus.VERIFY_RESIZE,))
 
 
 @vm_resize_cli.command(name="resize-confirm")
@@ -0,0 +1,34 @@
+"""vm add CLI test."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from click.testing import CliRunner
+
+from .add import vm_add_cli
+
+if TYPE_CHECKING:
+    from _pytest.monkeypatch import MonkeyPatch
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--timeout", "10"],
+        ["-n", "2", "--wait"],
+        ["-n", "2", "--wait-timeout", "10"],
+    ],
+)
+def test_reject_unused_wait_options(monkeypatch: MonkeyPatch, args: list[str]) -> None:
+    """台数に合わない待機オプションは一覧を取得する前に拒否する."""
+    for env in [
+        "OS_ADMIN_PASSWORD",
+        "OS_SSHKEY_NAME",
+        "OS_TEMPLATE_READ",
+        "OS_TEMPLATE_WRITE",
+    ]:
+        monkeypatch.setenv(env, "x")
+    result = CliRunner().invoke(vm_add_cli, ["-m", "GB1", *args])
+    assert result.exit_code == 2  # noqa: PLR2004
+    assert "使えません" in result.output